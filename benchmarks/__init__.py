@@ -0,0 +1 @@
+"""Load-testing and micro-benchmark suite. Run with `python -m benchmarks.run --help`."""
@@ -0,0 +1,83 @@
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterator
+
+# Text templates per category; {x} is filled with a detail so texts vary but stay realistic
+TEMPLATES = {
+    "Academics": [
+        "The professor for {x} rarely answers emails and the exam was unfair.",
+        "Homework load in {x} is too heavy, my child is struggling with the curriculum.",
+        "Great lecture series in {x}, thank you to the course staff!",
+    ],
+    "Administration": [
+        "Registration for {x} keeps failing and the office never calls back.",
+        "The admissions staff were very helpful with {x}.",
+    ],
+    "Housing": [
+        "The dorm room heating in {x} has been broken for a week.",
+        "Residence hall {x} is noisy at night, accommodation is poor.",
+    ],
+    "Finance": [
+        "Tuition payment for {x} was charged twice and the refund is late.",
+        "Scholarship disbursement for {x} is delayed again.",
+    ],
+    "Facilities": [
+        "The cafeteria food near {x} is often cold.",
+        "Parking around {x} is impossible in the mornings.",
+        "The library at {x} closes too early during exams.",
+        "Shuttle delays to {x} make students late for class.",
+    ],
+    "Other": ["Just wanted to share some general thoughts about {x}.", "Nothing specific, {x} is fine."],
+}
+DETAILS = ["Building A", "North Campus", "CS101", "Math 201", "Spring term", "the main hall", "Block C", "West Gate", "Chem Lab", "the stadium"]
+DEPARTMENTS = {
+    "Academics": "Academic Affairs",
+    "Administration": "Student Administration",
+    "Housing": "Housing Services",
+    "Finance": "Finance Office",
+    "Facilities": "Facilities",
+    "Other": "General Inquiries",
+}
+STATUSES = ["pending", "pending", "pending", "in_progress", "resolved", "being_addressed"]
+SENTIMENTS = ["negative", "negative", "neutral", "positive"]
+
+
+def generate_feedbacks(n: int, seed: int = 0, duplicate_rate: float = 0.05, days: int = 730) -> Iterator[Dict[str, Any]]:
+    """Yield `n` synthetic feedback entries (without ids) spread over the last `days` days.
+
+    About `duplicate_rate` of them repeat an earlier text verbatim, like parents resubmitting.
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    categories = list(TEMPLATES)
+    n_parents = max(10, n // 20)
+    recent_texts = []
+    for i in range(n):
+        cat = rng.choice(categories)
+        if recent_texts and rng.random() < duplicate_rate:
+            text = rng.choice(recent_texts)
+        else:
+            text = rng.choice(TEMPLATES[cat]).format(x=rng.choice(DETAILS))
+            if len(recent_texts) < 1000:
+                recent_texts.append(text)
+            else:
+                recent_texts[rng.randrange(1000)] = text
+        submitted = start + timedelta(seconds=int(i * days * 86400 / max(1, n)))
+        p = rng.randrange(n_parents)
+        yield {
+            "parent_name": f"Parent {p}",
+            "student_name": f"Student {p}",
+            "student_id": f"S{p:06d}",
+            "title": text[:40],
+            "contact": f"parent{p}@example.com",
+            "text": text,
+            "category": cat,
+            "sentiment": rng.choice(SENTIMENTS),
+            "confidence": round(rng.uniform(0.5, 0.95), 2),
+            "department": DEPARTMENTS[cat],
+            "department_email": f"{cat.lower()}@university.edu",
+            "notified": False,
+            "status": rng.choice(STATUSES),
+            "submitted": submitted.strftime("%Y-%m-%d %H:%M:%S"),
+            "history": [],
+        }
@@ -0,0 +1,87 @@
+import json
+import math
+import time
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Awaitable
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def summarize(name: str, samples: List[float], items_per_call: int = 1) -> Dict[str, Any]:
+    """Latency percentiles (ms) and throughput (items/s) for a list of per-call durations (s)."""
+    s = sorted(samples)
+    total = sum(s)
+    return {
+        "name": name,
+        "calls": len(s),
+        "throughput": (len(s) * items_per_call / total) if total else 0.0,
+        "p50_ms": percentile(s, 50) * 1000,
+        "p95_ms": percentile(s, 95) * 1000,
+        "p99_ms": percentile(s, 99) * 1000,
+        "max_ms": (s[-1] * 1000) if s else 0.0,
+    }
+
+
+def measure(name: str, fn: Callable[[int], Any], iterations: int, warmup: int = 3, items_per_call: int = 1) -> Dict[str, Any]:
+    """Call fn(i) `iterations` times after `warmup` untimed calls and summarize the timings."""
+    for i in range(warmup):
+        fn(i)
+    samples = []
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - t0)
+    return summarize(name, samples, items_per_call)
+
+
+async def measure_async(name: str, fn: Callable[[int], Awaitable[Any]], iterations: int, warmup: int = 3, items_per_call: int = 1) -> Dict[str, Any]:
+    for i in range(warmup):
+        await fn(i)
+    samples = []
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        await fn(i)
+        samples.append(time.perf_counter() - t0)
+    return summarize(name, samples, items_per_call)
+
+
+def save_results(path: str | Path, results: Dict[str, Any]):
+    Path(path).write_text(json.dumps(results, indent=2))
+
+
+def load_results(path: str | Path) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text())
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[Dict[str, Any]]:
+    """Benchmarks whose p95 latency grew, or throughput fell, by more than `tolerance` vs the baseline.
+
+    Only benchmarks present in both runs at the same corpus size are compared.
+    """
+    if current.get("size") != baseline.get("size"):
+        return []
+    base = {b["name"]: b for b in baseline.get("benchmarks", [])}
+    regressions = []
+    for cur in current.get("benchmarks", []):
+        old = base.get(cur["name"])
+        if old is None:
+            continue
+        if old["p95_ms"] and cur["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            regressions.append({"name": cur["name"], "metric": "p95_ms", "baseline": old["p95_ms"], "current": cur["p95_ms"]})
+        if old["throughput"] and cur["throughput"] < old["throughput"] * (1 - tolerance):
+            regressions.append({"name": cur["name"], "metric": "throughput", "baseline": old["throughput"], "current": cur["throughput"]})
+    return regressions
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    header = f"{'benchmark':<34}{'calls':>7}{'ops/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(f"{r['name']:<34}{r['calls']:>7}{r['throughput']:>12.1f}{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}{r['p99_ms']:>10.3f}")
+    return "\n".join(lines)
@@ -0,0 +1,146 @@
+"""Run the benchmark suite against a synthetic corpus.
+
+    python -m benchmarks.run --size 10000 --save baseline.json
+    python -m benchmarks.run --size 10000 --compare baseline.json   # exits 1 on regression
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+from .corpus import generate_feedbacks
+from .harness import measure, measure_async, compare, save_results, load_results, format_table
+
+
+def _populate(storage, size: int, chunk: int = 10000):
+    batch = []
+    for entry in generate_feedbacks(size):
+        batch.append(entry)
+        if len(batch) >= chunk:
+            storage.add_feedbacks(batch)
+            batch = []
+    if batch:
+        storage.add_feedbacks(batch)
+    storage.flush()
+
+
+def run_suite(size: int, iterations: int = 200, data_dir: str | Path | None = None, only: List[str] | None = None) -> Dict[str, Any]:
+    """Build a corpus of `size` entries in a scratch data dir and time every benchmark.
+
+    `only` restricts the run to benchmarks whose name contains one of the given substrings.
+    """
+    from src import storage
+    from src.agents.classifier import analyze_feedback
+    from src.routing import route_feedback
+
+    tmp = None
+    if data_dir is None:
+        tmp = tempfile.TemporaryDirectory(prefix="feedback-bench-")
+        data_dir = tmp.name
+    original_file = storage.DATA_FILE
+    storage.DATA_FILE = Path(data_dir) / "feedbacks.json"
+    results: List[Dict[str, Any]] = []
+
+    def wanted(name: str) -> bool:
+        return not only or any(o in name for o in only)
+
+    try:
+        storage.save_feedbacks()
+        storage.load_feedbacks()
+        t0 = time.perf_counter()
+        _populate(storage, size)
+        populate_seconds = time.perf_counter() - t0
+        storage.save_feedbacks()
+
+        texts = [e["text"] for e in generate_feedbacks(min(size, 1000), seed=1)]
+        few = max(5, iterations // 10)
+
+        if wanted("analyze_feedback"):
+            results.append(measure("analyze_feedback", lambda i: analyze_feedback(texts[i % len(texts)]), iterations))
+        if wanted("route_feedback"):
+            results.append(measure("route_feedback", lambda i: route_feedback("Facilities", texts[i % len(texts)]), iterations))
+        if wanted("add_feedback"):
+            extra = list(generate_feedbacks(iterations + 3, seed=2))
+            results.append(measure("add_feedback", lambda i: storage.add_feedback(extra[i % len(extra)]), iterations))
+        if wanted("save_feedbacks"):
+            results.append(measure("save_feedbacks", lambda i: storage.save_feedbacks(), few, warmup=1))
+        if wanted("load_feedbacks"):
+            storage.save_feedbacks()
+            results.append(measure("load_feedbacks (cold start)", lambda i: storage.load_feedbacks(), few, warmup=1))
+            fmt, storage.SNAPSHOT_FORMAT = storage.SNAPSHOT_FORMAT, "binary"
+            try:
+                storage.save_feedbacks()
+                results.append(measure("load_feedbacks (binary snapshot)", lambda i: storage.load_feedbacks(), few, warmup=1))
+            finally:
+                storage.SNAPSHOT_FORMAT = fmt
+
+        endpoints = [
+            ("GET /admin", "/admin", iterations),
+            ("GET /admin?category=Housing", "/admin?category=Housing&sentiment=negative", iterations),
+            ("GET /dashboard", "/dashboard", iterations),
+            ("GET /dashboard?parent=", "/dashboard?parent=Parent%201", iterations),
+            ("GET /api/feedbacks?limit=100", "/api/feedbacks?limit=100", iterations),
+            ("GET /api/feedbacks (full)", "/api/feedbacks?stream=true", few),
+            ("GET /admin/export", "/admin/export", few),
+        ]
+        endpoints = [e for e in endpoints if wanted(e[0])]
+        if endpoints:
+            results.extend(asyncio.run(_measure_endpoints(endpoints)))
+    finally:
+        storage.flush()
+        storage.DATA_FILE = original_file
+        storage.load_feedbacks()
+        if tmp is not None:
+            tmp.cleanup()
+
+    return {"size": size, "iterations": iterations, "populate_seconds": populate_seconds, "benchmarks": results}
+
+
+async def _measure_endpoints(endpoints) -> List[Dict[str, Any]]:
+    from httpx import AsyncClient, ASGITransport
+    from src.main import app
+
+    out = []
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as ac:
+        for name, url, n in endpoints:
+            async def call(i, url=url):
+                r = await ac.get(url)
+                r.raise_for_status()
+                return r
+
+            out.append(await measure_async(name, call, n, warmup=1))
+    return out
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Feedback app benchmark suite")
+    parser.add_argument("--size", type=int, default=10000, help="synthetic corpus size (1k to 1M)")
+    parser.add_argument("--iterations", type=int, default=200, help="timed calls per benchmark")
+    parser.add_argument("--only", action="append", help="run only benchmarks whose name contains this (repeatable)")
+    parser.add_argument("--save", help="write results as a JSON baseline to this path")
+    parser.add_argument("--compare", help="compare against a saved JSON baseline and exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown before flagging (default 0.2)")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.size, args.iterations, only=args.only)
+    print(f"corpus: {args.size} entries (populated in {results['populate_seconds']:.2f}s)")
+    print(format_table(results["benchmarks"]))
+    if args.save:
+        save_results(args.save, results)
+        print(f"baseline saved to {args.save}")
+    if args.compare:
+        regressions = compare(results, load_results(args.compare), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['name']}: {r['metric']} {r['baseline']:.3f} -> {r['current']:.3f}")
+        if regressions:
+            return 1
+        print("no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
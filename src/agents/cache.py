@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any
+
+
+def normalize_text(text: str) -> str:
+    """Case-fold and collapse whitespace so trivially different copies share a cache key."""
+    return re.sub(r"\s+", " ", (text or "").strip().lower())
+
+
+def cache_key(text: str, prompt_version: str) -> str:
+    return hashlib.sha256(f"{prompt_version}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class ClassificationCache:
+    """LRU + TTL cache of classification results keyed by content hash.
+
+    If `path` is given, entries are appended to it as JSON lines and reloaded on start-up,
+    so results survive restarts. The file is rewritten once it holds twice `max_size` lines.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 7 * 24 * 3600, path: str | Path | None = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = Path(path) if path else None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._file_lines = 0
+        if self.path is not None:
+            self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        now = time.time()
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                for line in fh:
+                    self._file_lines += 1
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    if now - rec["at"] < self.ttl:
+                        self._data[rec["key"]] = (rec["at"], rec["value"])
+                        self._data.move_to_end(rec["key"])
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+        except Exception as ex:
+            print(f"[ClassifierCache] Failed to load {self.path}: {ex}")
+
+    def get(self, key: str) -> Dict[str, Any] | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and time.time() - item[0] < self.ttl:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return dict(item[1])
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]):
+        with self._lock:
+            at = time.time()
+            self._data[key] = (at, dict(value))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+            if self.path is not None:
+                self._persist(key, at, value)
+
+    def _persist(self, key: str, at: float, value: Dict[str, Any]):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self._file_lines >= 2 * self.max_size:
+                tmp = self.path.with_name(self.path.name + ".tmp")
+                with open(tmp, "w", encoding="utf-8") as fh:
+                    for k, (t, v) in self._data.items():
+                        fh.write(json.dumps({"key": k, "at": t, "value": v}) + "\n")
+                os.replace(tmp, self.path)
+                self._file_lines = len(self._data)
+            else:
+                with open(self.path, "a", encoding="utf-8") as fh:
+                    fh.write(json.dumps({"key": key, "at": at, "value": value}) + "\n")
+                self._file_lines += 1
+        except Exception as ex:
+            print(f"[ClassifierCache] Failed to persist entry: {ex}")
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+            if self.path is not None and self.path.exists():
+                self.path.unlink()
+            self._file_lines = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._data), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
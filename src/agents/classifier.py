@@ -1,147 +1,578 @@
+import asyncio
+import json
+import multiprocessing
 import os
-from typing import Dict, Any
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List
+
+from .. import keywords
+from .. import metrics
+from .cache import ClassificationCache, cache_key
+from . import local_model
 
 OPENAI_KEY = os.getenv("OPENAI_API_KEY")
+# Batch classification: worker processes (0 = classify in-process) and texts per task
+CLASSIFIER_WORKERS = int(os.getenv("CLASSIFIER_WORKERS", str(min(4, os.cpu_count() or 1))))
+CLASSIFIER_BATCH_CHUNK = int(os.getenv("CLASSIFIER_BATCH_CHUNK", "256"))
+# LLM result cache: entries, time-to-live (seconds) and optional file to persist across restarts
+CLASSIFIER_CACHE_SIZE = int(os.getenv("CLASSIFIER_CACHE_SIZE", "10000"))
+CLASSIFIER_CACHE_TTL = float(os.getenv("CLASSIFIER_CACHE_TTL", str(7 * 24 * 3600)))
+CLASSIFIER_CACHE_FILE = os.getenv("CLASSIFIER_CACHE_FILE")
 
+# Async LLM path: concurrent LLM calls, per-call timeout (seconds), micro-batch window (ms) and size
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "20"))
+LLM_BATCH_WINDOW_MS = float(os.getenv("LLM_BATCH_WINDOW_MS", "25"))
+LLM_BATCH_MAX = int(os.getenv("LLM_BATCH_MAX", "16"))
+
+# Cascade: the locally trained model (see local_model.py) answers when its confidence reaches this
+# threshold; below it the text goes to the LLM, or to the keyword fallback if no LLM is configured
+LOCAL_MODEL_ENABLED = os.getenv("LOCAL_MODEL_ENABLED", "true").lower() in ("1", "true", "yes")
+LOCAL_MODEL_THRESHOLD = float(os.getenv("LOCAL_MODEL_THRESHOLD", "0.8"))
+
+# Bump whenever LLM_PROMPT_TEMPLATE changes in a way that alters results; it is part of the cache key
+PROMPT_VERSION = "1"
+
+# Stronger prompt with explicit schema and examples.
+LLM_PROMPT_TEMPLATE = (
+    "You are an assistant that classifies parent feedback for a university.\n"
+    "Output must be valid JSON and nothing else. The JSON must contain the keys:\n"
+    "  - category: one of [Academics, Administration, Housing, Finance, Facilities, Other]\n"
+    "  - sentiment: one of [positive, neutral, negative]\n"
+    "  - confidence: a number between 0 and 1 representing your confidence in the classification\n\n"
+    "Example output:\n"
+    "{{\n  \"category\": \"Facilities\",\n  \"sentiment\": \"negative\",\n  \"confidence\": 0.86\n}}\n\n"
+    "Now analyze the following feedback and respond ONLY with the JSON object (no explanation):\n\n"
+    "Feedback: {text}\n"
+)
+
+# Multi-item variant used by the micro-batcher; {items} is a numbered list of feedback texts
+LLM_BATCH_PROMPT_TEMPLATE = (
+    "You are an assistant that classifies parent feedback for a university.\n"
+    "You will receive several numbered feedback items. Output must be a valid JSON array and nothing else,\n"
+    "with exactly one object per item, in the same order. Each object must contain the keys:\n"
+    "  - index: the item number\n"
+    "  - category: one of [Academics, Administration, Housing, Finance, Facilities, Other]\n"
+    "  - sentiment: one of [positive, neutral, negative]\n"
+    "  - confidence: a number between 0 and 1 representing your confidence in the classification\n\n"
+    "Example output for two items:\n"
+    "[{{\"index\": 1, \"category\": \"Facilities\", \"sentiment\": \"negative\", \"confidence\": 0.86}},\n"
+    " {{\"index\": 2, \"category\": \"Finance\", \"sentiment\": \"neutral\", \"confidence\": 0.7}}]\n\n"
+    "Feedback items:\n{items}\n"
+)
+
+
+def _extract_json(s: str) -> str:
+    # Find first { and last } to extract a JSON substring
+    start = s.find("{")
+    end = s.rfind("}")
+    if start == -1 or end == -1 or end <= start:
+        # fallback to regex
+        m = re.search(r"(\{.*\})", s, re.S)
+        if m:
+            return m.group(1)
+        raise ValueError("No JSON object found in LLM output")
+    return s[start : end + 1]
+
+
+def _parse_batch_output(out: str, n: int) -> List[Dict[str, Any]]:
+    """Parse the JSON array returned for an n-item batch prompt into n normalized results."""
+    start, end = out.find("["), out.rfind("]")
+    if start == -1 or end <= start:
+        raise ValueError("No JSON array found in LLM output")
+    parsed = json.loads(out[start : end + 1])
+    if not isinstance(parsed, list) or len(parsed) != n:
+        raise ValueError(f"Expected {n} results from LLM, got {len(parsed) if isinstance(parsed, list) else 'non-list'}")
+    by_index = {}
+    for pos, item in enumerate(parsed, start=1):
+        by_index[int(item.get("index", pos)) if isinstance(item, dict) else pos] = item
+    results: List[Dict[str, Any] | None] = []
+    for i in range(1, n + 1):
+        item = by_index.get(i)
+        results.append(_normalize_llm_result(item) if isinstance(item, dict) else None)
+    return results
+
+
+def _normalize_llm_result(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    # Basic validation and normalization
+    allowed = {"Academics", "Administration", "Housing", "Finance", "Facilities", "Other"}
+    category = parsed.get("category")
+    if category not in allowed:
+        category = "Other"
+
+    sentiment = parsed.get("sentiment", "neutral")
+    if sentiment not in {"positive", "neutral", "negative"}:
+        sentiment = "neutral"
 
-def _llm_classify(text: str) -> Dict[str, Any]:
-    """Try to use LangChain + OpenAI to classify. Returns dict with keys: category, sentiment, confidence."""
     try:
-        # Lazy imports so the module can still be used without langchain installed.
-        from langchain import LLMChain, PromptTemplate
-        from langchain.llms import OpenAI
-
-        # Stronger prompt with explicit schema and examples.
-        prompt = PromptTemplate(
-            input_variables=["text"],
-            template=(
-                "You are an assistant that classifies parent feedback for a university.\n"
-                "Output must be valid JSON and nothing else. The JSON must contain the keys:\n"
-                "  - category: one of [Academics, Administration, Housing, Finance, Facilities, Other]\n"
-                "  - sentiment: one of [positive, neutral, negative]\n"
-                "  - confidence: a number between 0 and 1 representing your confidence in the classification\n\n"
-                "Example output:\n"
-                "{\n  \"category\": \"Facilities\",\n  \"sentiment\": \"negative\",\n  \"confidence\": 0.86\n}\n\n"
-                "Now analyze the following feedback and respond ONLY with the JSON object (no explanation):\n\n"
-                "Feedback: {text}\n"
-            ),
-        )
-
-        llm = OpenAI(openai_api_key=OPENAI_KEY, temperature=0)
-        chain = LLMChain(llm=llm, prompt=prompt)
-        out = chain.run(text=text)
-        # The LLM is asked to return JSON; try to parse (allow for surrounding whitespace/newlines)
-        import json, re
-
-        def _extract_json(s: str) -> str:
-            # Find first { and last } to extract a JSON substring
-            start = s.find("{")
-            end = s.rfind("}")
-            if start == -1 or end == -1 or end <= start:
-                # fallback to regex
-                m = re.search(r"(\{.*\})", s, re.S)
-                if m:
-                    return m.group(1)
-                raise ValueError("No JSON object found in LLM output")
-            return s[start : end + 1]
-
-        raw = out.strip()
-        js = _extract_json(raw)
-        parsed = json.loads(js)
-
-        # Basic validation and normalization
-        allowed = {"Academics", "Administration", "Housing", "Finance", "Facilities", "Other"}
-        category = parsed.get("category")
-        if category not in allowed:
-            category = "Other"
-
-        sentiment = parsed.get("sentiment", "neutral")
-        if sentiment not in {"positive", "neutral", "negative"}:
-            sentiment = "neutral"
+        confidence = float(parsed.get("confidence", 0.5))
+    except Exception:
+        confidence = 0.5
+    # Clamp
+    confidence = max(0.0, min(1.0, confidence))
+
+    return {"category": category, "sentiment": sentiment, "confidence": confidence}
+
+
+class ClassifierEngine:
+    """Holds the expensive classifier resources (VADER lexicon, LangChain chain) for reuse.
+
+    Resources are built lazily on first use, or eagerly via warmup(). Load times and per-call
+    timings are recorded and exposed through stats().
+    """
+
+    def __init__(
+        self,
+        openai_key: str | None = OPENAI_KEY,
+        cache: ClassificationCache | None = None,
+        model_path: str | Path | None = local_model.LOCAL_MODEL_FILE if LOCAL_MODEL_ENABLED else None,
+        threshold: float = LOCAL_MODEL_THRESHOLD,
+    ):
+        self.openai_key = openai_key
+        self.model_path = Path(model_path) if model_path else None
+        self.threshold = threshold
+        self.cache = cache if cache is not None else ClassificationCache(CLASSIFIER_CACHE_SIZE, CLASSIFIER_CACHE_TTL, CLASSIFIER_CACHE_FILE)
+        self._lock = threading.Lock()
+        self._analyzer = None
+        self._analyzer_loaded = False
+        self._chain = None
+        self._llm = None
+        self._model: local_model.LocalModel | None = None
+        self._model_loaded = False
+        self._batcher: "MicroBatcher | None" = None
+        self._load_seconds: Dict[str, float] = {}
+        self._calls: Dict[str, int] = {"local": 0, "llm": 0, "fallback": 0, "llm_errors": 0}
+        self._call_seconds: Dict[str, float] = {"local": 0.0, "llm": 0.0, "fallback": 0.0}
+        # which tier of the cascade produced each returned result
+        self._tiers: Dict[str, int] = {"local": 0, "llm": 0, "fallback": 0}
+
+    def analyzer(self):
+        """The shared SentimentIntensityAnalyzer, or None if vaderSentiment is not installed."""
+        if not self._analyzer_loaded:
+            with self._lock:
+                if not self._analyzer_loaded:
+                    t0 = time.perf_counter()
+                    try:
+                        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+                    except Exception:
+                        # If vader not installed, provide a very small fallback
+                        self._analyzer = None
+                    else:
+                        self._analyzer = SentimentIntensityAnalyzer()
+                    self._load_seconds["vader"] = time.perf_counter() - t0
+                    self._analyzer_loaded = True
+        return self._analyzer
+
+    def trained_model(self) -> "local_model.LocalModel | None":
+        """The trained local model, or None if there is no model file or NumPy is not installed."""
+        if not self._model_loaded:
+            with self._lock:
+                if not self._model_loaded:
+                    t0 = time.perf_counter()
+                    if self.model_path is not None and self.model_path.exists():
+                        try:
+                            self._model = local_model.LocalModel.load(self.model_path)
+                        except Exception as ex:
+                            print(f"[Classifier] Local model unavailable, skipping that tier: {ex}")
+                    self._load_seconds["local"] = time.perf_counter() - t0
+                    self._model_loaded = True
+        return self._model
+
+    def set_local_model(self, model: "local_model.LocalModel | None"):
+        """Swap in a freshly trained model (None disables the tier)."""
+        with self._lock:
+            self._model = model
+            self._model_loaded = True
 
+    def llm(self):
+        """The shared LangChain OpenAI LLM. Raises if LangChain/OpenAI are unavailable."""
+        if self._llm is None:
+            with self._lock:
+                if self._llm is None:
+                    t0 = time.perf_counter()
+                    # Lazy imports so the module can still be used without langchain installed.
+                    from langchain.llms import OpenAI
+
+                    self._llm = OpenAI(openai_api_key=self.openai_key, temperature=0)
+                    self._load_seconds["llm"] = time.perf_counter() - t0
+        return self._llm
+
+    def chain(self):
+        """The shared LLMChain. Raises if LangChain/OpenAI are unavailable."""
+        if self._chain is None:
+            llm = self.llm()
+            with self._lock:
+                if self._chain is None:
+                    from langchain import LLMChain, PromptTemplate
+
+                    prompt = PromptTemplate(input_variables=["text"], template=LLM_PROMPT_TEMPLATE)
+                    self._chain = LLMChain(llm=llm, prompt=prompt)
+        return self._chain
+
+    def warmup(self):
+        """Build every resource up front so the first request does not pay for it."""
+        self.analyzer()
+        self.trained_model()
+        keywords.get_matcher()
+        if self.openai_key:
+            try:
+                self.chain()
+            except Exception as ex:
+                print(f"[Classifier] LLM warmup failed, fallback will be used: {ex}")
+
+    def _record(self, backend: str, started: float):
+        elapsed = time.perf_counter() - started
+        self._calls[backend] += 1
+        self._call_seconds[backend] += elapsed
+        metrics.observe_stage("classifier_backend", elapsed, backend=backend)
+
+    def classify_llm(self, text: str) -> Dict[str, Any]:
+        """Try to use LangChain + OpenAI to classify. Returns dict with keys: category, sentiment, confidence."""
+        t0 = time.perf_counter()
         try:
-            confidence = float(parsed.get("confidence", 0.5))
+            out = self.chain().run(text=text)
+            # The LLM is asked to return JSON; try to parse (allow for surrounding whitespace/newlines)
+            parsed = json.loads(_extract_json(out.strip()))
+            result = _normalize_llm_result(parsed)
         except Exception:
-            confidence = 0.5
-        # Clamp
-        confidence = max(0.0, min(1.0, confidence))
+            # If anything fails, raise so fallback can be used
+            self._calls["llm_errors"] += 1
+            raise
+        self._record("llm", t0)
+        return result
 
-        return {"category": category, "sentiment": sentiment, "confidence": confidence}
-    except Exception:
-        # If anything fails, raise so fallback can be used
-        raise
+    def classify_fallback(self, text: str) -> Dict[str, Any]:
+        # Lightweight keyword mapping and VADER sentiment
+        t0 = time.perf_counter()
+        analyzer = self.analyzer()
 
+        text_l = text.lower()
+        scores = keywords.match(text)["categories"]
 
-def _fallback_classify(text: str) -> Dict[str, Any]:
-    # Lightweight keyword mapping and VADER sentiment
-    try:
-        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-    except Exception:
-        # If vader not installed, provide a very small fallback
-        analyzer = None
-    else:
-        analyzer = SentimentIntensityAnalyzer()
-
-    keywords = {
-        "Academics": ["course", "exam", "professor", "grade", "curriculum", "homework", "lecture"],
-        "Administration": ["admission", "admissions", "registration", "admin", "office", "policy", "staff"],
-        "Housing": ["dorm", "housing", "room", "apartment", "accommodation", "residence"],
-        "Finance": ["tuition", "fee", "fees", "payment", "scholarship", "refund"],
-        "Facilities": ["parking", "food", "cafeteria", "library", "facility", "maintenance", "campus"],
-    }
-
-    text_l = text.lower()
-    scores = {k: 0 for k in keywords.keys()}
-    for cat, terms in keywords.items():
-        for t in terms:
-            if t in text_l:
-                scores[cat] += 1
-
-    # pick best category
-    best_cat = "Other"
-    best_score = 0
-    if scores:
-        best_cat, best_score = max(scores.items(), key=lambda x: x[1])
-        if best_score == 0:
-            best_cat = "Other"
-
-    # sentiment
-    sentiment = "neutral"
-    confidence = 0.6
-    if analyzer:
-        vs = analyzer.polarity_scores(text)
-        c = vs.get("compound", 0.0)
-        if c >= 0.05:
-            sentiment = "positive"
-        elif c <= -0.05:
-            sentiment = "negative"
+        # pick best category
+        best_cat = "Other"
+        best_score = 0
+        if scores:
+            best_cat, best_score = max(scores.items(), key=lambda x: x[1])
+            if best_score == 0:
+                best_cat = "Other"
+
+        # sentiment
+        sentiment = "neutral"
+        confidence = 0.6
+        if analyzer:
+            vs = analyzer.polarity_scores(text)
+            c = vs.get("compound", 0.0)
+            if c >= 0.05:
+                sentiment = "positive"
+            elif c <= -0.05:
+                sentiment = "negative"
+            else:
+                sentiment = "neutral"
+            # map compound magnitude into confidence
+            confidence = min(0.95, 0.5 + abs(c))
         else:
-            sentiment = "neutral"
-        # map compound magnitude into confidence
-        confidence = min(0.95, 0.5 + abs(c))
-    else:
-        # crude rule-based sentiment
-        if any(w in text_l for w in ["not happy", "angry", "bad", "poor", "unacceptable", "disappointed"]):
-            sentiment = "negative"
-            confidence = 0.7
-        elif any(w in text_l for w in ["great", "happy", "satisfied", "excellent", "thank"]):
-            sentiment = "positive"
-            confidence = 0.7
+            # crude rule-based sentiment
+            if any(w in text_l for w in ["not happy", "angry", "bad", "poor", "unacceptable", "disappointed"]):
+                sentiment = "negative"
+                confidence = 0.7
+            elif any(w in text_l for w in ["great", "happy", "satisfied", "excellent", "thank"]):
+                sentiment = "positive"
+                confidence = 0.7
 
-    return {"category": best_cat, "sentiment": sentiment, "confidence": float(confidence)}
+        self._record("fallback", t0)
+        return {"category": best_cat, "sentiment": sentiment, "confidence": float(confidence)}
+
+    def classify_llm_cached(self, text: str) -> Dict[str, Any]:
+        """classify_llm, answered from the content-addressed cache when the same text was seen."""
+        key = cache_key(text, PROMPT_VERSION)
+        hit = self.cache.get(key)
+        if hit is not None:
+            return hit
+        result = self.classify_llm(text)
+        self.cache.put(key, result)
+        return result
+
+    def _answer(self, result: Dict[str, Any], tier: str) -> Dict[str, Any]:
+        self._tiers[tier] += 1
+        return {**result, "tier": tier}
+
+    def classify_local_batch(self, texts: List[str]) -> List[Dict[str, Any] | None]:
+        """Score `texts` with the local model in one pass; None where it is missing or not confident."""
+        model = self.trained_model()
+        if model is None or not texts:
+            return [None] * len(texts)
+        t0 = time.perf_counter()
+        preds = model.predict(texts)
+        self._record("local", t0)
+        return [self._answer(p, "local") if p["confidence"] >= self.threshold else None for p in preds]
+
+    def escalate(self, text: str) -> Dict[str, Any]:
+        """The tiers after the local model: the (cached) LLM if configured, else the keyword fallback."""
+        if self.openai_key:
+            try:
+                return self._answer(self.classify_llm_cached(text), "llm")
+            except Exception:
+                # fallback on any failure
+                metrics.inc("classifier_llm_fallback")
+        return self._answer(self.classify_fallback(text), "fallback")
+
+    def escalate_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """escalate() for many texts at once, for callers outside the event loop (batches, imports).
+
+        Cache misses go to the LLM as multi-item prompts through a MicroBatcher on a private event
+        loop, so at most LLM_MAX_CONCURRENCY calls of up to LLM_BATCH_MAX items are in flight and
+        each is bounded by LLM_TIMEOUT. Items the LLM does not answer fall back to keywords.
+        """
+        if not self.openai_key:
+            return [self._answer(self.classify_fallback(t), "fallback") for t in texts]
+        keys = [cache_key(t, PROMPT_VERSION) for t in texts]
+        results: List[Dict[str, Any] | None] = [None] * len(texts)
+        todo = []
+        for i, key in enumerate(keys):
+            hit = self.cache.get(key)
+            if hit is not None:
+                results[i] = self._answer(hit, "llm")
+            else:
+                todo.append(i)
+        if todo:
+
+            async def run():
+                batcher = MicroBatcher(self, asyncio.get_running_loop())
+                futs = [batcher.submit(texts[i]) for i in todo]
+                batcher._flush()
+                return await asyncio.gather(*futs, return_exceptions=True)
+
+            try:
+                answers = asyncio.run(run())
+            except Exception as ex:
+                answers = [ex] * len(todo)
+            for i, answer in zip(todo, answers):
+                if isinstance(answer, BaseException):
+                    metrics.inc("classifier_llm_fallback")
+                    results[i] = self._answer(self.classify_fallback(texts[i]), "fallback")
+                else:
+                    self.cache.put(keys[i], answer)
+                    results[i] = self._answer(answer, "llm")
+        return results
+
+    def analyze(self, text: str) -> Dict[str, Any]:
+        """Run the cascade; the result's `tier` says which of local / llm / fallback answered."""
+        return self.classify_local_batch([text])[0] or self.escalate(text)
+
+    async def _complete_async(self, prompt: str) -> str:
+        llm = self.llm()
+        if hasattr(llm, "apredict"):
+            return await llm.apredict(prompt)
+        return await asyncio.to_thread(llm, prompt)
+
+    async def classify_llm_batch_async(self, texts: List[str]) -> List[Dict[str, Any] | None]:
+        """One multi-item LLM call for `texts`; items the model did not answer come back as None."""
+        t0 = time.perf_counter()
+        items = "\n".join(f"{i}. {json.dumps(t, ensure_ascii=False)}" for i, t in enumerate(texts, start=1))
+        try:
+            out = await self._complete_async(LLM_BATCH_PROMPT_TEMPLATE.format(items=items))
+            results = _parse_batch_output(out, len(texts))
+        except Exception:
+            self._calls["llm_errors"] += 1
+            raise
+        self._record("llm", t0)
+        return results
+
+    def batcher(self) -> "MicroBatcher":
+        """Micro-batcher bound to the running event loop (recreated if the loop changes)."""
+        loop = asyncio.get_running_loop()
+        if self._batcher is None or self._batcher.loop is not loop:
+            self._batcher = MicroBatcher(self, loop)
+        return self._batcher
+
+    async def analyze_async(self, text: str) -> Dict[str, Any]:
+        """Non-blocking analyze(): LLM calls are micro-batched, concurrency-limited and time-bounded."""
+        local = self.classify_local_batch([text])[0]
+        if local is not None:
+            return local
+        if not self.openai_key:
+            return self._answer(self.classify_fallback(text), "fallback")
+        key = cache_key(text, PROMPT_VERSION)
+        hit = self.cache.get(key)
+        if hit is not None:
+            return self._answer(hit, "llm")
+        try:
+            result = await self.batcher().submit(text)
+        except Exception:
+            # fallback on any failure (including timeouts)
+            metrics.inc("classifier_llm_fallback")
+            return self._answer(self.classify_fallback(text), "fallback")
+        self.cache.put(key, result)
+        return self._answer(result, "llm")
+
+    def stats(self) -> Dict[str, Any]:
+        """Resource load times plus call counts and mean latency per backend (seconds)."""
+        mean = {b: (self._call_seconds[b] / self._calls[b] if self._calls[b] else 0.0) for b in self._call_seconds}
+        return {
+            "load_seconds": dict(self._load_seconds),
+            "calls": dict(self._calls),
+            "tiers": dict(self._tiers),
+            "local_model": {"loaded": self._model is not None, "terms": len(self._model) if self._model else 0, "threshold": self.threshold},
+            "total_seconds": dict(self._call_seconds),
+            "mean_seconds": mean,
+            "cache": self.cache.stats(),
+        }
+
+
+class MicroBatcher:
+    """Groups LLM requests that arrive within LLM_BATCH_WINDOW_MS into one multi-item prompt.
+
+    At most LLM_MAX_CONCURRENCY batch calls are in flight at once and each is bounded by
+    LLM_TIMEOUT, including the time spent waiting for a free slot. Results are demultiplexed back to the awaiting callers in order.
+    """
+
+    def __init__(self, engine: ClassifierEngine, loop: asyncio.AbstractEventLoop):
+        self.engine = engine
+        self.loop = loop
+        self.semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        self._pending: List[tuple] = []
+        self._timer: asyncio.TimerHandle | None = None
+        # the loop only keeps weak references to tasks; hold them until they finish
+        self._tasks: set = set()
+        self.batches = 0
+
+    def submit(self, text: str) -> "asyncio.Future[Dict[str, Any]]":
+        fut = self.loop.create_future()
+        self._pending.append((text, fut))
+        if len(self._pending) >= LLM_BATCH_MAX:
+            self._flush()
+        elif self._timer is None:
+            self._timer = self.loop.call_later(LLM_BATCH_WINDOW_MS / 1000.0, self._flush)
+        return fut
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self.batches += 1
+            task = self.loop.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _call(self, texts: List[str]) -> List[Dict[str, Any] | None]:
+        async with self.semaphore:
+            return await self.engine.classify_llm_batch_async(texts)
+
+    async def _run(self, batch: List[tuple]):
+        texts = [t for t, _ in batch]
+        try:
+            results = await asyncio.wait_for(self._call(texts), LLM_TIMEOUT)
+        except Exception as ex:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(ex)
+            return
+        for (_, fut), result in zip(batch, results):
+            if fut.done():
+                continue
+            if result is None:
+                fut.set_exception(ValueError("LLM returned no result for item"))
+            else:
+                fut.set_result(result)
+
+
+# Process-wide engine used by the module-level helpers below
+engine = ClassifierEngine()
+
+
+def _llm_classify(text: str) -> Dict[str, Any]:
+    return engine.classify_llm(text)
+
+
+def _fallback_classify(text: str) -> Dict[str, Any]:
+    return engine.classify_fallback(text)
 
 
 def analyze_feedback(text: str) -> Dict[str, Any]:
     """Public API: analyze the feedback text and return a dict.
 
-    It will try to use the LLM-backed LangChain agent if OPENAI_API_KEY is present and the libs are installed.
-    Otherwise, it runs a local fallback.
+    A confident answer from the locally trained model is used as is. Otherwise it will try the
+    LLM-backed LangChain agent if OPENAI_API_KEY is present and the libs are installed, and the
+    keyword fallback if not. `tier` in the result names the one that answered.
     """
-    if OPENAI_KEY:
-        try:
-            return _llm_classify(text)
-        except Exception:
-            # fallback on any failure
-            return _fallback_classify(text)
-    else:
-        return _fallback_classify(text)
+    return engine.analyze(text)
+
+
+async def analyze_feedback_async(text: str) -> Dict[str, Any]:
+    """Async analyze_feedback for request handlers: never blocks the event loop on the LLM."""
+    return await engine.analyze_async(text)
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # never fork: the parent has running threads (storage writer, notifier, event loop)
+            # whose locks a forked child could inherit in a held state
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(max_workers=CLASSIFIER_WORKERS, mp_context=multiprocessing.get_context(method))
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the batch worker processes (they are restarted on the next large batch)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+
+def _classify_chunk(texts: List[str]) -> List[Dict[str, Any]]:
+    # Runs inside a worker process; each worker keeps its own warm engine
+    return [engine.classify_fallback(t) for t in texts]
+
+
+def analyze_feedback_batch(texts: List[str]) -> List[Dict[str, Any]]:
+    """Classify many texts at once, returning results in input order.
+
+    The whole batch is first scored by the local model in one matrix pass; only the texts it is
+    not confident about go further. With an LLM configured those are sent as multi-item prompts
+    (see ClassifierEngine.escalate_batch). Otherwise the fallback classifier is fanned out over a process pool in chunks of
+    CLASSIFIER_BATCH_CHUNK; batches that fit in one chunk (or CLASSIFIER_WORKERS=0) are
+    classified in-process.
+    """
+    texts = list(texts)
+    results = engine.classify_local_batch(texts)
+    rest = [i for i, r in enumerate(results) if r is None]
+    if not rest:
+        return results
+    if engine.openai_key:
+        for i, r in zip(rest, engine.escalate_batch([texts[i] for i in rest])):
+            results[i] = r
+        return results
+    for i, r in zip(rest, _fallback_batch([texts[i] for i in rest])):
+        results[i] = engine._answer(r, "fallback")
+    return results
+
+
+def _fallback_batch(texts: List[str]) -> List[Dict[str, Any]]:
+    chunk = max(1, CLASSIFIER_BATCH_CHUNK)
+    if CLASSIFIER_WORKERS <= 0 or len(texts) <= chunk:
+        return _classify_chunk(texts)
+    chunks = [texts[i : i + chunk] for i in range(0, len(texts), chunk)]
+    try:
+        results: List[Dict[str, Any]] = []
+        for part in _get_pool().map(_classify_chunk, chunks):
+            results.extend(part)
+        return results
+    except Exception as ex:
+        print(f"[Classifier] Process pool failed, classifying in-process: {ex}")
+        shutdown_pool()
+        return _classify_chunk(texts)
@@ -0,0 +1,224 @@
+"""Locally trained TF-IDF + multinomial naive Bayes classifier (the middle tier of the cascade).
+
+Trained offline from labelled entries in the store and saved as a NumPy .npz file:
+
+    python -m src.agents.local_model                 # train on the store, write LOCAL_MODEL_FILE
+    python -m src.agents.local_model --holdout 0.2   # also report accuracy on a held-out slice
+    python -m src.agents.local_model --include-legacy  # also use entries stored without `classifier`
+
+NumPy is optional; without it the cascade simply skips this tier.
+"""
+import argparse
+import math
+import os
+import random
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Iterator, Tuple
+
+from ..search import tokenize
+
+LOCAL_MODEL_FILE = Path(os.getenv("LOCAL_MODEL_FILE", str(Path(__file__).resolve().parents[2] / "data" / "local_model.npz")))
+# Vocabulary size cap, minimum document frequency of a term and naive Bayes smoothing
+LOCAL_MODEL_MAX_FEATURES = int(os.getenv("LOCAL_MODEL_MAX_FEATURES", "20000"))
+LOCAL_MODEL_MIN_DF = int(os.getenv("LOCAL_MODEL_MIN_DF", "2"))
+LOCAL_MODEL_ALPHA = float(os.getenv("LOCAL_MODEL_ALPHA", "0.1"))
+LOCAL_MODEL_MIN_EXAMPLES = int(os.getenv("LOCAL_MODEL_MIN_EXAMPLES", "50"))
+
+HEADS = ("category", "sentiment")
+# Labels produced by the model itself or by the keyword fallback are not trusted for training
+UNTRUSTED_SOURCES = ("local", "fallback")
+
+
+def features(text: str | None) -> List[str]:
+    """Unigrams and adjacent-word bigrams of the non-stopword tokens."""
+    toks = [t for _, t in tokenize(text)]
+    return toks + [f"{a} {b}" for a, b in zip(toks, toks[1:])]
+
+
+def training_examples(entries: Iterable[Dict[str, Any]], include_unlabelled: bool = False) -> Iterator[Tuple[str, str, str]]:
+    """(text, category, sentiment) for entries whose labels came from the LLM, an import or a person.
+
+    Entries stored before the `classifier` field existed may carry keyword-fallback labels, so
+    they are left out unless `include_unlabelled` is set. Near-duplicates are skipped so a
+    resubmitted complaint does not count several times.
+    """
+    for fb in entries:
+        if fb.get("duplicate_of") is not None or fb.get("classifier") in UNTRUSTED_SOURCES:
+            continue
+        if "classifier" not in fb and not include_unlabelled:
+            continue
+        if fb.get("text") and fb.get("category") and fb.get("sentiment"):
+            yield fb["text"], fb["category"], fb["sentiment"]
+
+
+class LocalModel:
+    """TF-IDF features scored against per-class log-probabilities, one head per label.
+
+    predict() vectorizes a whole batch into one sparse (document, term, weight) list and scores
+    it against each head with a single gather/scatter-add (a sparse x dense matrix product), so
+    a batch of thousands costs one NumPy pass rather than a call per text.
+    """
+
+    def __init__(self, vocab: List[str], idf, heads: Dict[str, Tuple[List[str], Any, Any]]):
+        self.vocab = {t: i for i, t in enumerate(vocab)}
+        self.idf = idf
+        # head -> (class names, log P(term | class) as a (terms x classes) matrix, log prior)
+        self.heads = heads
+
+    def __len__(self) -> int:
+        return len(self.vocab)
+
+    def _vectorize(self, texts: List[str]):
+        """Sparse TF-IDF rows for `texts` as parallel (doc, term, weight) arrays, L2-normalized."""
+        import numpy as np
+
+        docs: List[int] = []
+        terms: List[int] = []
+        counts: List[int] = []
+        vocab = self.vocab
+        for d, text in enumerate(texts):
+            tf = Counter(vocab[f] for f in features(text) if f in vocab)
+            docs.extend([d] * len(tf))
+            terms.extend(tf)
+            counts.extend(tf.values())
+        doc = np.asarray(docs, dtype=np.intp)
+        term = np.asarray(terms, dtype=np.intp)
+        weight = (1.0 + np.log(np.asarray(counts, dtype=np.float64))) * self.idf[term]
+        norms = np.sqrt(np.bincount(doc, weights=weight * weight, minlength=len(texts)))
+        if len(weight):
+            weight /= norms[doc]
+        return doc, term, weight
+
+    def predict(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Labels plus `confidence` (the lower of the two heads' top probabilities) for each text."""
+        import numpy as np
+
+        texts = list(texts)
+        if not texts:
+            return []
+        doc, term, weight = self._vectorize(texts)
+        results: List[Dict[str, Any]] = [{} for _ in texts]
+        confidence = np.ones(len(texts))
+        for head, (classes, log_prob, prior) in self.heads.items():
+            scores = np.tile(prior, (len(texts), 1))
+            np.add.at(scores, doc, log_prob[term] * weight[:, None])
+            scores -= scores.max(axis=1, keepdims=True)
+            probs = np.exp(scores)
+            probs /= probs.sum(axis=1, keepdims=True)
+            best = probs.argmax(axis=1)
+            confidence = np.minimum(confidence, probs[np.arange(len(texts)), best])
+            for r, b in zip(results, best):
+                r[head] = classes[b]
+        for r, c in zip(results, confidence):
+            r["confidence"] = float(c)
+        return results
+
+    @classmethod
+    def train(
+        cls,
+        examples: Iterable[Tuple[str, str, str]],
+        max_features: int = LOCAL_MODEL_MAX_FEATURES,
+        min_df: int = LOCAL_MODEL_MIN_DF,
+        alpha: float = LOCAL_MODEL_ALPHA,
+    ) -> "LocalModel":
+        """Fit vocabulary, IDF and both naive Bayes heads on (text, category, sentiment) triples."""
+        import numpy as np
+
+        examples = list(examples)
+        if not examples:
+            raise ValueError("No labelled examples to train on")
+        df: Counter = Counter()
+        for text, _, _ in examples:
+            df.update(set(features(text)))
+        vocab = sorted((t for t, n in df.items() if n >= min_df), key=lambda t: (-df[t], t))[:max_features]
+        if not vocab:
+            raise ValueError("No term occurs in enough examples to build a vocabulary")
+        n = len(examples)
+        idf = np.array([math.log((1 + n) / (1 + df[t])) + 1.0 for t in vocab])
+        model = cls(vocab, idf, {})
+
+        doc, term, weight = model._vectorize([text for text, _, _ in examples])
+        for h, head in enumerate(HEADS):
+            labels = [ex[h + 1] for ex in examples]
+            classes = sorted(set(labels))
+            index = {c: i for i, c in enumerate(classes)}
+            y = np.array([index[c] for c in labels], dtype=np.intp)
+            mass = np.zeros((len(vocab), len(classes)))
+            np.add.at(mass, (term, y[doc]), weight)
+            mass += alpha
+            log_prob = np.log(mass / mass.sum(axis=0, keepdims=True))
+            prior = np.log(np.bincount(y, minlength=len(classes)) / n)
+            model.heads[head] = (classes, log_prob, prior)
+        return model
+
+    def save(self, path: str | Path):
+        import numpy as np
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {"vocab": np.array(list(self.vocab)), "idf": self.idf}
+        for head, (classes, log_prob, prior) in self.heads.items():
+            arrays[f"{head}_classes"] = np.array(classes)
+            arrays[f"{head}_log_prob"] = log_prob
+            arrays[f"{head}_prior"] = prior
+        tmp = path.with_name(path.name + ".tmp.npz")
+        np.savez_compressed(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "LocalModel":
+        import numpy as np
+
+        with np.load(path, allow_pickle=False) as data:
+            heads = {h: (data[f"{h}_classes"].tolist(), data[f"{h}_log_prob"], data[f"{h}_prior"]) for h in HEADS}
+            return cls(data["vocab"].tolist(), data["idf"], heads)
+
+
+def evaluate(model: LocalModel, examples: List[Tuple[str, str, str]], threshold: float) -> Dict[str, float]:
+    """Accuracy overall and on the share of examples the cascade would accept at `threshold`."""
+    preds = model.predict([text for text, _, _ in examples])
+    correct = [p["category"] == c and p["sentiment"] == s for p, (_, c, s) in zip(preds, examples)]
+    accepted = [ok for ok, p in zip(correct, preds) if p["confidence"] >= threshold]
+    return {
+        "examples": len(examples),
+        "accuracy": sum(correct) / len(examples) if examples else 0.0,
+        "coverage": len(accepted) / len(examples) if examples else 0.0,
+        "accepted_accuracy": sum(accepted) / len(accepted) if accepted else 0.0,
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    from .. import storage
+    from .classifier import LOCAL_MODEL_THRESHOLD
+
+    parser = argparse.ArgumentParser(description="Train the local TF-IDF + naive Bayes classifier from labelled feedback")
+    parser.add_argument("--out", default=str(LOCAL_MODEL_FILE), help="where to write the model (.npz)")
+    parser.add_argument("--holdout", type=float, default=0.0, help="fraction held out to report accuracy before the final fit")
+    parser.add_argument("--min-examples", type=int, default=LOCAL_MODEL_MIN_EXAMPLES)
+    parser.add_argument(
+        "--include-legacy", action="store_true", help="also train on entries without a `classifier` field (their labels may come from keywords)"
+    )
+    args = parser.parse_args(argv)
+
+    examples = list(training_examples(storage.iter_feedbacks(), include_unlabelled=args.include_legacy))
+    if len(examples) < args.min_examples:
+        print(f"[Classifier] Only {len(examples)} labelled entries (need {args.min_examples}); not training")
+        return 1
+    if args.holdout > 0:
+        shuffled = examples[:]
+        random.Random(0).shuffle(shuffled)
+        cut = max(1, int(len(shuffled) * args.holdout))
+        report = evaluate(LocalModel.train(shuffled[cut:]), shuffled[:cut], LOCAL_MODEL_THRESHOLD)
+        print(
+            f"[Classifier] Holdout of {report['examples']}: accuracy {report['accuracy']:.3f}; "
+            f"{report['coverage']:.1%} above LOCAL_MODEL_THRESHOLD={LOCAL_MODEL_THRESHOLD} with accuracy {report['accepted_accuracy']:.3f}"
+        )
+    model = LocalModel.train(examples)
+    model.save(args.out)
+    print(f"[Classifier] Trained local model on {len(examples)} entries ({len(model)} terms) -> {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
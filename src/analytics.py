@@ -0,0 +1,102 @@
+import bisect
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, List, Any, Tuple
+
+# Dimensions of each rollup cell, after the day
+ROLLUP_FIELDS = ("department", "category", "sentiment", "status")
+_DEFAULTS = {"status": "pending", "sentiment": "neutral"}
+INTERVALS = ("day", "week")
+
+Cell = Tuple[str, str, str, str]
+
+
+def _day(fb: Dict[str, Any]) -> str:
+    # `submitted` is "%Y-%m-%d %H:%M:%S", so the day is a prefix and needs no parsing
+    return (fb.get("submitted") or "")[:10]
+
+
+def _cell(fb: Dict[str, Any]) -> Cell:
+    return tuple(str(fb.get(f) or _DEFAULTS.get(f, "")) for f in ROLLUP_FIELDS)
+
+
+@lru_cache(maxsize=4096)
+def week_start(day: str) -> str:
+    """Monday of the ISO week containing `day` (YYYY-MM-DD)."""
+    try:
+        d = date.fromisoformat(day)
+    except ValueError:
+        return day
+    return (d - timedelta(days=d.weekday())).isoformat()
+
+
+class Rollups:
+    """Feedback counts per day x department x category x sentiment x status.
+
+    Updated incrementally on add and status change, so trend queries only touch one small
+    dict per day in the requested range instead of every stored entry.
+    """
+
+    def __init__(self):
+        self.days: List[str] = []  # sorted
+        self.cells: Dict[str, Dict[Cell, int]] = {}
+
+    def clear(self):
+        self.days.clear()
+        self.cells.clear()
+
+    def _bump(self, day: str, cell: Cell, n: int):
+        bucket = self.cells.get(day)
+        if bucket is None:
+            bucket = self.cells[day] = {}
+            bisect.insort(self.days, day)
+        count = bucket.get(cell, 0) + n
+        if count > 0:
+            bucket[cell] = count
+        else:
+            bucket.pop(cell, None)
+
+    def add(self, fb: Dict[str, Any]):
+        self._bump(_day(fb), _cell(fb), 1)
+
+    def move_status(self, fb: Dict[str, Any], prev: str | None):
+        """Move an entry's count from its `prev` status cell to its current one."""
+        cell = _cell(fb)
+        old = cell[:-1] + (prev or _DEFAULTS["status"],)
+        if old != cell:
+            self._bump(_day(fb), old, -1)
+            self._bump(_day(fb), cell, 1)
+
+    def trends(
+        self,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        interval: str = "day",
+        group_by: str = "sentiment",
+        **filters,
+    ) -> List[Dict[str, Any]]:
+        """Counts per period in the inclusive [date_from, date_to] range, split by `group_by`.
+
+        `filters` restrict any of ROLLUP_FIELDS (case-insensitive). Periods are days, or weeks
+        labelled by their Monday; periods with no matching entries are omitted.
+        """
+        if interval not in INTERVALS:
+            raise ValueError(f"interval must be one of: {', '.join(INTERVALS)}")
+        if group_by not in ROLLUP_FIELDS:
+            raise ValueError(f"group_by must be one of: {', '.join(ROLLUP_FIELDS)}")
+        unknown = set(filters) - set(ROLLUP_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot filter trends on: {', '.join(sorted(unknown))}")
+        active = [(ROLLUP_FIELDS.index(f), str(v).strip().lower()) for f, v in filters.items() if v not in (None, "")]
+        g = ROLLUP_FIELDS.index(group_by)
+
+        lo = bisect.bisect_left(self.days, date_from[:10]) if date_from else 0
+        hi = bisect.bisect_right(self.days, date_to[:10]) if date_to else len(self.days)
+        series: Dict[str, Dict[str, int]] = {}
+        for day in self.days[lo:hi]:
+            period = week_start(day) if interval == "week" else day
+            for cell, n in self.cells[day].items():
+                if all(cell[i].lower() == v for i, v in active):
+                    counts = series.setdefault(period, {})
+                    counts[cell[g]] = counts.get(cell[g], 0) + n
+        return [{"period": p, "total": sum(c.values()), "counts": c} for p, c in sorted(series.items())]
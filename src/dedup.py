@@ -0,0 +1,122 @@
+import operator
+import os
+import random
+import re
+import zlib
+from typing import Dict, List, Tuple
+
+from .agents.cache import normalize_text
+
+# Near-duplicate detection: MinHash signatures over word shingles, bucketed with LSH
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() in ("1", "true", "yes")
+# Estimated Jaccard similarity at or above which a submission is linked to an earlier entry
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+DEDUP_SHINGLE = int(os.getenv("DEDUP_SHINGLE", "3"))
+# Signature length = bands x rows; more bands catch lower similarities as candidates
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "16"))
+DEDUP_ROWS = int(os.getenv("DEDUP_ROWS", "4"))
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_PRIME = (1 << 61) - 1
+
+Signature = Tuple[int, ...]
+
+
+def shingles(text: str | None, size: int = DEDUP_SHINGLE) -> set:
+    """Hashed word `size`-grams of the normalized text (the whole text if it is shorter)."""
+    words = _WORD.findall(normalize_text(text))
+    if len(words) <= size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))}
+    return {zlib.crc32(" ".join(words[i:i + size]).encode("utf-8")) for i in range(len(words) - size + 1)}
+
+
+class DuplicateIndex:
+    """MinHash/LSH index of canonical entries.
+
+    Only canonical entries (ones that were not themselves near-duplicates) are bucketed, so
+    bucket sizes grow with the number of distinct complaints rather than with resubmissions,
+    and a lookup costs one signature plus a handful of candidate comparisons.
+    """
+
+    def __init__(self, bands: int = DEDUP_BANDS, rows: int = DEDUP_ROWS, threshold: float = DEDUP_THRESHOLD, seed: int = 1):
+        self.bands, self.rows, self.threshold = bands, rows, threshold
+        rnd = random.Random(seed)
+        self._mix = (rnd.randrange(1, _PRIME), rnd.randrange(0, _PRIME))
+        self.signatures: Dict[int, Signature] = {}
+        # hash of the normalized text -> canonical id, so exact resubmissions skip MinHash
+        self._exact: Dict[int, int] = {}
+        self._buckets: List[Dict[Signature, List[int]]] = [{} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def clear(self):
+        self.signatures.clear()
+        self._exact.clear()
+        for b in self._buckets:
+            b.clear()
+
+    def signature(self, text: str | None) -> Signature:
+        """One-permutation MinHash: each shingle hash lands in one of bands x rows bins, and a
+        bin keeps its minimum. Costs one hash per shingle instead of one per shingle per bin."""
+        k = self.bands * self.rows
+        a, b = self._mix
+        sig: List[int | None] = [None] * k
+        for h in shingles(text):
+            v = (a * h + b) % _PRIME
+            i, v = v % k, v // k
+            if sig[i] is None or v < sig[i]:
+                sig[i] = v
+        # densify: an empty bin borrows the next filled bin's value (cyclically), offset by
+        # the distance so borrowed values only agree when the same bin was borrowed from
+        j = next(i for i in range(k - 1, -1, -1) if sig[i] is not None)
+        nxt, dist = sig[j], 0
+        for step in range(k):
+            i = (j - step) % k
+            if sig[i] is not None:
+                nxt, dist = sig[i], 0
+            else:
+                dist += 1
+                sig[i] = nxt + dist * _PRIME
+        return tuple(sig)
+
+    def _bands(self, sig: Signature):
+        r = self.rows
+        for i in range(self.bands):
+            yield i, sig[i * r:(i + 1) * r]
+
+    def query(self, sig: Signature) -> int | None:
+        """Id of the most similar canonical entry at or above the threshold, or None."""
+        seen = set()
+        best, best_sim = None, self.threshold
+        n = len(sig)
+        for i, band in self._bands(sig):
+            for doc_id in self._buckets[i].get(band, ()):
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                other = self.signatures[doc_id]
+                sim = 1.0 if other == sig else sum(map(operator.eq, sig, other)) / n
+                # most similar wins; ties go to the oldest entry
+                if sim > best_sim or (sim == best_sim and (best is None or doc_id < best)):
+                    best, best_sim = doc_id, sim
+        return best
+
+    def lookup(self, text: str | None) -> int | None:
+        canonical = self._exact.get(hash(normalize_text(text)))
+        return canonical if canonical is not None else self.query(self.signature(text))
+
+    def add(self, doc_id: int, text: str | None) -> int | None:
+        """Link `doc_id` to its canonical entry and return that id, or index it as a new canonical."""
+        key = hash(normalize_text(text))
+        canonical = self._exact.get(key)
+        if canonical is not None:
+            return canonical
+        sig = self.signature(text)
+        canonical = self.query(sig)
+        if canonical is None:
+            self.signatures[doc_id] = sig
+            for i, band in self._bands(sig):
+                self._buckets[i].setdefault(band, []).append(doc_id)
+        self._exact[key] = canonical if canonical is not None else doc_id
+        return canonical
@@ -0,0 +1,113 @@
+import asyncio
+import itertools
+import os
+import threading
+from typing import Dict, List, Any
+
+# Live admin feed: per-subscriber queue bound and heartbeat interval (seconds) for /admin/stream
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "256"))
+SSE_HEARTBEAT = float(os.getenv("SSE_HEARTBEAT", "15"))
+
+# Entry fields carried by events (enough to render or patch an admin row)
+EVENT_FIELDS = ("id", "parent_name", "title", "text", "category", "sentiment", "department", "status", "submitted", "notified", "duplicate_of")
+FILTER_FIELDS = ("category", "department", "sentiment")
+
+
+def _norm(value: Any) -> str:
+    return str(value).strip().lower() if value is not None else ""
+
+
+def make_event(kind: str, fb: Dict[str, Any], **extra) -> Dict[str, Any]:
+    """Event payload for an entry, copied so later changes to the entry do not leak into it."""
+    return {"type": kind, "entry": {k: fb.get(k) for k in EVENT_FIELDS}, **extra}
+
+
+class Subscription:
+    """One consumer of the bus: an asyncio queue fed from any thread.
+
+    If the consumer falls EVENT_QUEUE_SIZE events behind it is dropped: the queue is
+    replaced by a single "dropped" event and the subscription is removed from the bus.
+    """
+
+    def __init__(self, bus: "EventBus", filters: Dict[str, str | None], maxsize: int, loop: asyncio.AbstractEventLoop):
+        self.bus = bus
+        self.filters = [(f, _norm(v)) for f, v in filters.items() if v not in (None, "")]
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.loop = loop
+        self.dropped = False
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        entry = event["entry"]
+        return all(_norm(entry.get(f)) == v for f, v in self.filters)
+
+    def _offer(self, event: Dict[str, Any]):
+        # runs on the subscriber's event loop
+        if self.dropped:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped = True
+            self.bus.unsubscribe(self)
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "dropped", "seq": event["seq"]})
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """In-process pub/sub for store changes. publish() may be called from any thread."""
+
+    def __init__(self):
+        self._subs: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, maxsize: int = EVENT_QUEUE_SIZE, **filters: str | None) -> Subscription:
+        """Subscribe from a coroutine; events matching all `filters` (case-insensitive) are queued."""
+        unknown = set(filters) - set(FILTER_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot filter events on: {', '.join(sorted(unknown))}")
+        sub = Subscription(self, filters, maxsize, asyncio.get_running_loop())
+        with self._lock:
+            self._subs.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            if sub in self._subs:
+                self._subs.remove(sub)
+                if sub.dropped:
+                    self.dropped += 1
+
+    def subscribers(self) -> int:
+        with self._lock:
+            return len(self._subs)
+
+    def publish(self, event: Dict[str, Any]):
+        with self._lock:
+            if not self._subs:
+                return
+            event["seq"] = next(self._seq)
+            self.published += 1
+            targets = [s for s in self._subs if s.matches(event)]
+        for sub in targets:
+            try:
+                sub.loop.call_soon_threadsafe(sub._offer, event)
+            except RuntimeError:  # loop closed
+                self.unsubscribe(sub)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"subscribers": self.subscribers(), "published": self.published, "dropped": self.dropped}
+
+
+bus = EventBus()
+
+
+def publish(kind: str, fb: Dict[str, Any], **extra):
+    if bus.subscribers():
+        bus.publish(make_event(kind, fb, **extra))
@@ -0,0 +1,89 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Tuple
+
+# Rendered pages / serialized JSON kept for read endpoints: entries and total bytes (LRU-evicted),
+# and the largest single body worth caching (full-store pages are rendered per request instead)
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_BYTES = int(os.getenv("RESPONSE_CACHE_BYTES", str(16 * 1024 * 1024)))
+RESPONSE_CACHE_MAX_ENTRY = int(os.getenv("RESPONSE_CACHE_MAX_ENTRY", str(1024 * 1024)))
+
+# (body, media type, extra headers)
+CachedBody = Tuple[bytes, str, Dict[str, str]]
+
+
+def parse_if_none_match(value: str | None) -> set:
+    """Entity tags listed in an If-None-Match header (weak validators compare equal)."""
+    if not value:
+        return set()
+    tags = set()
+    for tag in value.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            tags.add(tag)
+    return tags
+
+
+class ResponseCache:
+    """LRU of response bodies keyed by ETag, bounded by entry count and total bytes.
+
+    ETags are derived from the store version, so once the store changes no request can ask
+    for an older entry again: the first put() for a newer version drops everything cached for
+    older ones. Bodies larger than `max_entry_bytes` are not cached at all.
+    """
+
+    def __init__(self, max_size: int = RESPONSE_CACHE_SIZE, max_bytes: int = RESPONSE_CACHE_BYTES, max_entry_bytes: int = RESPONSE_CACHE_MAX_ENTRY):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self.version = None
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, CachedBody]" = OrderedDict()
+
+    def get(self, key: str) -> CachedBody | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item
+
+    def put(self, key: str, value: CachedBody, version: Any = None):
+        """Cache `value` rendered at store `version` (None: not version-scoped)."""
+        size = len(value[0])
+        if self.max_size <= 0 or size > min(self.max_entry_bytes, self.max_bytes):
+            return
+        with self._lock:
+            if version is not None:
+                if self.version is not None and version < self.version:
+                    return  # rendered before a change that has already been seen
+                if version != self.version:
+                    self._data.clear()
+                    self.bytes = 0
+                    self.version = version
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old[0])
+            self._data[key] = value
+            self.bytes += size
+            while len(self._data) > self.max_size or self.bytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self.bytes -= len(evicted[0])
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+            self.version = None
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._data), "max_size": self.max_size, "bytes": self.bytes, "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,233 @@
+"""Bulk import of historical feedback from CSV (export columns) or JSONL.
+
+    python -m src.importer surveys.csv --url http://localhost:8000   # through a running server
+    STORAGE_MODE=sqlite python -m src.importer old-export.jsonl.gz --chunk 5000
+
+Writing the store directly is only safe with STORAGE_MODE=sqlite: in the journal/json modes a
+running server keeps its own in-memory copy and would overwrite the imported rows at its next
+compaction, so the command refuses to do that and the file has to go through the server.
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Iterator
+
+from . import storage
+from .agents.classifier import analyze_feedback_batch
+from .routing import route_feedback, DEPARTMENT_MAP
+
+# Rows classified and committed together
+IMPORT_CHUNK = int(os.getenv("IMPORT_CHUNK", "2000"))
+FORMATS = ("csv", "jsonl")
+
+# Fields recomputed on import rather than copied from the source
+_DROPPED_FIELDS = ("id", "notified", "notify_status", "duplicate_of", "score")
+_EMAIL_BY_DEPARTMENT = {d["name"]: d["email"] for d in DEPARTMENT_MAP.values()}
+# Fields that must be strings when present; other JSON values make the row invalid
+_STRING_FIELDS = ("text", "title", "parent_name", "student_name", "category", "sentiment", "department", "department_email", "status")
+# Format of `submitted` everywhere else in the store (rollups, recent window, export filters)
+SUBMITTED_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def open_text(path: str | Path) -> io.TextIOBase:
+    """Open a CSV/JSONL file for streaming, transparently un-gzipping it."""
+    with open(path, "rb") as fh:
+        gz = fh.read(2) == b"\x1f\x8b"
+    if gz:
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def guess_format(path: str | Path) -> str:
+    name = str(path).lower().removesuffix(".gz")
+    return "jsonl" if name.endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+def iter_records(fh: Iterable[str], fmt: str) -> Iterator[Dict[str, Any]]:
+    """Yield raw records one at a time from CSV (header row required) or JSONL text."""
+    if fmt == "csv":
+        for row in csv.DictReader(fh):
+            yield {k: v for k, v in row.items() if k}
+    elif fmt == "jsonl":
+        for line in fh:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    else:
+        raise ValueError("format must be 'csv' or 'jsonl'")
+
+
+def normalize_submitted(value: Any) -> str:
+    """`submitted` in the store's format; accepts ISO 8601 dates/timestamps (aware ones are converted to UTC).
+
+    Raises ValueError for anything else.
+    """
+    ts = datetime.fromisoformat(str(value).strip())
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts.strftime(SUBMITTED_FORMAT)
+
+
+def _clean(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize one source record; raises ValueError for a record of the wrong shape."""
+    if not isinstance(record, dict):
+        raise ValueError(f"expected an object, got {type(record).__name__}")
+    for k in _STRING_FIELDS:
+        if record.get(k) is not None and not isinstance(record[k], str):
+            raise ValueError(f"`{k}` must be a string")
+    entry = {}
+    for k, v in record.items():
+        if k in _DROPPED_FIELDS:
+            continue
+        if isinstance(v, str):
+            v = v.strip()
+            if not v:
+                continue
+        if v is not None:
+            entry[k] = v
+    if "history" in entry and not isinstance(entry["history"], list):
+        del entry["history"]  # only meaningful from JSONL
+    if "submitted" in entry:
+        entry["submitted"] = normalize_submitted(entry["submitted"])
+    return entry
+
+
+def _label_chunk(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Fill in missing category/sentiment (one batched classifier call) and department routing.
+
+    Labels already present in the source are kept as they are and, unless the source says
+    otherwise, recorded as `classifier: "import"` so the local model can train on them.
+    """
+    todo = [e for e in rows if not e.get("category") or not e.get("sentiment")]
+    for e in rows:
+        if e.get("category"):
+            e.setdefault("classifier", "import")
+    if todo:
+        for e, meta in zip(todo, analyze_feedback_batch([e["text"] for e in todo])):
+            if not e.get("category"):
+                e["category"] = meta["category"]
+                e["confidence"] = meta.get("confidence", 0.5)
+                e["classifier"] = meta.get("tier")
+            if not e.get("sentiment"):
+                e["sentiment"] = meta["sentiment"]
+    for e in rows:
+        if not e.get("department"):
+            dept = route_feedback(e["category"], e["text"])
+            e["department"], e["department_email"] = dept.get("name"), dept.get("email")
+        elif not e.get("department_email"):
+            e["department_email"] = _EMAIL_BY_DEPARTMENT.get(e["department"])
+        # historical feedback never emails the department
+        e["notified"] = False
+        e["notify_status"] = "suppressed"
+    return rows
+
+
+def run_import(records: Iterable[Dict[str, Any]], chunk_size: int = IMPORT_CHUNK) -> Iterator[Dict[str, Any]]:
+    """Import records chunk by chunk, yielding a progress report after each committed chunk.
+
+    Each chunk is classified in one batch and stored with one storage commit; memory use is
+    bounded by the chunk size. Records without text are counted as `skipped`; records that are
+    not objects, have non-string text or labels, or whose `submitted` is not an ISO
+    date/timestamp are counted as `invalid`. Neither is imported.
+    """
+    chunk_size = max(1, chunk_size)
+    stats = {"rows": 0, "imported": 0, "classified": 0, "skipped": 0, "invalid": 0, "chunks": 0, "seconds": 0.0, "done": False}
+    t0 = time.perf_counter()
+
+    def commit(rows: List[Dict[str, Any]]):
+        stats["classified"] += sum(1 for e in rows if not e.get("category") or not e.get("sentiment"))
+        storage.add_feedbacks(_label_chunk(rows))
+        stats["imported"] += len(rows)
+        stats["chunks"] += 1
+        stats["seconds"] = round(time.perf_counter() - t0, 3)
+
+    rows: List[Dict[str, Any]] = []
+    for record in records:
+        stats["rows"] += 1
+        try:
+            entry = _clean(record)
+        except ValueError:
+            stats["invalid"] += 1
+            continue
+        if not entry.get("text"):
+            stats["skipped"] += 1
+            continue
+        rows.append(entry)
+        if len(rows) >= chunk_size:
+            commit(rows)
+            rows = []
+            yield dict(stats)
+    if rows:
+        commit(rows)
+    stats["seconds"] = round(time.perf_counter() - t0, 3)
+    stats["done"] = True
+    yield dict(stats)
+
+
+def import_file(path: str | Path, fmt: str | None = None, chunk_size: int = IMPORT_CHUNK) -> Iterator[Dict[str, Any]]:
+    fmt = fmt or guess_format(path)
+    with open_text(path) as fh:
+        yield from run_import(iter_records(fh, fmt), chunk_size)
+
+
+def import_via_server(url: str, path: str | Path, fmt: str, chunk_size: int = IMPORT_CHUNK, client=None) -> Iterator[Dict[str, Any]]:
+    """Upload `path` to a running server's POST /admin/import and yield its progress reports."""
+    import httpx
+
+    client = client or httpx
+
+    def body():
+        with open(path, "rb") as fh:
+            while data := fh.read(1 << 16):
+                yield data
+
+    params = {"format": fmt, "chunk": chunk_size}
+    with client.stream("POST", url.rstrip("/") + "/admin/import", params=params, content=body(), timeout=None) as r:
+        r.raise_for_status()
+        for line in r.iter_lines():
+            if line:
+                yield json.loads(line)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Import historical feedback from CSV or JSONL (optionally gzipped)")
+    parser.add_argument("path", help="file to import")
+    parser.add_argument("--format", choices=FORMATS, help="input format (default: from the file extension)")
+    parser.add_argument("--chunk", type=int, default=IMPORT_CHUNK, help="rows per classification batch and storage commit")
+    parser.add_argument("--url", help="base URL of a running server to import through (required unless STORAGE_MODE=sqlite)")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or guess_format(args.path)
+    if args.url:
+        reports = import_via_server(args.url, args.path, fmt, args.chunk)
+    elif storage.STORAGE_MODE == "sqlite":
+        reports = import_file(args.path, fmt, args.chunk)
+    else:
+        print(
+            f"[Import] STORAGE_MODE={storage.STORAGE_MODE}: a running server would overwrite rows written by this "
+            "process. Pass --url to import through the server, or use STORAGE_MODE=sqlite.",
+            file=sys.stderr,
+        )
+        return 2
+
+    report: Dict[str, Any] = {}
+    for report in reports:
+        if "error" in report:
+            print(f"[Import] Failed after {report['imported']} imported: {report['error']}", file=sys.stderr)
+            return 1
+        print(f"[Import] {report['imported']} imported, {report['skipped'] + report['invalid']} skipped ({report['rows']} rows, {report['seconds']:.1f}s)", file=sys.stderr)
+    if not args.url:
+        storage.flush()
+    print(json.dumps(report))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
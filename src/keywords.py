@@ -0,0 +1,164 @@
+import json
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Any
+
+# Default keyword tables. They can be overridden by a JSON file pointed to by KEYWORDS_FILE:
+#   {"categories": {"Academics": ["course", ...], ...}, "departments": {"food": "Food Services", ...}}
+# A keyword matches as a whole word or its plural ("exam" -> "exams", "policy" -> "policies");
+# a trailing "*" marks a stem that matches any word starting with it ("dorm*" -> "dormitory").
+DEFAULT_CATEGORY_KEYWORDS: Dict[str, List[str]] = {
+    "Academics": ["course", "exam*", "professor", "grade", "curricul*", "homework", "lecture*"],
+    "Administration": ["admission", "registration", "admin*", "office", "policy", "staff"],
+    "Housing": ["dorm*", "housing", "room", "apartment", "accommodat*", "residen*"],
+    "Finance": ["tuition", "fee", "payment", "scholarship", "refund"],
+    "Facilities": ["parking", "food", "cafeteria", "library", "facility", "maintenance", "campus"],
+}
+
+# keyword -> department name; earlier entries win when several keywords match
+DEFAULT_DEPARTMENT_KEYWORDS: Dict[str, str] = {
+    "food": "Food Services",
+    "cafeteria": "Food Services",
+    "dining": "Food Services",
+    "canteen": "Food Services",
+    "meal": "Food Services",
+    # other possible overrides
+    "parking": "Facilities",
+    "library": "Facilities",
+}
+
+KEYWORDS_FILE = os.getenv("KEYWORDS_FILE")
+# Seconds between checks of KEYWORDS_FILE for changes
+KEYWORDS_RELOAD_INTERVAL = float(os.getenv("KEYWORDS_RELOAD_INTERVAL", "5"))
+
+
+class KeywordMatcher:
+    """All category and department keywords compiled into one word-bounded regex.
+
+    A single scan of the text yields every hit. A keyword also matches its plural ("exam" ->
+    "exams", "library" -> "libraries"); a stem ending in "*" matches any continuation of the word.
+    Hits are reported by keyword, without the "*".
+    """
+
+    def __init__(self, categories: Dict[str, List[str]], departments: Dict[str, str]):
+        raw = [t for terms in categories.values() for t in terms] + list(departments)
+        stems = {t.lower().rstrip("*") for t in raw if t.endswith("*")}
+        self.categories = {cat: [t.lower().rstrip("*") for t in terms] for cat, terms in categories.items()}
+        self.departments = {kw.lower().rstrip("*"): dept for kw, dept in departments.items()}
+        self._term_categories: Dict[str, List[str]] = {}
+        for cat, terms in self.categories.items():
+            for t in terms:
+                self._term_categories.setdefault(t, []).append(cat)
+        self._dept_rank = {kw: i for i, kw in enumerate(self.departments)}
+        terms = set(self._term_categories) | set(self.departments)
+        # every accepted spelling of a whole-word keyword -> the keyword (a keyword's own spelling wins)
+        words = terms - stems
+        self._forms: Dict[str, str] = {t: t for t in words}
+        for t in words:
+            plurals = [t + "s", t + "es"]
+            if len(t) > 2 and t.endswith("y") and t[-2] not in "aeiou":
+                plurals.append(t[:-1] + "ies")
+            for f in plurals:
+                self._forms.setdefault(f, t)
+        # longest first so the alternation prefers "admissions" over "admission"
+        alts = []
+        if self._forms:
+            alts.append("(?P<word>" + "|".join(re.escape(f) for f in sorted(self._forms, key=len, reverse=True)) + ")")
+        if stems:
+            alts.append("(?P<stem>" + "|".join(re.escape(t) for t in sorted(stems, key=len, reverse=True)) + r")\w*")
+        self._pattern = re.compile(rf"\b(?:{'|'.join(alts)})\b", re.IGNORECASE) if alts else None
+
+    def match(self, text: str | None) -> Dict[str, Any]:
+        """Return {"terms": set of matched keywords, "categories": {category: distinct-term count},
+        "departments": [department names in keyword-priority order]}."""
+        found = set()
+        if text and self._pattern is not None:
+            for m in self._pattern.finditer(text):
+                word = m.group("word") if self._forms else None
+                found.add(self._forms[word.lower()] if word else m.group("stem").lower())
+        scores = {cat: 0 for cat in self.categories}
+        for t in found:
+            for cat in self._term_categories.get(t, ()):
+                scores[cat] += 1
+        dept_terms = sorted((t for t in found if t in self.departments), key=self._dept_rank.__getitem__)
+        departments: List[str] = []
+        for t in dept_terms:
+            if self.departments[t] not in departments:
+                departments.append(self.departments[t])
+        return {"terms": found, "categories": scores, "departments": departments}
+
+
+_lock = threading.Lock()
+_matcher = KeywordMatcher(DEFAULT_CATEGORY_KEYWORDS, DEFAULT_DEPARTMENT_KEYWORDS)
+_loaded_mtime: float | None = None
+_last_check = 0.0
+
+
+def reload_keywords(path: str | Path | None = None) -> KeywordMatcher:
+    """Rebuild the matcher from `path` (or KEYWORDS_FILE, or the built-in tables) and swap it in.
+
+    Missing sections in the file fall back to the built-in tables.
+    """
+    global _matcher, _loaded_mtime
+    path = path or KEYWORDS_FILE
+    categories, departments = DEFAULT_CATEGORY_KEYWORDS, DEFAULT_DEPARTMENT_KEYWORDS
+    mtime = None
+    if path:
+        p = Path(path)
+        mtime = p.stat().st_mtime
+        cfg = json.loads(p.read_text(encoding="utf-8"))
+        categories = cfg.get("categories") or categories
+        departments = cfg.get("departments") or departments
+    matcher = KeywordMatcher(categories, departments)
+    with _lock:
+        _matcher = matcher
+        _loaded_mtime = mtime
+        _cached_match.cache_clear()
+    return matcher
+
+
+def _maybe_reload():
+    global _last_check
+    if not KEYWORDS_FILE:
+        return
+    now = time.monotonic()
+    if now - _last_check < KEYWORDS_RELOAD_INTERVAL:
+        return
+    _last_check = now
+    try:
+        if os.stat(KEYWORDS_FILE).st_mtime != _loaded_mtime:
+            reload_keywords()
+    except Exception as ex:
+        print(f"[Keywords] Failed to reload {KEYWORDS_FILE}: {ex}")
+
+
+@lru_cache(maxsize=256)
+def _cached_match(text: str) -> Dict[str, Any]:
+    return _matcher.match(text)
+
+
+def match(text: str | None) -> Dict[str, Any]:
+    """Scan `text` once for every category and department keyword.
+
+    Results are memoized for recent texts so the classifier and the router share one scan.
+    Treat the returned dict as read-only.
+    """
+    _maybe_reload()
+    if not text:
+        return _matcher.match(text)
+    return _cached_match(text)
+
+
+def get_matcher() -> KeywordMatcher:
+    return _matcher
+
+
+if KEYWORDS_FILE:
+    try:
+        reload_keywords()
+    except Exception as ex:
+        print(f"[Keywords] Failed to load {KEYWORDS_FILE}, using built-in tables: {ex}")
@@ -1,16 +1,31 @@
 import os
-from fastapi import FastAPI, Request, Form, Depends
+import csv
+import json
+import time
+import asyncio
+import hashlib
+import tempfile
+from urllib.parse import urlencode
+from fastapi import FastAPI, Request, Form, Depends, HTTPException, Query
 from fastapi.responses import RedirectResponse, JSONResponse
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, PlainTextResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 from typing import List
 
-from .agents.classifier import analyze_feedback
-from .routing import route_feedback, send_notification, DEPARTMENT_MAP
+from starlette.concurrency import run_in_threadpool
+
+from .agents.classifier import analyze_feedback_async, analyze_feedback_batch, engine as classifier_engine
+from .routing import route_feedback, DEPARTMENT_MAP
+from . import notifier
+from . import metrics
 from . import storage
-from .schemas import FeedbackIn, FeedbackOut
+from . import keywords
+from . import events
+from . import importer
+from .httpcache import ResponseCache, CachedBody, parse_if_none_match
+from .schemas import FeedbackIn, FeedbackOut, FeedbackBatchIn
 
 app = FastAPI(title="Parent-University Feedback Agent (Prototype)")
 
@@ -18,100 +33,413 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 app.mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static")), name="static")
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
 
+# Read endpoints answer If-None-Match from the store version and reuse rendered bodies
+response_cache = ResponseCache()
+
+
+def _etag(request: Request, version: int | None = None) -> str:
+    """ETag for a read request: the store version plus the path and (sorted) query params."""
+    params = sorted(request.query_params.multi_items())
+    version = storage.version() if version is None else version
+    key = f"{storage.INSTANCE}:{version}:{request.url.path}?{urlencode(params)}"
+    return '"' + hashlib.sha1(key.encode("utf-8")).hexdigest()[:24] + '"'
+
+
+def _cached_response(request: Request, render) -> Response:
+    """304 if the client already has this version, else the cached (or freshly rendered) body.
+
+    `render()` returns (body bytes, media type, extra headers). The ETag is computed before
+    rendering, so a body is never older than the version it is cached under.
+    """
+    version = storage.version()
+    etag = _etag(request, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    tags = parse_if_none_match(request.headers.get("if-none-match"))
+    if etag in tags or "*" in tags:
+        metrics.inc("http_not_modified")
+        return Response(status_code=304, headers=headers)
+    cached = response_cache.get(etag)
+    if cached is None:
+        cached = render()
+        response_cache.put(etag, cached, version)
+    body, media_type, extra = cached
+    return Response(body, media_type=media_type, headers={**extra, **headers})
+
+
+def _render_template(name: str, context: dict) -> CachedBody:
+    return templates.get_template(name).render(context).encode("utf-8"), "text/html; charset=utf-8", {}
+
+
+def _render_json(data, headers: dict | None = None) -> CachedBody:
+    body = json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    return body, "application/json", headers or {}
+
+
+# Long-lived streams (SSE, bulk export/import): their duration is connection lifetime or file
+# size, not latency, and would swamp the request histogram
+UNTIMED_ROUTES = {"/admin/stream", "/admin/export", "/admin/import"}
+
+if metrics.METRICS_ENABLED:
+
+    @app.middleware("http")
+    async def record_request_latency(request: Request, call_next):
+        t0 = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            if path not in UNTIMED_ROUTES:
+                metrics.REQUEST_SECONDS.observe(time.perf_counter() - t0, method=request.method, route=path, status=status)
+
+
+def _scrape_gauges():
+    """Scrape-time gauges over state the app already tracks; nothing is added to the hot path."""
+    metrics.gauge_callback("feedback_store_entries", "Entries in the feedback store", storage.count)
+    metrics.gauge_callback("feedback_storage_bytes_written_total", "Bytes written to the journal and snapshots", lambda: storage.commit_stats["bytes"], kind="counter")
+    metrics.gauge_callback("feedback_storage_commits_total", "Group commits flushed by the storage writer", lambda: storage.commit_stats["commits"], kind="counter")
+    metrics.gauge_callback(
+        "feedback_classifier_calls_total",
+        "Classifier calls by backend (llm, fallback, llm_errors)",
+        lambda: {metrics.labels(backend=b): n for b, n in classifier_engine.stats()["calls"].items()},
+        kind="counter",
+    )
+    metrics.gauge_callback(
+        "feedback_classifier_tier_total",
+        "Classification results by the cascade tier that produced them (local, llm, fallback)",
+        lambda: {metrics.labels(tier=t): n for t, n in classifier_engine.stats()["tiers"].items()},
+        kind="counter",
+    )
+    metrics.gauge_callback(
+        "feedback_classifier_cache_total",
+        "LLM result cache lookups by outcome",
+        lambda: {metrics.labels(result=r): classifier_engine.cache.stats()[r] for r in ("hits", "misses")},
+        kind="counter",
+    )
+    metrics.gauge_callback(
+        "feedback_response_cache_total",
+        "Rendered page / JSON cache lookups by outcome",
+        lambda: {metrics.labels(result=r): response_cache.stats()[r] for r in ("hits", "misses")},
+        kind="counter",
+    )
+    metrics.gauge_callback("feedback_admin_stream_subscribers", "Connected /admin/stream clients", events.bus.subscribers)
+    metrics.gauge_callback("feedback_notification_outbox_pending", "Notifications queued or in flight", lambda: notifier.get_outbox().pending())
+
+
+_scrape_gauges()
+
+
+@app.on_event("startup")
+async def warmup_classifier():
+    """Load the classifier resources before the first request (disable with CLASSIFIER_WARMUP=false)."""
+    if os.getenv("CLASSIFIER_WARMUP", "true").lower() in ("1", "true", "yes"):
+        classifier_engine.warmup()
+
+
+@app.on_event("startup")
+async def start_outbox():
+    """Resume notifications that were still queued when the process last stopped."""
+    notifier.get_outbox().recover()
+
+
+@app.on_event("shutdown")
+async def stop_outbox():
+    notifier.reset_outbox(None)
+
 
 @app.get("/")
 async def index(request: Request):
-    feedbacks = storage.list_feedbacks()
-    return templates.TemplateResponse("index.html", {"request": request, "feedbacks": feedbacks})
+    return _cached_response(request, lambda: _render_template("index.html", {"request": request, "feedbacks": storage.list_feedbacks()}))
+
+
+ADMIN_PAGE_SIZE = int(os.getenv("ADMIN_PAGE_SIZE", "50"))
+# Largest near-duplicate clusters listed on /admin
+ADMIN_DUPLICATE_CLUSTERS = int(os.getenv("ADMIN_DUPLICATE_CLUSTERS", "10"))
+MAX_PAGE_SIZE = 1000
+
+
+def _check_order(order: str):
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
 
 
 @app.get("/admin")
-async def admin(request: Request, category: str | None = None, sentiment: str | None = None, department: str | None = None):
+async def admin(
+    request: Request,
+    category: str | None = None,
+    sentiment: str | None = None,
+    department: str | None = None,
+    limit: int = ADMIN_PAGE_SIZE,
+    after_id: int | None = None,
+    order: str = "desc",
+    q: str | None = None,
+):
     """Admin dashboard: filter feedbacks by category, sentiment, and department (all optional).
 
-    Shows latest feedbacks and simple counts.
+    Shows one page of feedbacks (newest first by default) and simple counts; `after_id` is the
+    cursor returned as the "next page" link. With `q`, shows the best full-text matches instead.
     """
-    feedbacks = storage.list_feedbacks()
-
-    def _matches(fb: dict) -> bool:
-        if category and str(fb.get("category", "")).lower() != category.lower():
-            return False
-        if sentiment and str(fb.get("sentiment", "")).lower() != sentiment.lower():
-            return False
-        if department and str(fb.get("department", "")).lower() != department.lower():
-            return False
-        return True
-
-    filtered = [fb for fb in feedbacks if _matches(fb)]
-
-    # counts
-    counts = {"total": len(feedbacks), "filtered": len(filtered)}
-
-    # department choices for the filter (use names)
-    dept_choices = sorted([v.get("name") for v in DEPARTMENT_MAP.values()])
-    return templates.TemplateResponse(
-        "admin.html",
-        {
-            "request": request,
-            "feedbacks": filtered,
-            "counts": counts,
-            "filters": {"category": category, "sentiment": sentiment, "department": department},
-            "departments": dept_choices,
-        },
-    )
+    _check_order(order)
+
+    def render():
+        filters = {"category": category, "sentiment": sentiment, "department": department}
+        search_pending = False
+        if q:
+            try:
+                filtered = storage.search(q, min(limit, MAX_PAGE_SIZE), **filters)
+            except storage.IndexNotReady:
+                filtered, search_pending = [], True
+            next_after, filtered_count = None, len(filtered)
+        else:
+            filtered, next_after = storage.page(min(limit, MAX_PAGE_SIZE), after_id, order, **filters)
+            filtered_count = storage.count(**filters)
+
+        # counts
+        counts = {"total": storage.count(), "filtered": filtered_count}
+        export_params = urlencode({k: v for k, v in filters.items() if v})
+        next_url = None
+        if next_after is not None:
+            params = {k: v for k, v in filters.items() if v}
+            params.update({"limit": limit, "after_id": next_after, "order": order})
+            next_url = "/admin?" + urlencode(params)
+
+        # department choices for the filter (use names)
+        dept_choices = sorted([v.get("name") for v in DEPARTMENT_MAP.values()])
+        return _render_template(
+            "admin.html",
+            {
+                "request": request,
+                "feedbacks": filtered,
+                "counts": counts,
+                "filters": {"category": category, "sentiment": sentiment, "department": department, "q": q},
+                "search_pending": search_pending,
+                "departments": dept_choices,
+                "next_url": next_url,
+                "clusters": storage.duplicate_clusters(ADMIN_DUPLICATE_CLUSTERS),
+                # new rows are only prepended live on the first newest-first page
+                "live_adds": not q and after_id is None and order == "desc",
+                "stream_url": "/admin/stream" + (f"?{export_params}" if export_params else ""),
+                "export_url": "/admin/export" + (f"?{export_params}" if export_params else ""),
+            },
+        )
+
+    if q:
+        # full-text ranking can take tens of milliseconds on a large store; keep it off the loop
+        return await run_in_threadpool(_cached_response, request, render)
+    return _cached_response(request, render)
 
 
 @app.post("/admin/feedback/{feedback_id}/update")
 async def admin_update_feedback(feedback_id: int, status: str = Form(...), note: str | None = Form(None)):
     """Admin action: update status for a feedback entry."""
-    updated = storage.update_feedback_status(feedback_id, status, note)
+    updated = await storage.update_feedback_status_async(feedback_id, status, note)
     # redirect back to admin list
     return RedirectResponse(url=f"/admin", status_code=303)
 
 
+async def _sse_stream(request: Request, sub: events.Subscription):
+    """Format bus events as SSE frames, with a comment heartbeat so idle proxies keep the connection."""
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), timeout=events.SSE_HEARTBEAT)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield b": ping\n\n"
+                continue
+            data = json.dumps(event, ensure_ascii=False)
+            yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {data}\n\n".encode("utf-8")
+            if event["type"] == "dropped":
+                return
+    finally:
+        sub.close()
+
+
+@app.get("/admin/stream")
+async def admin_stream(request: Request, category: str | None = None, department: str | None = None, sentiment: str | None = None):
+    """Server-sent events for new feedback ("add") and status changes ("status").
+
+    Only events matching the given filters are sent. A client that falls too far behind gets a
+    final "dropped" event and is disconnected; the admin page then reconnects and reloads.
+    """
+    sub = events.bus.subscribe(category=category, department=department, sentiment=sentiment)
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(_sse_stream(request, sub), media_type="text/event-stream", headers=headers)
+
+
+@app.post("/admin/keywords/reload")
+async def admin_reload_keywords():
+    """Rebuild the keyword matcher from KEYWORDS_FILE without restarting."""
+    try:
+        matcher = keywords.reload_keywords()
+    except Exception as ex:
+        raise HTTPException(status_code=400, detail=f"Failed to reload keywords: {ex}")
+    return JSONResponse({"categories": len(matcher.categories), "department_keywords": len(matcher.departments)})
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus text exposition of request/stage latency histograms and store counters."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/notifier/stats")
+async def notifier_stats():
+    """Outbox queue depth, delivery counts and SMTP connections opened."""
+    return JSONResponse(notifier.get_outbox().stats())
+
+
+@app.get("/api/classifier/stats")
+async def classifier_stats():
+    """Classifier resource load times and per-backend call timings."""
+    return JSONResponse(classifier_engine.stats())
+
+
 @app.get("/admin/export")
-async def admin_export():
-    csv_data = storage.export_feedbacks_csv()
-    return StreamingResponse(iter([csv_data.encode("utf-8")]), media_type="text/csv", headers={"Content-Disposition": "attachment; filename=feedbacks.csv"})
+async def admin_export(
+    category: str | None = None,
+    sentiment: str | None = None,
+    department: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    export_format: str = Query("csv", alias="format"),
+    gzip: bool = False,
+):
+    """Stream an export of the (optionally filtered) feedbacks as CSV or JSONL, optionally gzip-compressed."""
+    if export_format == "csv":
+        chunks, media_type = storage.iter_export_csv, "text/csv"
+    elif export_format == "jsonl":
+        chunks, media_type = storage.iter_export_jsonl, "application/x-ndjson"
+    else:
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'jsonl'")
+    filters = {"category": category, "sentiment": sentiment, "department": department}
+    body = (c.encode("utf-8") for c in chunks(date_from=date_from, date_to=date_to, **filters))
+    filename = f"feedbacks.{export_format}"
+    if gzip:
+        body = storage.gzip_chunks(body)
+        media_type = "application/gzip"
+        filename += ".gz"
+    return StreamingResponse(body, media_type=media_type, headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+
+@app.post("/admin/import")
+async def admin_import(request: Request, import_format: str = Query("csv", alias="format"), chunk: int = importer.IMPORT_CHUNK):
+    """Bulk-load historical feedback from a CSV (export columns) or JSONL request body, optionally gzipped.
+
+    The body is spooled to a temporary file, then imported in chunks; each chunk is classified in
+    one batch and committed at once. Existing labels are kept and no notifications are sent. The
+    response streams one JSON progress line per committed chunk.
+    """
+    if import_format not in importer.FORMATS:
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'jsonl'")
+    spool = tempfile.NamedTemporaryFile(prefix="feedback-import-", delete=False)
+    try:
+        with spool:
+            async for data in request.stream():
+                spool.write(data)
+    except BaseException:
+        os.unlink(spool.name)
+        raise
+
+    def progress():
+        imported = 0
+        try:
+            for report in importer.import_file(spool.name, import_format, chunk):
+                metrics.inc("imported", report["imported"] - imported)
+                imported = report["imported"]
+                yield json.dumps(report) + "\n"
+        except (ValueError, UnicodeDecodeError, csv.Error) as ex:
+            # rows committed before the bad line stay imported
+            yield json.dumps({"error": str(ex), "imported": imported, "done": False}) + "\n"
+        finally:
+            os.unlink(spool.name)
+
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
 
 
 @app.get("/dashboard")
 async def parent_dashboard(request: Request, parent: str | None = None):
     """Parent-facing dashboard. If `parent` query parameter is provided, filter feedbacks to that parent; otherwise show an overview."""
-    feedbacks = storage.list_feedbacks()
-    if parent:
-        fb_list = [f for f in feedbacks if (f.get("parent_name") or "").lower() == parent.lower()]
+
+    def render():
+        feedbacks = storage.list_feedbacks()
+        if parent:
+            fb_list = storage.query(parent_name=parent)
+        else:
+            fb_list = feedbacks
+
+        # summary counts and recent activity are maintained incrementally by storage
+        stats = storage.summary()
+        recent = storage.recent(5)
+
+        return _render_template(
+            "parent_dashboard.html",
+            {
+                "request": request,
+                "total": stats["total"],
+                "by_status": stats["by_status"],
+                "by_sentiment": stats["by_sentiment"],
+                "recent": recent,
+                "history": fb_list,
+            },
+        )
+
+    return _cached_response(request, render)
+
+
+def _classified_entry(payload: dict, meta: dict) -> dict:
+    """Combine submitted fields with classifier output and the routed department."""
+    with metrics.timer("route"):
+        dept = route_feedback(meta["category"], payload.get("text"))
+    return {
+        **payload,
+        "category": meta["category"],
+        "sentiment": meta["sentiment"],
+        "confidence": meta.get("confidence", 0.5),
+        "classifier": meta.get("tier"),
+        "department": dept.get("name"),
+        "department_email": dept.get("email"),
+    }
+
+
+# Near-duplicates of an earlier entry reuse its classification and/or skip the department email
+DEDUP_SKIP_LLM = os.getenv("DEDUP_SKIP_LLM", "true").lower() in ("1", "true", "yes")
+DEDUP_SKIP_NOTIFY = os.getenv("DEDUP_SKIP_NOTIFY", "true").lower() in ("1", "true", "yes")
+
+
+def _canonical_meta(canonical: dict) -> dict:
+    metrics.inc("dedup_llm_skipped")
+    return {"category": canonical.get("category"), "sentiment": canonical.get("sentiment"), "confidence": canonical.get("confidence", 0.5), "tier": "dedup"}
+
+
+def _notify_fields(duplicate: dict | None) -> dict:
+    if duplicate is not None and DEDUP_SKIP_NOTIFY:
+        return {"notified": False, "notify_status": "duplicate"}
+    return notifier.initial_fields()
+
+
+async def _store_submission(payload: dict) -> dict:
+    """Classify, route and store one submission, then queue its department notification."""
+    duplicate = storage.find_duplicate(payload.get("text")) if DEDUP_SKIP_LLM or DEDUP_SKIP_NOTIFY else None
+    if duplicate is not None and DEDUP_SKIP_LLM:
+        meta = _canonical_meta(duplicate)
     else:
-        fb_list = feedbacks
-
-    # summary counts
-    total = len(feedbacks)
-    by_status = {}
-    by_sentiment = {"positive": 0, "neutral": 0, "negative": 0}
-    for f in feedbacks:
-        st = f.get("status", "pending")
-        by_status[st] = by_status.get(st, 0) + 1
-        s = f.get("sentiment", "neutral")
-        if s in by_sentiment:
-            by_sentiment[s] += 1
-
-    # recent activity: sort by submitted desc and take latest 5
-    def _submitted_key(x):
-        return x.get("submitted") or ""
-
-    recent = sorted(feedbacks, key=_submitted_key, reverse=True)[:5]
-
-    return templates.TemplateResponse(
-        "parent_dashboard.html",
-        {
-            "request": request,
-            "total": total,
-            "by_status": by_status,
-            "by_sentiment": by_sentiment,
-            "recent": recent,
-            "history": fb_list,
-        },
-    )
+        with metrics.timer("classify"):
+            meta = await analyze_feedback_async(payload.get("text"))
+    entry = _classified_entry(payload, meta)
+    # notify the department in the background (simulated if SMTP not configured)
+    entry.update(_notify_fields(duplicate))
+    with metrics.timer("persist"):
+        saved = await storage.add_feedback_async(entry)
+    if saved.get("notify_status") != "duplicate":
+        with metrics.timer("notify_enqueue"):
+            notifier.queue_notification(saved)
+    return saved
 
 
 @app.post("/submit")
@@ -132,41 +460,127 @@ async def submit_form(
         "contact": contact,
         "text": text,
     }
-    meta = analyze_feedback(text)
-    dept = route_feedback(meta["category"], text)
-    entry = {
-        **payload,
-        "category": meta["category"],
-        "sentiment": meta["sentiment"],
-        "confidence": meta.get("confidence", 0.5),
-        "department": dept.get("name"),
-        "department_email": dept.get("email"),
-    }
-    # try to notify department (will be simulated if SMTP not configured)
-    notified = send_notification(entry)
-    entry["notified"] = bool(notified)
-    saved = storage.add_feedback(entry)
+    await _store_submission(payload)
     return RedirectResponse(url="/", status_code=303)
 
 
 @app.post("/api/feedback")
 async def api_feedback(item: FeedbackIn):
-    meta = analyze_feedback(item.text)
-    dept = route_feedback(meta["category"], item.text)
-    entry = {
-        **item.dict(),
-        "category": meta["category"],
-        "sentiment": meta["sentiment"],
-        "confidence": meta.get("confidence", 0.5),
-        "department": dept.get("name"),
-        "department_email": dept.get("email"),
-    }
-    notified = send_notification(entry)
-    entry["notified"] = bool(notified)
-    saved = storage.add_feedback(entry)
+    saved = await _store_submission(item.dict())
+    return JSONResponse(saved)
+
+
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "10000"))
+
+
+def _process_batch(payloads: List[dict]) -> List[dict]:
+    dedup = DEDUP_SKIP_LLM or DEDUP_SKIP_NOTIFY
+    duplicates = [storage.find_duplicate(p["text"]) if dedup else None for p in payloads]
+    to_classify = [i for i, d in enumerate(duplicates) if d is None or not DEDUP_SKIP_LLM]
+    metas = [None] * len(payloads)
+    with metrics.timer("classify_batch"):
+        for i, meta in zip(to_classify, analyze_feedback_batch([payloads[i]["text"] for i in to_classify])):
+            metas[i] = meta
+    for i, d in enumerate(duplicates):
+        if metas[i] is None:
+            metas[i] = _canonical_meta(d)
+    entries = [{**_classified_entry(p, m), **_notify_fields(d)} for p, m, d in zip(payloads, metas, duplicates)]
+    with metrics.timer("persist_batch"):
+        saved = storage.add_feedbacks(entries)
+    for entry in saved:
+        if entry.get("notify_status") != "duplicate":
+            notifier.queue_notification(entry)
+    return saved
+
+
+@app.post("/api/feedback/batch")
+async def api_feedback_batch(batch: FeedbackBatchIn):
+    """Classify, route, notify and store many feedback items in one request and one storage commit."""
+    if len(batch.items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds MAX_BATCH_SIZE ({MAX_BATCH_SIZE})")
+    saved = await run_in_threadpool(_process_batch, [item.dict() for item in batch.items])
     return JSONResponse(saved)
 
 
+@app.get("/api/analytics/trends")
+async def analytics_trends(
+    date_from: str | None = None,
+    date_to: str | None = None,
+    interval: str = "day",
+    group_by: str = "sentiment",
+    department: str | None = None,
+    category: str | None = None,
+    sentiment: str | None = None,
+    status: str | None = None,
+):
+    """Feedback counts per day or week (`interval`), split by `group_by`.
+
+    Answered from the per-day rollups kept by storage, so the cost depends on the number of
+    days in range rather than the number of stored feedbacks. Dates are YYYY-MM-DD, inclusive.
+    """
+    try:
+        series = storage.trends(date_from, date_to, interval, group_by, department=department, category=category, sentiment=sentiment, status=status)
+    except ValueError as ex:
+        raise HTTPException(status_code=400, detail=str(ex))
+    return JSONResponse({"interval": interval, "group_by": group_by, "series": series})
+
+
+@app.get("/api/search")
+async def api_search(
+    q: str,
+    limit: int = 20,
+    category: str | None = None,
+    sentiment: str | None = None,
+    department: str | None = None,
+    status: str | None = None,
+):
+    """Ranked full-text search over feedback title and text.
+
+    Free words are OR-ed and ranked with BM25; "quoted phrases" must match exactly. Results can
+    be narrowed with the same filters as /admin (plus status).
+    """
+    try:
+        # ranking a common term scores every posting; keep it off the event loop
+        results = await run_in_threadpool(
+            storage.search, q, min(max(1, limit), MAX_PAGE_SIZE), category=category, sentiment=sentiment, department=department, status=status
+        )
+    except storage.IndexNotReady as ex:
+        raise HTTPException(status_code=503, detail=str(ex), headers={"Retry-After": "1"})
+    return JSONResponse({"query": q, "count": len(results), "results": results})
+
+
 @app.get("/api/feedbacks")
-async def api_feedbacks():
-    return JSONResponse(storage.list_feedbacks())
+async def api_feedbacks(request: Request, limit: int | None = None, after_id: int | None = None, order: str = "asc", stream: bool = False):
+    """List feedbacks ordered by id.
+
+    Without `limit` the whole store is returned (as before). With `limit`, one page is returned
+    and the cursor for the next page is sent in the `X-Next-After-Id` header. `stream=true`
+    switches to NDJSON and yields records as they are read instead of building one array.
+    """
+    _check_order(order)
+    if stream:
+        def _ndjson():
+            # yield a few hundred records per chunk; each chunk is a threadpool hop for Starlette
+            buf = []
+            for i, fb in enumerate(storage.iter_feedbacks(order, after_id)):
+                if limit is not None and i >= limit:
+                    break
+                buf.append(json.dumps(fb, ensure_ascii=False))
+                if len(buf) >= 256:
+                    yield ("\n".join(buf) + "\n").encode("utf-8")
+                    buf = []
+            if buf:
+                yield ("\n".join(buf) + "\n").encode("utf-8")
+
+        etag = _etag(request)
+        if etag in parse_if_none_match(request.headers.get("if-none-match")):
+            return Response(status_code=304, headers={"ETag": etag})
+        return StreamingResponse(_ndjson(), media_type="application/x-ndjson", headers={"ETag": etag})
+
+    def render():
+        if limit is None and after_id is None and order == "asc":
+            return _render_json(storage.list_feedbacks())
+        items, next_after = storage.page(min(limit or MAX_PAGE_SIZE, MAX_PAGE_SIZE), after_id, order)
+        return _render_json(items, {"X-Next-After-Id": str(next_after)} if next_after is not None else {})
+
+    return _cached_response(request, render)
@@ -0,0 +1,174 @@
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Tuple, Iterable
+
+# Set METRICS_ENABLED=false to turn every timer/counter into a no-op
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key: LabelKey, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _fmt_value(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, v in sorted(self._values.items()):
+                lines.append(f"{self.name}{_fmt_labels(key)} {_fmt_value(v)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name, self.help = name, help
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, List[float]] = {}  # bucket counts..., sum, count
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, n in zip(self.buckets, series):
+                    cumulative += n
+                    lines.append(f"{self.name}_bucket{_fmt_labels(key, [('le', repr(bound))])} {cumulative}")
+                lines.append(f"{self.name}_bucket{_fmt_labels(key, [('le', '+Inf')])} {series[-1]}")
+                lines.append(f"{self.name}_sum{_fmt_labels(key)} {series[-2]!r}")
+                lines.append(f"{self.name}_count{_fmt_labels(key)} {series[-1]}")
+        return lines
+
+
+class GaugeCallback:
+    """Gauge whose samples are computed at scrape time, so the hot path pays nothing."""
+
+    def __init__(self, name: str, help: str, fn: Callable[[], Dict[LabelKey, float] | float], kind: str = "gauge"):
+        self.name, self.help, self.fn, self.kind = name, help, fn, kind
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            samples = self.fn()
+        except Exception:
+            return []
+        if not isinstance(samples, dict):
+            samples = {(): samples}
+        for key, v in sorted(samples.items()):
+            lines.append(f"{self.name}{_fmt_labels(key)} {_fmt_value(v)}")
+        return lines
+
+
+_registry: Dict[str, object] = {}
+_registry_lock = threading.Lock()
+
+
+def _register(metric):
+    with _registry_lock:
+        return _registry.setdefault(metric.name, metric)
+
+
+def counter(name: str, help: str) -> Counter:
+    return _register(Counter(name, help))
+
+
+def histogram(name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help, buckets))
+
+
+def gauge_callback(name: str, help: str, fn: Callable[[], Dict[LabelKey, float] | float], kind: str = "gauge") -> GaugeCallback:
+    """Register (or replace) a scrape-time gauge. Label keys are built with labels(...)."""
+    metric = GaugeCallback(name, help, fn, kind)
+    with _registry_lock:
+        _registry[name] = metric
+    return metric
+
+
+def labels(**kw) -> LabelKey:
+    return _labels(kw)
+
+
+# Built-in series
+REQUEST_SECONDS = histogram("http_request_duration_seconds", "HTTP request latency by method, route and status")
+STAGE_SECONDS = histogram("feedback_stage_duration_seconds", "Latency of each submission pipeline stage")
+EVENTS = counter("feedback_events_total", "Pipeline events (classifier backend used, fallbacks, notifications)")
+
+
+def observe_stage(stage: str, seconds: float, **extra):
+    if METRICS_ENABLED:
+        STAGE_SECONDS.observe(seconds, stage=stage, **extra)
+
+
+def inc(event: str, amount: float = 1, **extra):
+    if METRICS_ENABLED:
+        EVENTS.inc(amount, event=event, **extra)
+
+
+@contextmanager
+def _stage_timer(stage: str, extra: Dict[str, object]):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - t0, stage=stage, **extra)
+
+
+_NOOP = nullcontext()
+
+
+def timer(stage: str, **extra):
+    """Context manager timing one pipeline stage; a shared no-op when metrics are disabled."""
+    if not METRICS_ENABLED:
+        return _NOOP
+    return _stage_timer(stage, extra)
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines: List[str] = []
+    for m in metrics:
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
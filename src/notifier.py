@@ -0,0 +1,279 @@
+import heapq
+import itertools
+import os
+import smtplib
+import threading
+import time
+from typing import Dict, List, Any
+
+from . import metrics
+from . import storage
+from .routing import _smtp_settings, _smtp_connect, _build_message, _simulate
+
+# Background notification delivery: worker threads, pooled SMTP connections, retry policy
+NOTIFY_WORKERS = int(os.getenv("NOTIFY_WORKERS", "2"))
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "2"))
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "5"))
+NOTIFY_BACKOFF_BASE = float(os.getenv("NOTIFY_BACKOFF_BASE", "2"))
+NOTIFY_BACKOFF_MAX = float(os.getenv("NOTIFY_BACKOFF_MAX", "300"))
+# How long a worker's claim on a notification lasts without being renewed by a send attempt;
+# after that another worker (or a restarted process) may take it over. Keep above NOTIFY_BACKOFF_MAX.
+NOTIFY_CLAIM_TTL = float(os.getenv("NOTIFY_CLAIM_TTL", "900"))
+
+
+class SMTPPool:
+    """A small pool of connected, authenticated SMTP sessions reused across sends."""
+
+    def __init__(self, cfg: Dict[str, Any], size: int = SMTP_POOL_SIZE):
+        self.cfg = cfg
+        self.size = max(1, size)
+        self._idle: List[smtplib.SMTP] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self.connects = 0
+
+    def acquire(self) -> smtplib.SMTP:
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    server = self._idle.pop() if self._idle else None
+                if server is None:
+                    server = _smtp_connect(self.cfg)
+                    self.connects += 1
+                    return server
+                try:
+                    if server.noop()[0] == 250:
+                        return server
+                except Exception:
+                    pass
+                self._discard(server)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, server: smtplib.SMTP, broken: bool = False):
+        if broken:
+            self._discard(server)
+        else:
+            with self._lock:
+                self._idle.append(server)
+        self._slots.release()
+
+    def _discard(self, server: smtplib.SMTP):
+        try:
+            server.close()
+        except Exception:
+            pass
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server in idle:
+            try:
+                server.quit()
+            except Exception:
+                self._discard(server)
+
+
+class Outbox:
+    """Queue of feedback ids awaiting notification, drained by background worker threads.
+
+    Each delivery attempt uses a pooled SMTP connection. Failures are retried with exponential
+    backoff up to NOTIFY_MAX_ATTEMPTS; the outcome is written back to the entry as
+    `notified` / `notify_status` ("queued", "sending", "sent", "failed"). Before each attempt
+    the entry is claimed atomically in the store (storage.claim_notification), so with several
+    workers sharing a SQLite database only one of them sends it. Because the status is persisted
+    with the entry, unfinished notifications are re-enqueued by recover() after a restart.
+    """
+
+    def __init__(self, workers: int = NOTIFY_WORKERS, cfg: Dict[str, Any] | None = None):
+        self.cfg = cfg or _smtp_settings()
+        self.workers = max(1, workers)
+        self.pool = SMTPPool(self.cfg)
+        self._heap: List[tuple] = []  # (due, seq, feedback_id, attempt)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._in_flight = 0
+        self._stopping = False
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.cfg.get("host"))
+
+    def start(self):
+        with self._cond:
+            if self._threads:
+                return
+            self._stopping = False
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker, name=f"notify-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def stop(self, timeout: float | None = 5.0):
+        """Stop the workers after the in-flight sends; unsent items are left for recover()."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+        self.pool.close()
+
+    def enqueue(self, entry: Dict[str, Any]):
+        """Schedule a notification for a stored entry. Without SMTP config it is simulated inline."""
+        if not self.enabled:
+            _simulate(entry)
+            return
+        self._push(entry["id"], 1, 0.0)
+        self.start()
+
+    def recover(self) -> int:
+        """Re-enqueue entries whose notification was unfinished when the process stopped.
+
+        Entries claimed by another worker are scheduled for when that claim expires; the claim
+        check at delivery time skips them if that worker has finished or renewed it by then.
+        """
+        if not self.enabled:
+            return 0
+        now = time.time()
+        n = 0
+        for fb in storage.list_feedbacks():
+            status = fb.get("notify_status")
+            if status == "queued":
+                self._push(fb["id"], 1, 0.0)
+            elif status == "sending":
+                self._push(fb["id"], 1, max(0.0, (fb.get("notify_claimed") or 0) + NOTIFY_CLAIM_TTL - now))
+            else:
+                continue
+            n += 1
+        if n:
+            self.start()
+        return n
+
+    def _push(self, feedback_id: int, attempt: int, delay: float):
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), feedback_id, attempt))
+            self._cond.notify()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._heap) + self._in_flight
+
+    def join(self, timeout: float = 10.0) -> bool:
+        """Wait until the queue is drained (used by tests and on shutdown). Returns True if empty."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.pending() == 0:
+                return True
+            time.sleep(0.01)
+        return self.pending() == 0
+
+    def _next_job(self):
+        with self._cond:
+            while not self._stopping:
+                if self._heap:
+                    wait = self._heap[0][0] - time.monotonic()
+                    if wait <= 0:
+                        _, _, fid, attempt = heapq.heappop(self._heap)
+                        self._in_flight += 1
+                        return fid, attempt
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+            return None
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                self._deliver(*job)
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+
+    def _deliver(self, feedback_id: int, attempt: int):
+        entry = storage.claim_notification(feedback_id, NOTIFY_CLAIM_TTL)
+        if entry is None:
+            # gone, or being (or already) sent by another worker
+            metrics.inc("notification_claim_skipped")
+            return
+        try:
+            server = self.pool.acquire()
+        except Exception as ex:
+            self._retry(feedback_id, attempt, ex)
+            return
+        t0 = time.perf_counter()
+        try:
+            server.send_message(_build_message(entry, self.cfg["from_addr"]))
+        except Exception as ex:
+            metrics.inc("notification_send_error")
+            self.pool.release(server, broken=isinstance(ex, (smtplib.SMTPServerDisconnected, OSError)))
+            self._retry(feedback_id, attempt, ex)
+            return
+        self.pool.release(server)
+        metrics.observe_stage("smtp_send", time.perf_counter() - t0)
+        self.sent += 1
+        print(f"[Notifier] Sent email to {entry.get('department_email')}")
+        storage.set_feedback_fields(feedback_id, notified=True, notify_status="sent")
+
+    def _retry(self, feedback_id: int, attempt: int, ex: Exception):
+        if attempt >= NOTIFY_MAX_ATTEMPTS:
+            self.failed += 1
+            print(f"[Notifier] Giving up on feedback {feedback_id} after {attempt} attempts: {ex}")
+            storage.set_feedback_fields(feedback_id, notified=False, notify_status="failed")
+            return
+        self.retries += 1
+        delay = min(NOTIFY_BACKOFF_MAX, NOTIFY_BACKOFF_BASE ** attempt)
+        print(f"[Notifier] Send failed for feedback {feedback_id} (attempt {attempt}), retrying in {delay:.1f}s: {ex}")
+        self._push(feedback_id, attempt + 1, delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "pending": self.pending(),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "smtp_connects": self.pool.connects,
+        }
+
+
+_outbox: Outbox | None = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox() -> Outbox:
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = Outbox()
+        return _outbox
+
+
+def reset_outbox(outbox: Outbox | None = None) -> Outbox | None:
+    """Replace the process-wide outbox (stopping the old one); returns the new one."""
+    global _outbox
+    with _outbox_lock:
+        old, _outbox = _outbox, outbox
+    if old is not None:
+        old.stop()
+    return outbox
+
+
+def queue_notification(entry: Dict[str, Any]):
+    get_outbox().enqueue(entry)
+
+
+def initial_fields() -> Dict[str, Any]:
+    """Notification fields for a new entry, before it is stored."""
+    if get_outbox().enabled:
+        return {"notified": False, "notify_status": "queued"}
+    return {"notified": False}
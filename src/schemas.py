@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 from enum import Enum
 
 
@@ -21,6 +21,10 @@ class FeedbackIn(BaseModel):
     text: str = Field(..., description="Feedback text from parent")
 
 
+class FeedbackBatchIn(BaseModel):
+    items: List[FeedbackIn] = Field(..., description="Feedback items to classify and store together")
+
+
 class FeedbackOut(FeedbackIn):
     id: int
     category: Category
@@ -0,0 +1,134 @@
+import heapq
+import math
+import re
+from typing import Callable, Dict, List, Any, Tuple
+
+# Very common words are skipped when indexing; they still count for phrase positions
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have i in is it its my of on or our so that the their this to was we were with".split()
+)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_QUERY = re.compile(r'"([^"]+)"|(\S+)')
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# Position gap between title and text so phrases never span the two fields
+_FIELD_GAP = 100
+
+
+def tokenize(text: str | None) -> List[Tuple[int, str]]:
+    """(position, token) pairs for the non-stopword tokens of `text`, lowercased."""
+    return [(i, t) for i, t in enumerate(_TOKEN.findall((text or "").lower())) if t not in STOPWORDS]
+
+
+def parse_query(q: str) -> Tuple[List[str], List[List[Tuple[int, str]]]]:
+    """Split a query into free terms and quoted phrases (each phrase as (offset, token) pairs)."""
+    terms: List[str] = []
+    phrases: List[List[Tuple[int, str]]] = []
+    for phrase, word in _QUERY.findall(q or ""):
+        if phrase:
+            toks = tokenize(phrase)
+            if len(toks) == 1:
+                terms.append(toks[0][1])
+            elif toks:
+                phrases.append(toks)
+        else:
+            terms.extend(t for _, t in tokenize(word))
+    return terms, phrases
+
+
+class InvertedIndex:
+    """Positional inverted index over feedback `title` + `text`, ranked with BM25.
+
+    Documents are added incrementally; postings map term -> {doc id: [positions]}.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, List[int]]] = {}
+        self.doc_len: Dict[int, int] = {}
+        self._total_len = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    def clear(self):
+        self.postings.clear()
+        self.doc_len.clear()
+        self._total_len = 0
+
+    def add(self, doc_id: int, title: str | None, text: str | None):
+        if doc_id in self.doc_len:
+            return
+        tokens = tokenize(title) + [(p + _FIELD_GAP + len(title or ""), t) for p, t in tokenize(text)]
+        for pos, tok in tokens:
+            self.postings.setdefault(tok, {}).setdefault(doc_id, []).append(pos)
+        self.doc_len[doc_id] = len(tokens)
+        self._total_len += len(tokens)
+
+    def _has_phrase(self, doc_id: int, phrase: List[Tuple[int, str]]) -> bool:
+        first_off, first_tok = phrase[0]
+        for start in self.postings[first_tok][doc_id]:
+            if all(start + (off - first_off) in self.postings[tok][doc_id] for off, tok in phrase[1:]):
+                return True
+        return False
+
+    def search(self, q: str, limit: int = 20, accept: Callable[[int], bool] | None = None) -> List[Tuple[int, float]]:
+        """Top `limit` (doc id, score) pairs for `q`, best first.
+
+        Free terms are OR-ed and ranked with BM25; every quoted phrase must appear. If
+        `accept` is given, only ids for which it returns True are considered.
+        """
+        terms, phrases = parse_query(q)
+        phrase_terms = [t for ph in phrases for _, t in ph]
+        if not terms and not phrases:
+            return []
+        if any(t not in self.postings for t in phrase_terms):
+            return []
+
+        if phrases:
+            # docs containing every phrase token, then check positions
+            sets = sorted((self.postings[t] for t in phrase_terms), key=len)
+            docs = [d for d in sets[0] if all(d in s for s in sets[1:]) and (accept is None or accept(d))]
+            allowed = {d for d in docs if all(self._has_phrase(d, ph) for ph in phrases)}
+            if not allowed:
+                return []
+        else:
+            allowed = None
+
+        n = len(self.doc_len)
+        doc_len = self.doc_len
+        # BM25 length normalization K1 * (1 - B + B * dl / avgdl), split into a constant and a per-doc slope
+        norm_base = K1 * (1 - B)
+        norm_slope = K1 * B / ((self._total_len / n) if n and self._total_len else 1)
+        k1p = K1 + 1
+        scores: Dict[int, float] = {}
+        rejected: set = set()
+        for t in dict.fromkeys(terms + phrase_terms):
+            posting = self.postings.get(t)
+            if not posting:
+                continue
+            df = len(posting)
+            w = math.log(1 + (n - df + 0.5) / (df + 0.5)) * k1p
+            if allowed is not None:
+                # phrase queries: only the (few) docs that matched every phrase
+                items = ((d, posting[d]) for d in allowed if d in posting)
+            else:
+                items = posting.items()
+            # term-at-a-time: each posting list is walked once and BM25 accumulated per doc
+            for d, positions in items:
+                if accept is not None and allowed is None and d not in scores:
+                    if d in rejected:
+                        continue
+                    if not accept(d):
+                        rejected.add(d)
+                        continue
+                tf = len(positions)
+                scores[d] = scores.get(d, 0.0) + w * tf / (tf + norm_base + norm_slope * doc_len[d])
+        # bounded heap: only the best `limit` are kept, no full sort; ties go to the higher id
+        return [(d, sc) for sc, d in heapq.nlargest(limit, ((sc, d) for d, sc in scores.items()))]
+
+
+def index_entry(index: InvertedIndex, fb: Dict[str, Any]):
+    index.add(fb["id"], fb.get("title"), fb.get("text"))
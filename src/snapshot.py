@@ -0,0 +1,130 @@
+import argparse
+import json
+import marshal
+import mmap
+import struct
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Iterator, Tuple
+
+# Binary snapshot layout (little-endian):
+#   header   magic, marshal version, record count, next id, fields offset, table offset
+#   records  one marshal-encoded tuple of values per entry, in id order
+#   fields   marshal-encoded tuple of field names (values line up with it; ... = absent)
+#   table    (id, offset, length) per record
+MAGIC = b"FBSNAP01"
+_HEADER = struct.Struct("<8sIIQQQ")
+_ENTRY = struct.Struct("<QQI")
+_ABSENT = ...
+
+
+def encode(entries: Iterable[Dict[str, Any]], next_id: int) -> bytes:
+    """Serialize entries (sorted by id) into the binary snapshot format."""
+    entries = sorted(entries, key=lambda fb: fb["id"])
+    fields: Dict[str, None] = {}
+    for fb in entries:
+        for k in fb:
+            fields.setdefault(k, None)
+    names = tuple(fields)
+    chunks: List[bytes] = []
+    table: List[bytes] = []
+    offset = _HEADER.size
+    for fb in entries:
+        rec = marshal.dumps(tuple(fb.get(k, _ABSENT) for k in names))
+        table.append(_ENTRY.pack(int(fb["id"]), offset, len(rec)))
+        chunks.append(rec)
+        offset += len(rec)
+    fields_blob = marshal.dumps(names)
+    header = _HEADER.pack(MAGIC, marshal.version, len(entries), int(next_id), offset, offset + len(fields_blob))
+    return b"".join([header, *chunks, fields_blob, *table])
+
+
+def is_snapshot(path: str | Path) -> bool:
+    try:
+        with open(path, "rb") as fh:
+            return fh.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class SnapshotReader:
+    """Memory-mapped binary snapshot, decoded one record at a time while iterating.
+
+    `count` and `next_id` come from the header and `ids` from the offset table, so neither
+    requires decoding a record.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._fh = open(self.path, "rb")
+        try:
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._fh.close()
+            raise ValueError(f"{self.path} is not a feedback snapshot")
+        magic, mversion, self.count, self.next_id, fields_off, table_off = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a feedback snapshot")
+        if mversion > marshal.version:
+            self.close()
+            raise ValueError(f"{self.path} was written by a newer Python (marshal v{mversion})")
+        self._view = memoryview(self._mm)
+        self.fields: Tuple[str, ...] = marshal.loads(self._view[fields_off:table_off])
+        table = list(_ENTRY.iter_unpack(self._view[table_off : table_off + self.count * _ENTRY.size]))
+        self.ids = [t[0] for t in table]
+        self._spans = [(t[1], t[2]) for t in table]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self):
+        view = getattr(self, "_view", None)
+        if view is not None:
+            view.release()
+            self._view = None
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        fields, view = self.fields, self._view
+        for off, n in self._spans:
+            values = marshal.loads(view[off : off + n])
+            if _ABSENT in values:
+                yield {k: v for k, v in zip(fields, values) if v is not _ABSENT}
+            else:
+                yield dict(zip(fields, values))
+
+
+def read(path: str | Path) -> Tuple[List[Dict[str, Any]], int]:
+    """All entries of a binary snapshot plus the stored next id."""
+    with SnapshotReader(path) as snap:
+        return list(snap), snap.next_id
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert feedback snapshots between JSON and the binary format")
+    parser.add_argument("source", help="feedbacks.json or a .snap file")
+    parser.add_argument("dest", help="output path")
+    args = parser.parse_args(argv)
+
+    if is_snapshot(args.source):
+        entries, _ = read(args.source)
+        data = json.dumps(entries, indent=2, ensure_ascii=False).encode("utf-8")
+    else:
+        entries = json.loads(Path(args.source).read_text(encoding="utf-8"))
+        data = encode(entries, max((fb.get("id", 0) for fb in entries), default=0) + 1)
+    Path(args.dest).write_bytes(data)
+    print(f"[Snapshot] Wrote {len(entries)} feedbacks to {args.dest}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,282 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Iterable, Tuple
+
+# SQLite settings for STORAGE_MODE=sqlite
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "FULL").upper()
+SQLITE_BUSY_TIMEOUT = float(os.getenv("SQLITE_BUSY_TIMEOUT", "30"))
+# Change-log rows kept for other processes to catch up from; a process that falls further
+# behind than this reloads the whole table instead
+SQLITE_CHANGES_KEEP = int(os.getenv("SQLITE_CHANGES_KEEP", "100000"))
+
+# Columns copied out of the JSON document so they can be indexed and queried in SQL
+COLUMNS = ("status", "category", "sentiment", "department", "parent_name", "submitted")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedbacks (
+    id INTEGER PRIMARY KEY,
+    status TEXT,
+    category TEXT,
+    sentiment TEXT,
+    department TEXT,
+    parent_name TEXT,
+    submitted TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS feedbacks_status ON feedbacks(status);
+CREATE INDEX IF NOT EXISTS feedbacks_category ON feedbacks(category);
+CREATE INDEX IF NOT EXISTS feedbacks_sentiment ON feedbacks(sentiment);
+CREATE INDEX IF NOT EXISTS feedbacks_department ON feedbacks(department);
+CREATE INDEX IF NOT EXISTS feedbacks_parent_name ON feedbacks(parent_name);
+CREATE INDEX IF NOT EXISTS feedbacks_submitted ON feedbacks(submitted);
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    origin TEXT NOT NULL,
+    feedback_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('next_id', 1);
+"""
+
+
+def _row(fb: Dict[str, Any]) -> tuple:
+    return (fb["id"],) + tuple(fb.get(c) for c in COLUMNS) + (json.dumps(fb, ensure_ascii=False),)
+
+
+_UPSERT = f"INSERT OR REPLACE INTO feedbacks (id, {', '.join(COLUMNS)}, data) VALUES ({', '.join('?' * (len(COLUMNS) + 2))})"
+_INSERT = _UPSERT.replace("OR REPLACE", "OR IGNORE")
+
+
+class SQLiteBackend:
+    """Feedback table in an SQLite database (WAL mode) shared by several processes.
+
+    Each process keeps its in-memory indexes as a cache of the table. Every committed mutation
+    also appends (origin, feedback id) to the `changes` table; other processes poll it cheaply
+    (PRAGMA data_version) and re-read the rows that changed. Ids are handed out from the
+    `meta` table so concurrent workers never collide.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # _read is used under the storage lock (sync); _write by the commit writer; _claim for id
+        # reservation and notification claims, which may wait on other workers' transactions and
+        # so must not run while the storage lock is held
+        self._read = self._connect("OFF")
+        self._write = self._connect(SQLITE_SYNCHRONOUS)
+        self._write_lock = threading.Lock()
+        self._claim = self._connect("OFF")
+        self._claim_lock = threading.Lock()
+        self._data_version = None
+        self._commits = 0
+        with self._write_lock:
+            self._write.executescript(SCHEMA)
+
+    def _connect(self, synchronous: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # the id-reservation connection does not need its own fsync: a reservation only
+        # matters once a commit that uses it has been synced, and the WAL is synced in order
+        conn.execute(f"PRAGMA synchronous={synchronous}")
+        return conn
+
+    def close(self):
+        for conn in (self._read, self._write, self._claim):
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def is_empty(self) -> bool:
+        return self._read.execute("SELECT 1 FROM feedbacks LIMIT 1").fetchone() is None
+
+    def load(self) -> Tuple[List[Dict[str, Any]], int]:
+        """All entries in id order, plus the change-log position they reflect."""
+        conn = self._read
+        conn.execute("BEGIN")
+        try:
+            seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+            entries = [json.loads(data) for (data,) in conn.execute("SELECT data FROM feedbacks ORDER BY id")]
+        finally:
+            conn.execute("COMMIT")
+        self._data_version = self._version()
+        return entries, seq
+
+    def import_entries(self, entries: Iterable[Dict[str, Any]], only_if_empty: bool = False) -> int:
+        """Bulk upsert entries in one transaction (used for migration and full snapshots)."""
+        entries = list(entries)
+        with self._write_lock:
+            conn = self._write
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if only_if_empty and conn.execute("SELECT 1 FROM feedbacks LIMIT 1").fetchone() is not None:
+                    conn.execute("ROLLBACK")
+                    return 0
+                conn.executemany(_UPSERT, (_row(fb) for fb in entries))
+                conn.executemany("INSERT INTO changes (origin, feedback_id) VALUES (?, ?)", ((self.origin, fb["id"]) for fb in entries))
+                self._bump_next_id(conn, entries)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return len(entries)
+
+    def _bump_next_id(self, conn: sqlite3.Connection, entries: List[Dict[str, Any]]):
+        if entries:
+            top = max(int(fb["id"]) for fb in entries) + 1
+            conn.execute("UPDATE meta SET value = MAX(value, ?) WHERE key = 'next_id'", (top,))
+
+    def reserve_ids(self, n: int) -> int:
+        """Reserve `n` consecutive ids and return the first. Do not call with the storage lock held."""
+        with self._claim_lock:
+            conn = self._claim
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                first = conn.execute("SELECT value FROM meta WHERE key = 'next_id'").fetchone()[0]
+                conn.execute("UPDATE meta SET value = ? WHERE key = 'next_id'", (first + n,))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return first
+
+    def update_if(self, feedback_id: int, claimable: Callable[[Dict[str, Any]], bool], fields: Dict[str, Any]) -> Dict[str, Any] | None:
+        """Set `fields` on an entry if `claimable(entry)` holds, atomically across workers.
+
+        Returns the updated entry, or None if it does not exist or was not claimable.
+        Do not call with the storage lock held.
+        """
+        with self._claim_lock:
+            conn = self._claim
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                cur = conn.execute("SELECT data FROM feedbacks WHERE id = ?", (feedback_id,)).fetchone()
+                fb = json.loads(cur[0]) if cur else None
+                if fb is None or not claimable(fb):
+                    conn.execute("ROLLBACK")
+                    return None
+                fb.update(fields)
+                conn.execute(_UPSERT, _row(fb))
+                conn.execute("INSERT INTO changes (origin, feedback_id) VALUES (?, ?)", (self.origin, feedback_id))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return fb
+
+    def write(self, ops: List[Dict[str, Any]]) -> int:
+        """Apply journal-style ops (add/status/set) in one transaction. Returns bytes written."""
+        written = 0
+        with self._write_lock:
+            conn = self._write
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                added = []
+                for op in ops:
+                    kind = op.get("op")
+                    if kind == "add":
+                        fb = op["entry"]
+                        row = _row(fb)
+                        conn.execute(_INSERT, row)
+                        added.append(fb)
+                        fid = fb["id"]
+                    else:
+                        fid = op["id"]
+                        cur = conn.execute("SELECT data FROM feedbacks WHERE id = ?", (fid,)).fetchone()
+                        if cur is None:
+                            continue
+                        fb = json.loads(cur[0])
+                        if kind == "status":
+                            # applied against the stored row, so concurrent updates from
+                            # different workers both land in the history; the add record may
+                            # already carry this change if it was serialized after it
+                            history = fb.setdefault("history", [])
+                            if op["rec"] in history:
+                                continue
+                            fb["status"] = op["status"]
+                            history.append(op["rec"])
+                        elif kind == "set":
+                            fb.update(op["fields"])
+                        else:
+                            continue
+                        row = _row(fb)
+                        conn.execute(_UPSERT, row)
+                    written += len(row[-1])
+                    conn.execute("INSERT INTO changes (origin, feedback_id) VALUES (?, ?)", (self.origin, fid))
+                self._bump_next_id(conn, added)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            self._commits += 1
+            if self._commits % 1000 == 0:
+                self._trim()
+        return written
+
+    def _version(self) -> int:
+        return self._read.execute("PRAGMA data_version").fetchone()[0]
+
+    def changed(self) -> bool:
+        """True if another connection has committed since the last call (cheap; no table read)."""
+        v = self._version()
+        if v == self._data_version:
+            return False
+        self._data_version = v
+        return True
+
+    def changes_since(self, seq: int) -> Tuple[List[tuple], int]:
+        """(seq, origin, feedback_id) rows after `seq`, and the oldest seq still retained."""
+        conn = self._read
+        conn.execute("BEGIN")
+        try:
+            oldest = conn.execute("SELECT COALESCE(MIN(seq), 0) FROM changes").fetchone()[0]
+            rows = conn.execute("SELECT seq, origin, feedback_id FROM changes WHERE seq > ? ORDER BY seq", (seq,)).fetchall()
+        finally:
+            conn.execute("COMMIT")
+        return rows, oldest
+
+    def fetch(self, ids: Iterable[int]) -> List[Dict[str, Any]]:
+        ids = sorted(set(ids))
+        out: List[Dict[str, Any]] = []
+        for i in range(0, len(ids), 500):
+            part = ids[i : i + 500]
+            q = f"SELECT data FROM feedbacks WHERE id IN ({', '.join('?' * len(part))}) ORDER BY id"
+            out.extend(json.loads(data) for (data,) in self._read.execute(q, part))
+        return out
+
+    def _trim(self):
+        self._write.execute("DELETE FROM changes WHERE seq <= (SELECT MAX(seq) FROM changes) - ?", (SQLITE_CHANGES_KEEP,))
+
+    def checkpoint(self):
+        """Trim the change log and fold the WAL back into the main database file."""
+        with self._write_lock:
+            self._trim()
+            self._write.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def main(argv: List[str] | None = None) -> int:
+    """One-shot migration of data/feedbacks.json (plus any pending journal) into SQLite."""
+    from . import storage
+
+    parser = argparse.ArgumentParser(description="Migrate the JSON/journal feedback store into SQLite")
+    parser.add_argument("--data-file", default=str(storage.DATA_FILE), help="JSON snapshot to migrate (journal files next to it are replayed)")
+    args = parser.parse_args(argv)
+
+    storage.DATA_FILE = Path(args.data_file)
+    storage.STORAGE_MODE = "sqlite"
+    storage.load_feedbacks()
+    print(f"[Storage] {storage.count()} feedbacks in {storage.sqlite_path()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,79 +1,946 @@
+import asyncio
+import bisect
+import heapq
 import json
-from typing import List, Dict, Any
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
 from pathlib import Path
 from datetime import datetime
 
+from . import analytics
+from . import dedup
+from . import events
+from . import metrics
+from . import search as fulltext
+from . import snapshot
+from .sqlite_backend import SQLiteBackend
+
 DATA_FILE = Path(__file__).resolve().parents[1] / "data" / "feedbacks.json"
 
+# Storage mode: "journal" appends one JSONL record per mutation and periodically
+# compacts into the DATA_FILE snapshot; "json" rewrites DATA_FILE on every write;
+# "sqlite" keeps entries in an SQLite database (WAL) that several worker processes can share.
+STORAGE_MODE = os.getenv("STORAGE_MODE", "journal").lower()
+# Snapshot format for the journal/json modes: "json" (DATA_FILE) or "binary" (DATA_FILE with a
+# .snap suffix: compact, memory-mapped, with the next id in its header; see src/snapshot.py)
+SNAPSHOT_FORMAT = os.getenv("SNAPSHOT_FORMAT", "json").lower()
+# Journal size (bytes) after which a background compaction is started
+JOURNAL_COMPACT_BYTES = int(os.getenv("JOURNAL_COMPACT_BYTES", str(4 * 1024 * 1024)))
+# Group commit: mutations arriving within this window (ms) share one durable flush
+GROUP_COMMIT_WINDOW_MS = float(os.getenv("GROUP_COMMIT_WINDOW_MS", "2"))
+GROUP_COMMIT_MAX_OPS = int(os.getenv("GROUP_COMMIT_MAX_OPS", "1000"))
+
 # In-memory store
 _feedbacks: List[Dict[str, Any]] = []
 _next_id = 1
 
+# Fields with a case-normalized secondary index (field -> value -> ordered set of ids)
+INDEXED_FIELDS = ("category", "sentiment", "department", "status", "parent_name")
+_by_id: Dict[int, Dict[str, Any]] = {}
+# All ids in ascending order, for cursor pagination
+_ids: List[int] = []
+_indexes: Dict[str, Dict[str, Dict[int, None]]] = {f: {} for f in INDEXED_FIELDS}
+
+# Full-text index over title + text, updated on every add. It and the duplicate index below are
+# built by a background thread after each (re)load (see _start_index_build), so neither startup
+# nor the first request pays for them.
+_search_index = fulltext.InvertedIndex()
+_search_ready = False
+_index_gen = 0
+_indexer: threading.Thread | None = None
+
+# Running aggregates for the dashboard, kept in step with every add/status change
+RECENT_WINDOW = int(os.getenv("RECENT_WINDOW", "50"))
+_by_status: Dict[str, int] = {}
+_by_sentiment: Dict[str, int] = {}
+# Most recent entries by (submitted, id), ascending, at most RECENT_WINDOW long
+_recent: List[tuple] = []
+# Per-day trend counts (see analytics.Rollups)
+_rollups = analytics.Rollups()
+
+# Near-duplicate clusters: canonical id -> ids linked to it, in arrival order
+_dedup_index = dedup.DuplicateIndex()
+_clusters: Dict[int, List[int]] = {}
+_dedup_ready = False
+
+# _lock guards the in-memory store, _journal_lock the journal file handle. Lock order is
+# _snapshot_lock -> _lock -> _journal_lock; snapshot writers take _snapshot_lock first so a
+# compaction can serialize outside _lock, and the commit writer only needs _journal_lock.
+_lock = threading.RLock()
+_snapshot_lock = threading.RLock()
+_journal_lock = threading.Lock()
+_journal_fh = None
+_compactor: threading.Thread | None = None
+
+# Mutations are applied in memory under _lock and their journal records queued, in order, for
+# the writer thread, which coalesces them into group commits.
+_commit_queue: "queue.Queue[tuple]" = queue.Queue()
+_writer: threading.Thread | None = None
+_writer_lock = threading.Lock()
+commit_stats = {"commits": 0, "ops": 0, "bytes": 0}
+
+# Store version, bumped on every change so readers can cache output derived from the store.
+# It only ever grows within a process; INSTANCE tells processes (and restarts) apart.
+_version = 0
+INSTANCE = uuid.uuid4().hex[:12]
+
+# STORAGE_MODE=sqlite: the shared database, and the change-log position this process has seen
+_backend: SQLiteBackend | None = None
+_backend_seq = 0
+# Ids with local ops still queued for the writer (so the database row lacks them yet), and ids
+# whose change from another worker was deferred because of that; they are re-read once flushed
+_pending_writes: Dict[int, int] = {}
+_pending_lock = threading.Lock()
+_stale_ids: set = set()
+
 
 def _ensure_file():
     DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
-    if not DATA_FILE.exists():
+    if SNAPSHOT_FORMAT != "binary" and not DATA_FILE.exists() and not binary_snapshot_path().exists():
         DATA_FILE.write_text("[]")
 
 
-def load_feedbacks() -> List[Dict[str, Any]]:
+def binary_snapshot_path() -> Path:
+    return DATA_FILE.with_suffix(".snap")
+
+
+def _snapshot_source() -> Path | None:
+    """The snapshot to load: the more recently written of DATA_FILE and the .snap file.
+
+    Snapshots are only ever written in the configured format, so after SNAPSHOT_FORMAT is
+    switched the file in the old format can be the newer one; it is read and converted at the
+    next snapshot write instead of being shadowed by a stale file in the new format.
+    """
+    candidates = [p for p in (DATA_FILE, binary_snapshot_path()) if p.exists()]
+    if not candidates:
+        return None
+    preferred = binary_snapshot_path() if SNAPSHOT_FORMAT == "binary" else DATA_FILE
+    # on equal mtimes the configured format wins
+    source = max(candidates, key=lambda p: (p.stat().st_mtime_ns, p == preferred))
+    if source != preferred:
+        print(f"[Storage] {source.name} is newer than the SNAPSHOT_FORMAT={SNAPSHOT_FORMAT} snapshot; loading it (converted at the next snapshot write)")
+    return source
+
+
+def _encode_snapshot(entries: List[Dict[str, Any]]) -> Tuple[Path, str | bytes]:
+    """Snapshot path and serialized contents for the configured SNAPSHOT_FORMAT."""
+    if SNAPSHOT_FORMAT == "binary":
+        return binary_snapshot_path(), snapshot.encode(entries, _next_id)
+    return DATA_FILE, json.dumps(entries, indent=2, ensure_ascii=False)
+
+
+def _journal_path() -> Path:
+    return DATA_FILE.with_name(DATA_FILE.stem + ".journal.jsonl")
+
+
+def sqlite_path() -> Path:
+    return DATA_FILE.with_suffix(".sqlite3")
+
+
+def _sealed_journal_path() -> Path:
+    """Journal segment that is being folded into a snapshot by a compaction."""
+    return DATA_FILE.with_name(DATA_FILE.stem + ".journal.compacting.jsonl")
+
+
+def _fsync_dir(path: Path):
+    """fsync a directory so renames and unlinks in it survive a power loss."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # e.g. Windows, where directories cannot be opened
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _atomic_write(path: Path, data: str | bytes):
+    """Write `data` to a temp file next to `path`, fsync it and rename it into place."""
+    t0 = time.perf_counter()
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") if isinstance(data, bytes) else open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+    commit_stats["bytes"] += len(data)
+    metrics.observe_stage("storage_snapshot", time.perf_counter() - t0)
+
+
+def _norm(value: Any) -> str:
+    return str(value).strip().lower() if value is not None else ""
+
+
+def _index_add(fb: Dict[str, Any], field: str):
+    _indexes[field].setdefault(_norm(fb.get(field)), {})[fb["id"]] = None
+
+
+def _index_remove(fb: Dict[str, Any], field: str, value: Any):
+    key = _norm(value)
+    bucket = _indexes[field].get(key)
+    if bucket is not None:
+        bucket.pop(fb["id"], None)
+        if not bucket:
+            del _indexes[field][key]
+
+
+def _recent_key(fb: Dict[str, Any]) -> tuple:
+    return (fb.get("submitted") or "", fb["id"])
+
+
+def _bump():
+    global _version
+    _version += 1
+
+
+def _track_add(fb: Dict[str, Any]):
+    """Register a newly stored entry with the id map, secondary indexes and aggregates."""
+    _bump()
+    _by_id[fb["id"]] = fb
+    if not _ids or fb["id"] > _ids[-1]:
+        _ids.append(fb["id"])
+    else:
+        bisect.insort(_ids, fb["id"])
+    for field in INDEXED_FIELDS:
+        _index_add(fb, field)
+    if _search_ready:
+        fulltext.index_entry(_search_index, fb)
+    st = fb.get("status", "pending")
+    _by_status[st] = _by_status.get(st, 0) + 1
+    se = fb.get("sentiment", "neutral")
+    _by_sentiment[se] = _by_sentiment.get(se, 0) + 1
+    key = _recent_key(fb)
+    if len(_recent) < RECENT_WINDOW or key > _recent[0]:
+        bisect.insort(_recent, key)
+        if len(_recent) > RECENT_WINDOW:
+            del _recent[0]
+    _rollups.add(fb)
+    if _dedup_ready:
+        _link_duplicate(fb)
+
+
+def _link_duplicate(fb: Dict[str, Any]):
+    canonical = _dedup_index.add(fb["id"], fb.get("text"))
+    if canonical is not None:
+        _clusters.setdefault(canonical, []).append(fb["id"])
+        fb.setdefault("duplicate_of", canonical)
+
+
+class CommitFailed(RuntimeError):
+    """A mutation could not be written durably (journal append/fsync, snapshot or database commit)."""
+
+
+class CorruptJournal(ValueError):
+    """A journal record other than the last one cannot be parsed."""
+
+
+class IndexNotReady(RuntimeError):
+    """The full-text index is still being built after a (re)load."""
+
+
+def _start_index_build():
+    """Build the search and near-duplicate indexes in a background thread. Called with _lock held.
+
+    The thread indexes a snapshot of the entry list without the lock, then takes the lock only to
+    catch up on entries added meanwhile and swap the indexes in. A newer (re)load bumps
+    _index_gen, which makes an older build give up.
+    """
+    global _index_gen, _indexer, _search_index, _dedup_index, _search_ready, _dedup_ready
+    _index_gen += 1
+    _search_index, _dedup_index = fulltext.InvertedIndex(), dedup.DuplicateIndex()
+    _search_ready = _dedup_ready = False
+    _clusters.clear()
+    _indexer = threading.Thread(target=_build_indexes, args=(_index_gen, list(_feedbacks)), name="index-builder", daemon=True)
+    _indexer.start()
+
+
+def _build_indexes(gen: int, entries: List[Dict[str, Any]]):
+    global _search_index, _dedup_index, _search_ready, _dedup_ready
+    t0 = time.perf_counter()
+    search_index, dup_index = fulltext.InvertedIndex(), dedup.DuplicateIndex()
+    links: List[tuple] = []
+    for fb in entries:
+        if gen != _index_gen:
+            return
+        fulltext.index_entry(search_index, fb)
+        if dedup.DEDUP_ENABLED:
+            canonical = dup_index.add(fb["id"], fb.get("text"))
+            if canonical is not None:
+                links.append((fb, canonical))
+    with _lock:
+        if gen != _index_gen:
+            return
+        _search_index, _dedup_index = search_index, dup_index
+        for fb, canonical in links:
+            _clusters.setdefault(canonical, []).append(fb["id"])
+            fb.setdefault("duplicate_of", canonical)
+        _search_ready, _dedup_ready = True, dedup.DEDUP_ENABLED
+        # entries added (or replayed) while the thread was working
+        for fb in _feedbacks[len(entries) :]:
+            fulltext.index_entry(_search_index, fb)
+            if _dedup_ready:
+                _link_duplicate(fb)
+        _bump()
+    metrics.observe_stage("storage_index_build", time.perf_counter() - t0)
+
+
+def wait_for_indexes(timeout: float | None = None) -> bool:
+    """Block until the background index build (if any) finishes; True if the indexes are ready."""
+    indexer = _indexer
+    if indexer is not None:
+        indexer.join(timeout)
+    return _search_ready
+
+
+def _track_status(fb: Dict[str, Any], prev: str | None):
+    """Move an entry between status buckets after a status change."""
+    _bump()
+    _index_remove(fb, "status", prev)
+    _index_add(fb, "status")
+    prev = prev or "pending"
+    _by_status[prev] = _by_status.get(prev, 0) - 1
+    if _by_status[prev] <= 0:
+        del _by_status[prev]
+    st = fb.get("status", "pending")
+    _by_status[st] = _by_status.get(st, 0) + 1
+    _rollups.move_status(fb, prev)
+
+
+def _rebuild_derived():
+    _bump()
+    _by_id.clear()
+    _ids.clear()
+    for field in INDEXED_FIELDS:
+        _indexes[field] = {}
+    _by_status.clear()
+    _by_sentiment.clear()
+    _recent.clear()
+    _rollups.clear()
+    _start_index_build()
+    for fb in _feedbacks:
+        _track_add(fb)
+
+
+def _apply(op: Dict[str, Any]):
+    """Apply one journal record to the in-memory store.
+
+    Replay is idempotent so a journal segment that already made it into the snapshot
+    (crash between snapshot rename and segment removal) can be replayed safely.
+    """
+    global _next_id
+    kind = op.get("op")
+    if kind == "add":
+        entry = op["entry"]
+        if entry.get("id") in _by_id:
+            return
+        _feedbacks.append(entry)
+        _track_add(entry)
+        _next_id = max(_next_id, int(entry.get("id", 0)) + 1)
+    elif kind == "status":
+        fb = _by_id.get(op.get("id"))
+        if fb is None:
+            return
+        history = fb.setdefault("history", [])
+        if len(history) >= op.get("history_len", 0):
+            return
+        prev = fb.get("status", "pending")
+        fb["status"] = op["status"]
+        history.append(op["rec"])
+        _track_status(fb, prev)
+    elif kind == "set":
+        fb = _by_id.get(op.get("id"))
+        if fb is not None:
+            fb.update(op["fields"])
+            _bump()
+
+
+def _replay(path: Path) -> int:
+    """Replay a journal file into memory. Returns the number of records applied.
+
+    A torn trailing line (crash mid-append) is ignored and cut off, so later appends do not
+    land after it. An unreadable record followed by further records is real corruption and
+    raises CorruptJournal rather than silently dropping everything after it.
+    """
+    if not path.exists():
+        return 0
+    count = 0
+    torn = None  # (line number, byte offset) of an unreadable record
+    offset = 0
+    with open(path, "rb") as fh:
+        for lineno, raw in enumerate(fh, 1):
+            start, offset = offset, offset + len(raw)
+            line = raw.strip()
+            if not line:
+                continue
+            if torn is not None:
+                raise CorruptJournal(f"{path}: unreadable record on line {torn[0]} is followed by more records")
+            try:
+                op = json.loads(line)
+            except ValueError:
+                torn = (lineno, start)
+                continue
+            _apply(op)
+            count += 1
+    if torn is not None:
+        print(f"[Storage] Dropping torn last record on line {torn[0]} of {path}")
+        with open(path, "r+b") as fh:
+            fh.truncate(torn[1])
+            fh.flush()
+            os.fsync(fh.fileno())
+    return count
+
+
+def _close_journal_locked():
+    """Close the journal handle; call with _journal_lock held."""
+    global _journal_fh
+    if _journal_fh is not None:
+        try:
+            _journal_fh.close()
+        except Exception:
+            pass
+        _journal_fh = None
+
+
+def _close_journal():
+    with _journal_lock:
+        _close_journal_locked()
+
+
+def _load_files(replay: bool = True):
+    """Load DATA_FILE and replay the journal(s) into memory. Must be called with the locks held."""
     global _feedbacks, _next_id
+    _close_journal()
     try:
         _ensure_file()
-        _feedbacks = json.loads(DATA_FILE.read_text())
-        if _feedbacks:
-            _next_id = max(item.get("id", 0) for item in _feedbacks) + 1
+        source = _snapshot_source()
+        if source is None:
+            _feedbacks, _next_id = [], 1
+        elif snapshot.is_snapshot(source):
+            _feedbacks, _next_id = snapshot.read(source)
+        else:
+            _feedbacks = json.loads(source.read_text())
+            _next_id = max((item.get("id", 0) for item in _feedbacks), default=0) + 1
     except Exception:
         _feedbacks = []
         _next_id = 1
+    _rebuild_derived()
+    if replay:
+        try:
+            sealed = _sealed_journal_path()
+            had_sealed = sealed.exists()
+            _replay(sealed)
+            _replay(_journal_path())
+            if had_sealed and STORAGE_MODE == "journal":
+                # an interrupted compaction left a sealed segment; fold everything now
+                save_feedbacks()
+        except CorruptJournal:
+            raise
+        except Exception:
+            pass
+
+
+def _close_backend():
+    global _backend
+    if _backend is not None:
+        _backend.close()
+        _backend = None
+
+
+def _load_sqlite():
+    """(Re)load the store from the SQLite database. Must be called with the locks held.
+
+    On first use an existing JSON snapshot and journal are migrated into the database; when
+    several workers start at once only the first one imports them.
+    """
+    global _feedbacks, _next_id, _backend, _backend_seq
+    if _backend is None or _backend.path != sqlite_path():
+        _close_backend()
+        _backend = SQLiteBackend(sqlite_path())
+    if _backend.is_empty() and (DATA_FILE.exists() or _journal_path().exists()):
+        _load_files(replay=True)
+        migrated = _backend.import_entries(_feedbacks, only_if_empty=True)
+        if migrated:
+            print(f"[Storage] Migrated {migrated} feedbacks from {DATA_FILE.name} into {_backend.path.name}")
+    _feedbacks, _backend_seq = _backend.load()
+    _next_id = max((item.get("id", 0) for item in _feedbacks), default=0) + 1
+    _rebuild_derived()
+
+
+def _sync():
+    """Pick up entries added or changed by other processes sharing the SQLite database.
+
+    Cheap when nothing changed (one PRAGMA). Changes made by this process are skipped; they
+    are already applied in memory. An entry this process has ops queued for is not overwritten
+    (the row would lack them); it is re-read from the database once those ops are committed,
+    when the row holds both workers' changes.
+    """
+    global _backend_seq
+    if _backend is None:
+        return
+    with _lock:
+        with _pending_lock:
+            ready = {fid for fid in _stale_ids if fid not in _pending_writes}
+        _stale_ids.difference_update(ready)
+        ids = set()
+        if _backend.changed():
+            rows, oldest = _backend.changes_since(_backend_seq)
+            if _backend_seq and oldest > _backend_seq + 1:
+                # fell behind the retained change log: start over from the table
+                _stale_ids.clear()
+                _load_sqlite()
+                return
+            if rows:
+                _backend_seq = rows[-1][0]
+            ids = {fid for _, origin, fid in rows if origin != _backend.origin}
+            with _pending_lock:
+                deferred = {fid for fid in ids if fid in _pending_writes}
+            _stale_ids.update(deferred)
+            ids -= deferred
+        ids |= ready
+        if not ids:
+            return
+        for row in _backend.fetch(ids):
+            fb = _by_id.get(row["id"])
+            if fb is None:
+                _feedbacks.append(row)
+                _track_add(row)
+                events.publish("add", row, total=len(_feedbacks))
+                continue
+            prev = fb.get("status", "pending")
+            fb.update(row)
+            _bump()
+            if fb.get("status", "pending") != prev:
+                _track_status(fb, prev)
+                events.publish("status", fb, previous=prev)
+
+
+def load_feedbacks() -> List[Dict[str, Any]]:
+    flush()
+    with _snapshot_lock, _lock:
+        if STORAGE_MODE == "sqlite":
+            _load_sqlite()
+        else:
+            _close_backend()
+            _load_files(replay=STORAGE_MODE == "journal")
     return _feedbacks
 
 
 def save_feedbacks():
+    """Write a full snapshot of the store atomically (DATA_FILE, or the .snap file in binary format).
+
+    In journal mode this also truncates the journal, since the snapshot now contains it.
+    """
     try:
-        _ensure_file()
-        DATA_FILE.write_text(json.dumps(_feedbacks, indent=2, ensure_ascii=False))
+        _save_snapshot()
     except Exception:
         pass
 
 
-def add_feedback(entry: Dict[str, Any]) -> Dict[str, Any]:
+def _save_snapshot():
+    """save_feedbacks, raising if the snapshot cannot be written."""
+    with _snapshot_lock, _lock:
+        if STORAGE_MODE == "sqlite":
+            _backend.import_entries(_feedbacks)
+            return
+        _ensure_file()
+        _atomic_write(*_encode_snapshot(_feedbacks))
+        if STORAGE_MODE == "journal":
+            # the writer must not reopen the journal between the close and the unlink, or
+            # its handle would point at the deleted file and later appends would be lost
+            with _journal_lock:
+                _close_journal_locked()
+                for p in (_sealed_journal_path(), _journal_path()):
+                    if p.exists():
+                        p.unlink()
+                _fsync_dir(DATA_FILE.parent)
+
+
+def _append_journal(ops: List[Dict[str, Any]]):
+    """Append records to the journal with a single write + fsync before returning."""
+    global _journal_fh
+    with _journal_lock:
+        if _journal_fh is None:
+            DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
+            _journal_fh = open(_journal_path(), "a", encoding="utf-8")
+        data = "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in ops)
+        _journal_fh.write(data)
+        commit_stats["bytes"] += len(data)
+        _journal_fh.flush()
+        os.fsync(_journal_fh.fileno())
+        full = _journal_fh.tell() >= JOURNAL_COMPACT_BYTES
+    if full:
+        _start_compaction()
+
+
+def _write_ops(ops: List[Dict[str, Any]]):
+    """Make `ops` durable in the configured backend; raises if the write or fsync fails."""
+    if STORAGE_MODE == "journal":
+        _append_journal(ops)
+    elif STORAGE_MODE == "sqlite":
+        commit_stats["bytes"] += _backend.write(ops)
+    else:
+        _save_snapshot()
+
+
+def _writer_loop():
+    window = GROUP_COMMIT_WINDOW_MS / 1000.0
+    while True:
+        batch = [_commit_queue.get()]
+        nops = len(batch[0][0])
+        deadline = time.monotonic() + window
+        while nops < GROUP_COMMIT_MAX_OPS:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = _commit_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            nops += len(item[0])
+        ops = [op for item_ops, _ in batch for op in item_ops]
+        t0 = time.perf_counter()
+        error = None
+        try:
+            _write_ops(ops)
+        except Exception as ex:
+            print(f"[Storage] Commit failed: {ex}")
+            error = ex
+        _release_pending(ops)
+        metrics.observe_stage("storage_commit", time.perf_counter() - t0)
+        commit_stats["commits"] += 1
+        commit_stats["ops"] += len(ops)
+        for _, fut in batch:
+            if fut.set_running_or_notify_cancel():
+                if error is None:
+                    fut.set_result(True)
+                else:
+                    fut.set_exception(CommitFailed(f"Commit failed: {error}"))
+            _commit_queue.task_done()
+
+
+def _persist(*ops: Dict[str, Any]) -> Future:
+    """Queue journal records for the writer thread. Call with _lock held so order is preserved.
+
+    The returned future resolves to True once the records are durable, or raises CommitFailed.
+    """
+    global _writer
+    if _writer is None or not _writer.is_alive():
+        with _writer_lock:
+            if _writer is None or not _writer.is_alive():
+                _writer = threading.Thread(target=_writer_loop, name="storage-writer", daemon=True)
+                _writer.start()
+    fut: Future = Future()
+    if _backend is not None:
+        with _pending_lock:
+            for fid in _op_ids(ops):
+                _pending_writes[fid] = _pending_writes.get(fid, 0) + 1
+    _commit_queue.put((list(ops), fut))
+    return fut
+
+
+def _op_ids(ops: Iterable[Dict[str, Any]]) -> Iterator[int]:
+    for op in ops:
+        yield op["entry"]["id"] if op.get("op") == "add" else op["id"]
+
+
+def _release_pending(ops: List[Dict[str, Any]]):
+    if not _pending_writes:
+        return
+    with _pending_lock:
+        for fid in _op_ids(ops):
+            n = _pending_writes.get(fid, 0) - 1
+            if n > 0:
+                _pending_writes[fid] = n
+            else:
+                _pending_writes.pop(fid, None)
+
+
+def flush():
+    """Block until every queued mutation has been committed."""
+    if _writer is not None and _writer.is_alive():
+        _commit_queue.join()
+
+
+def compact():
+    """Fold the journal into a fresh snapshot.
+
+    The active journal is sealed and a copy of the store is taken under the lock; the
+    snapshot is serialized and renamed into place outside it so writers are not blocked.
+    """
+    with _snapshot_lock:
+        _compact()
+
+
+def _compact():
+    with _lock:
+        if STORAGE_MODE == "sqlite":
+            _backend.checkpoint()
+            return
+        if STORAGE_MODE != "journal":
+            save_feedbacks()
+            return
+        journal = _journal_path()
+        sealed = _sealed_journal_path()
+        # records queued but not yet written are already in the snapshot below; the writer
+        # appends them to the new journal, where replaying them again is a no-op. _journal_lock
+        # is held until the old journal has been moved aside, so the writer cannot reopen it in
+        # between and keep appending to the segment that is deleted below.
+        with _journal_lock:
+            _close_journal_locked()
+            if journal.exists():
+                if sealed.exists():
+                    # previous compaction failed; carry its segment forward
+                    with open(sealed, "a", encoding="utf-8") as dst, open(journal, "r", encoding="utf-8") as src:
+                        dst.write(src.read())
+                        dst.flush()
+                        os.fsync(dst.fileno())
+                    journal.unlink()
+                else:
+                    os.replace(journal, sealed)
+                _fsync_dir(sealed.parent)
+        entries = [dict(fb, history=list(fb.get("history") or [])) for fb in _feedbacks]
+    _ensure_file()
+    _atomic_write(*_encode_snapshot(entries))
+    if sealed.exists():
+        sealed.unlink()
+
+
+def _run_compaction():
+    try:
+        compact()
+    except Exception as ex:
+        print(f"[Storage] Journal compaction failed: {ex}")
+
+
+def _start_compaction():
+    global _compactor
+    if _compactor is not None and _compactor.is_alive():
+        return
+    _compactor = threading.Thread(target=_run_compaction, name="journal-compactor", daemon=True)
+    _compactor.start()
+
+
+def wait_for_compaction(timeout: float | None = None):
+    """Block until a running background compaction (if any) finishes."""
+    if _compactor is not None:
+        _compactor.join(timeout)
+
+
+def _prepare(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy `entry`, assign an id and fill the defaults. Must be called with _lock held."""
     global _next_id
     entry = dict(entry)
     entry.setdefault("id", _next_id)
-    _next_id += 1
+    _next_id = max(_next_id, int(entry["id"])) + 1
     # ensure status and submitted timestamp exist
     entry.setdefault("status", "pending")
     if not entry.get("submitted"):
         entry["submitted"] = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
     # initialize history
     entry.setdefault("history", [])
-    _feedbacks.append(entry)
-    save_feedbacks()
     return entry
 
 
+def _publish_when_durable(fut: Future, changes: List[tuple]):
+    """Announce (kind, entry, extra) changes on the event bus once their commit succeeds."""
+
+    def done(f: Future):
+        if not f.cancelled() and f.exception() is None:
+            for kind, fb, extra in changes:
+                events.publish(kind, fb, **extra)
+
+    fut.add_done_callback(done)
+
+
+def _add_many(entries: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Future | None]:
+    backend = _backend
+    if backend is not None:
+        # ids come from the shared database so concurrent workers never collide; reserved
+        # before taking _lock since it can wait on other workers' write transactions
+        entries = list(entries)
+        n = sum(1 for e in entries if "id" not in e)
+        ids = iter(range(backend.reserve_ids(n), 1 << 62)) if n else iter(())
+        entries = [e if "id" in e else dict(e, id=next(ids)) for e in entries]
+    with _lock:
+        if _backend is not None:
+            _sync()
+        saved = [_prepare(e) for e in entries]
+        for entry in saved:
+            _feedbacks.append(entry)
+            _track_add(entry)
+        fut = _persist(*({"op": "add", "entry": e} for e in saved)) if saved else None
+        if fut is not None:
+            # `total` is the store size after each add, so live views keep an exact unfiltered count
+            base = len(_feedbacks) - len(saved)
+            _publish_when_durable(fut, [("add", e, {"total": base + i}) for i, e in enumerate(saved, 1)])
+        return saved, fut
+
+
+def add_feedback(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Store an entry and return it once durable; raises CommitFailed if the write fails."""
+    saved, fut = _add_many([entry])
+    fut.result()
+    return saved[0]
+
+
+def add_feedbacks(entries: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Add many entries with a single storage commit (one journal fsync or one snapshot write)."""
+    saved, fut = _add_many(entries)
+    if fut is not None:
+        fut.result()
+    return saved
+
+
+async def add_feedback_async(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """add_feedback for async handlers: returns once the entry is durable without blocking the loop.
+
+    Like add_feedback, raises CommitFailed if the entry could not be written.
+
+    Concurrent callers are group-committed together by the writer thread. With SQLite, id
+    reservation and catching up with other workers can wait on the database, so that part
+    runs in a thread too.
+    """
+    if _backend is not None:
+        saved, fut = await asyncio.to_thread(_add_many, [entry])
+    else:
+        saved, fut = _add_many([entry])
+    await asyncio.wrap_future(fut)
+    return saved[0]
+
+
+def _update_status(feedback_id: int, new_status: str, note: str | None, actor: str | None) -> Tuple[Dict[str, Any] | None, Future | None]:
+    with _lock:
+        _sync()
+        fb = _by_id.get(int(feedback_id))
+        if fb is None:
+            return None, None
+        prev = fb.get("status", "pending")
+        fb["status"] = new_status
+        when = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        rec = {"when": when, "actor": actor or "admin", "from": prev, "to": new_status}
+        if note:
+            rec["note"] = note
+        history = fb.setdefault("history", [])
+        history.append(rec)
+        _track_status(fb, prev)
+        fut = _persist({"op": "status", "id": fb["id"], "status": new_status, "rec": rec, "history_len": len(history)})
+        _publish_when_durable(fut, [("status", fb, {"previous": prev})])
+        return fb, fut
+
+
 def update_feedback_status(feedback_id: int, new_status: str, note: str | None = None, actor: str | None = None) -> Dict[str, Any] | None:
     """Update the status of a feedback entry and append an audit history record.
 
     Returns the updated entry or None if not found.
     """
-    for fb in _feedbacks:
-        if fb.get("id") == int(feedback_id):
-            prev = fb.get("status", "pending")
-            fb["status"] = new_status
-            when = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-            rec = {"when": when, "actor": actor or "admin", "from": prev, "to": new_status}
-            if note:
-                rec["note"] = note
-            fb.setdefault("history", []).append(rec)
-            save_feedbacks()
+    fb, fut = _update_status(feedback_id, new_status, note, actor)
+    if fut is not None:
+        fut.result()
+    return fb
+
+
+async def update_feedback_status_async(feedback_id: int, new_status: str, note: str | None = None, actor: str | None = None) -> Dict[str, Any] | None:
+    """update_feedback_status for async handlers (see add_feedback_async)."""
+    if _backend is not None:
+        fb, fut = await asyncio.to_thread(_update_status, feedback_id, new_status, note, actor)
+    else:
+        fb, fut = _update_status(feedback_id, new_status, note, actor)
+    if fut is not None:
+        await asyncio.wrap_future(fut)
+    return fb
+
+
+def set_feedback_fields(feedback_id: int, **fields: Any) -> Dict[str, Any] | None:
+    """Set bookkeeping fields (e.g. `notified`) on an entry and persist the change.
+
+    Indexed fields cannot be changed here; use update_feedback_status for status.
+    Returns the updated entry or None if not found.
+    """
+    bad = {"id", "history", *INDEXED_FIELDS} & set(fields)
+    if bad:
+        raise ValueError(f"Cannot set field(s) via set_feedback_fields: {', '.join(sorted(bad))}")
+    with _lock:
+        _sync()
+        fb = _by_id.get(int(feedback_id))
+        if fb is None:
+            return None
+        fb.update(fields)
+        _bump()
+        fut = _persist({"op": "set", "id": fb["id"], "fields": fields})
+    fut.result()
+    return fb
+
+
+def _notification_claimable(fb: Dict[str, Any], owner: str, expired_before: float) -> bool:
+    status = fb.get("notify_status")
+    if status == "queued":
+        return True
+    return status == "sending" and (fb.get("notify_owner") == owner or (fb.get("notify_claimed") or 0) < expired_before)
+
+
+def claim_notification(feedback_id: int, ttl: float) -> Dict[str, Any] | None:
+    """Mark an entry's notification as being sent by this process, atomically across workers.
+
+    Succeeds for entries still "queued", entries this process already claimed (retries) and
+    claims older than `ttl` seconds (a worker that died mid-send). Returns the entry, or None
+    if it is missing or another worker holds the claim.
+    """
+    now = time.time()
+    fields = {"notify_status": "sending", "notify_owner": INSTANCE, "notify_claimed": now}
+    claimable = lambda fb: _notification_claimable(fb, INSTANCE, now - ttl)  # noqa: E731
+    backend = _backend
+    if backend is not None:
+        if backend.update_if(int(feedback_id), claimable, fields) is None:
+            return None
+        with _lock:
+            fb = _by_id.get(int(feedback_id))
+            if fb is not None:
+                fb.update(fields)
+                _bump()
             return fb
-    return None
+    with _lock:
+        fb = _by_id.get(int(feedback_id))
+        if fb is None or not claimable(fb):
+            return None
+        fb.update(fields)
+        _bump()
+        fut = _persist({"op": "set", "id": fb["id"], "fields": fields})
+    fut.result()
+    return fb
 
 
-def export_feedbacks_csv() -> str:
-    """Return a CSV string of all feedbacks for export.
+EXPORT_COLUMNS = ["id", "parent_name", "student_name", "student_id", "title", "category", "department", "sentiment", "status", "submitted", "text"]
+
+
+def _iter_export(date_from: str | None = None, date_to: str | None = None, **filters: str | None) -> Iterator[Dict[str, Any]]:
+    """Entries matching the index filters and an inclusive `submitted` date range.
+
+    Dates are compared as prefixes of the stored "YYYY-MM-DD HH:MM:SS" string, so "2024-05"
+    or "2024-05-31" both work as bounds.
+    """
+    for fb in iter_feedbacks(**filters):
+        if date_from or date_to:
+            submitted = fb.get("submitted") or ""
+            if not submitted:
+                continue
+            if date_from and submitted[: len(date_from)] < date_from:
+                continue
+            if date_to and submitted[: len(date_to)] > date_to:
+                continue
+        yield fb
+
+
+def iter_export_csv(chunk_rows: int = 500, date_from: str | None = None, date_to: str | None = None, **filters: str | None) -> Iterator[str]:
+    """Yield the CSV export in chunks of at most `chunk_rows` rows (header first).
 
     Columns: id,parent_name,student_name,student_id,title,category,department,sentiment,status,submitted,text
     """
@@ -82,8 +949,9 @@ def export_feedbacks_csv() -> str:
 
     out = StringIO()
     writer = csv.writer(out)
-    writer.writerow(["id", "parent_name", "student_name", "student_id", "title", "category", "department", "sentiment", "status", "submitted", "text"])
-    for fb in _feedbacks:
+    writer.writerow(EXPORT_COLUMNS)
+    rows = 0
+    for fb in _iter_export(date_from, date_to, **filters):
         writer.writerow([
             fb.get("id"),
             fb.get("parent_name"),
@@ -97,12 +965,210 @@ def export_feedbacks_csv() -> str:
             fb.get("submitted"),
             (fb.get("text") or "").replace("\n", " "),
         ])
-    return out.getvalue()
+        rows += 1
+        if rows >= chunk_rows:
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+            rows = 0
+    if out.tell():
+        yield out.getvalue()
+
+
+def iter_export_jsonl(chunk_rows: int = 500, date_from: str | None = None, date_to: str | None = None, **filters: str | None) -> Iterator[str]:
+    """Yield the export as JSON lines (full records), in chunks of at most `chunk_rows` lines."""
+    buf: List[str] = []
+    for fb in _iter_export(date_from, date_to, **filters):
+        buf.append(json.dumps(fb, ensure_ascii=False))
+        if len(buf) >= chunk_rows:
+            yield "\n".join(buf) + "\n"
+            buf = []
+    if buf:
+        yield "\n".join(buf) + "\n"
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream into a single gzip member incrementally."""
+    import zlib
+
+    comp = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = comp.compress(chunk)
+        if data:
+            yield data
+    yield comp.flush()
+
+
+def export_feedbacks_csv() -> str:
+    """Return a CSV string of all feedbacks for export (see iter_export_csv for streaming)."""
+    return "".join(iter_export_csv())
+
+
+def version() -> int:
+    """Monotonic counter that changes whenever any entry is added or modified in this process."""
+    _sync()
+    return _version
 
 
 def list_feedbacks() -> List[Dict[str, Any]]:
+    _sync()
     return _feedbacks
 
 
+def summary() -> Dict[str, Any]:
+    """Precomputed dashboard counts: total, by_status and by_sentiment."""
+    with _lock:
+        _sync()
+        by_sentiment = {"positive": 0, "neutral": 0, "negative": 0}
+        by_sentiment.update(_by_sentiment)
+        return {"total": len(_feedbacks), "by_status": dict(_by_status), "by_sentiment": by_sentiment}
+
+
+def recent(n: int = 5) -> List[Dict[str, Any]]:
+    """Latest `n` entries by submitted timestamp, newest first (n is capped at RECENT_WINDOW)."""
+    with _lock:
+        _sync()
+        return [_by_id[i] for _, i in reversed(_recent[-n:])] if n > 0 else []
+
+
+def trends(date_from: str | None = None, date_to: str | None = None, interval: str = "day", group_by: str = "sentiment", **filters) -> List[Dict[str, Any]]:
+    """Counts per day or week from the incremental rollups (see analytics.Rollups.trends)."""
+    with _lock:
+        _sync()
+        return _rollups.trends(date_from, date_to, interval, group_by, **filters)
+
+
+def find_duplicate(text: str | None) -> Dict[str, Any] | None:
+    """The canonical stored entry `text` is a near-duplicate of, or None.
+
+    Also None while the index is still being built after a (re)load; entries added in the
+    meantime are linked to their canonical copy once it is ready.
+    """
+    if not dedup.DEDUP_ENABLED:
+        return None
+    with _lock:
+        _sync()
+        if not _dedup_ready:
+            metrics.inc("dedup_index_not_ready")
+            return None
+        canonical = _dedup_index.lookup(text)
+        return _by_id.get(canonical) if canonical is not None else None
+
+
+def duplicate_clusters(limit: int = 10) -> List[Dict[str, Any]]:
+    """The `limit` largest near-duplicate clusters: canonical entry plus its linked duplicates.
+
+    Empty while the index is still being built.
+    """
+    with _lock:
+        _sync()
+        top = heapq.nlargest(limit, _clusters.items(), key=lambda kv: (len(kv[1]), -kv[0]))
+        return [{"canonical": _by_id[c], "duplicates": [_by_id[i] for i in ids], "size": len(ids) + 1} for c, ids in top]
+
+
+def get_feedback(feedback_id: int) -> Dict[str, Any] | None:
+    _sync()
+    return _by_id.get(int(feedback_id))
+
+
+def _active_filters(filters: Dict[str, Any]) -> List[tuple]:
+    unknown = set(filters) - set(INDEXED_FIELDS)
+    if unknown:
+        raise ValueError(f"Cannot filter on non-indexed field(s): {', '.join(sorted(unknown))}")
+    return [(f, _norm(v)) for f, v in filters.items() if v not in (None, "")]
+
+
+def _matching_ids(active: List[tuple]) -> List[int]:
+    """Sorted ids matching all active filters. Must be called with _lock held."""
+    if not active:
+        return _ids
+    buckets = [_indexes[f].get(v, {}) for f, v in active]
+    buckets.sort(key=len)
+    smallest, rest = buckets[0], buckets[1:]
+    ids = [i for i in smallest if all(i in b for b in rest)]
+    ids.sort()
+    return ids
+
+
+def query(**filters: str | None) -> List[Dict[str, Any]]:
+    """Return entries matching every given filter (case-insensitive exact match), oldest first.
+
+    Filters are keyword arguments named after INDEXED_FIELDS; None/empty values are ignored.
+    Runs in time proportional to the smallest matching index bucket, not the store size.
+    """
+    active = _active_filters(filters)
+    with _lock:
+        _sync()
+        if not active:
+            return list(_feedbacks)
+        return [_by_id[i] for i in _matching_ids(active)]
+
+
+def count(**filters: str | None) -> int:
+    """Number of entries matching the filters (same semantics as query())."""
+    active = _active_filters(filters)
+    with _lock:
+        _sync()
+        if not active:
+            return len(_feedbacks)
+        if len(active) == 1:
+            f, v = active[0]
+            return len(_indexes[f].get(v, {}))
+        return len(_matching_ids(active))
+
+
+def page(limit: int = 50, after_id: int | None = None, order: str = "asc", **filters: str | None) -> Tuple[List[Dict[str, Any]], int | None]:
+    """Return one page of entries ordered by id, plus the cursor for the next page.
+
+    `after_id` is the last id of the previous page (exclusive); with order="desc" the page
+    holds ids below it. The returned cursor is None when there are no more entries.
+    """
+    if order not in ("asc", "desc"):
+        raise ValueError("order must be 'asc' or 'desc'")
+    limit = max(1, int(limit))
+    active = _active_filters(filters)
+    with _lock:
+        _sync()
+        ids = _matching_ids(active)
+        if order == "asc":
+            start = bisect.bisect_right(ids, after_id) if after_id is not None else 0
+            chunk = ids[start : start + limit]
+            more = start + limit < len(ids)
+        else:
+            end = bisect.bisect_left(ids, after_id) if after_id is not None else len(ids)
+            chunk = ids[max(0, end - limit) : end][::-1]
+            more = end - limit > 0
+        items = [_by_id[i] for i in chunk]
+    return items, (chunk[-1] if more and chunk else None)
+
+
+def search(q: str, limit: int = 20, **filters: str | None) -> List[Dict[str, Any]]:
+    """Full-text search over title and text, ranked by BM25 and combined with index filters.
+
+    Quoted parts of `q` are phrase queries that must match. Returns copies of the matching
+    entries with a `score` key, best first. Raises IndexNotReady while the index is still being
+    built after a (re)load.
+    """
+    active = _active_filters(filters)
+    with _lock:
+        _sync()
+        if not _search_ready:
+            raise IndexNotReady("The search index is still being built")
+        buckets = [_indexes[f].get(v, {}) for f, v in active]
+        accept = (lambda d: all(d in b for b in buckets)) if buckets else None
+        hits = _search_index.search(q, limit, accept)
+        return [dict(_by_id[d], score=round(s, 4)) for d, s in hits]
+
+
+def iter_feedbacks(order: str = "asc", after_id: int | None = None, chunk_size: int = 500, **filters: str | None) -> Iterator[Dict[str, Any]]:
+    """Yield matching entries page by page, holding the store lock only while fetching each page."""
+    cursor = after_id
+    while True:
+        items, cursor = page(chunk_size, cursor, order, **filters)
+        yield from items
+        if cursor is None:
+            return
+
+
 # Load at import to populate store if file exists
 load_feedbacks()
@@ -0,0 +1,16 @@
+import pytest
+
+from src import storage
+
+
+@pytest.fixture(autouse=True)
+def isolated_store(tmp_path, monkeypatch):
+    """Point the store at a temp data file so tests never touch data/feedbacks.json."""
+    monkeypatch.setattr(storage, "DATA_FILE", tmp_path / "feedbacks.json")
+    storage.load_feedbacks()
+    storage.wait_for_indexes()
+    yield storage
+    storage.flush()
+    storage.wait_for_compaction()
+    storage._close_journal()
+    storage._close_backend()
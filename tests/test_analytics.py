@@ -0,0 +1,62 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from src import storage
+from src.analytics import week_start
+from src.main import app
+
+
+def _seed():
+    rows = [
+        ("2024-03-04 09:00:00", "Facilities", "negative"),
+        ("2024-03-04 12:00:00", "Facilities", "positive"),
+        ("2024-03-05 08:00:00", "Academic Affairs", "negative"),
+        ("2024-03-11 10:00:00", "Facilities", "negative"),
+    ]
+    return [storage.add_feedback({"text": "x", "submitted": ts, "department": d, "category": "Other", "sentiment": s}) for ts, d, s in rows]
+
+
+def test_week_start_is_monday():
+    assert week_start("2024-03-10") == "2024-03-04"
+    assert week_start("2024-03-11") == "2024-03-11"
+
+
+def test_trends_by_day_week_and_filters():
+    _seed()
+    days = storage.trends()
+    assert [p["period"] for p in days] == ["2024-03-04", "2024-03-05", "2024-03-11"]
+    assert days[0]["counts"] == {"negative": 1, "positive": 1}
+
+    weeks = storage.trends(interval="week", department="facilities")
+    assert weeks == [
+        {"period": "2024-03-04", "total": 2, "counts": {"negative": 1, "positive": 1}},
+        {"period": "2024-03-11", "total": 1, "counts": {"negative": 1}},
+    ]
+    assert [p["period"] for p in storage.trends("2024-03-05", "2024-03-10")] == ["2024-03-05"]
+
+    with pytest.raises(ValueError):
+        storage.trends(interval="month")
+
+
+def test_trends_follow_status_changes_and_reload():
+    fbs = _seed()
+    storage.update_feedback_status(fbs[0]["id"], "resolved")
+    by_status = storage.trends(group_by="status", date_to="2024-03-04")
+    assert by_status[0]["counts"] == {"resolved": 1, "pending": 1}
+
+    storage.flush()
+    storage.load_feedbacks()
+    assert storage.trends(group_by="status", date_to="2024-03-04") == by_status
+
+
+@pytest.mark.asyncio
+async def test_trends_endpoint():
+    _seed()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as ac:
+        r = await ac.get("/api/analytics/trends", params={"interval": "week", "group_by": "department", "sentiment": "negative"})
+        assert r.status_code == 200
+        assert r.json()["series"][0]["counts"] == {"Facilities": 1, "Academic Affairs": 1}
+
+        r = await ac.get("/api/analytics/trends", params={"group_by": "parent_name"})
+        assert r.status_code == 400
@@ -1,3 +1,4 @@
+import json
 import pytest
 from httpx import AsyncClient, ASGITransport
 from src.main import app
@@ -29,3 +30,95 @@ async def test_submit_and_list():
         arr = r2.json()
         assert isinstance(arr, list)
         assert any(item.get("id") == data.get("id") for item in arr)
+
+
+@pytest.mark.asyncio
+async def test_api_feedbacks_cursor_pagination_and_ndjson():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as ac:
+        ids = []
+        for i in range(5):
+            r = await ac.post("/api/feedback", json={"parent_name": f"P{i}", "text": f"Exam schedule question {i}"})
+            ids.append(r.json()["id"])
+
+        r = await ac.get("/api/feedbacks", params={"limit": 2})
+        assert [fb["id"] for fb in r.json()] == ids[:2]
+        cursor = r.headers["x-next-after-id"]
+        r = await ac.get("/api/feedbacks", params={"limit": 2, "after_id": cursor})
+        assert [fb["id"] for fb in r.json()] == ids[2:4]
+
+        r = await ac.get("/api/feedbacks", params={"limit": 3, "order": "desc"})
+        assert [fb["id"] for fb in r.json()] == ids[::-1][:3]
+        assert r.headers["x-next-after-id"] == str(ids[2])
+
+        r = await ac.get("/api/feedbacks", params={"stream": "true", "after_id": ids[0]})
+        assert r.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(l) for l in r.text.splitlines()]
+        assert [fb["id"] for fb in lines] == ids[1:]
+
+        r = await ac.get("/admin", params={"limit": 2})
+        assert r.status_code == 200
+        assert f"after_id={ids[3]}" in r.text
+
+
+@pytest.mark.asyncio
+async def test_admin_export_filters_and_formats():
+    import gzip
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as ac:
+        await ac.post("/api/feedback", json={"text": "Tuition refund is late and the fees are wrong."})
+        await ac.post("/api/feedback", json={"text": "The dorm room heating is broken."})
+
+        r = await ac.get("/admin/export", params={"category": "Finance"})
+        assert r.headers["content-type"].startswith("text/csv")
+        rows = r.text.strip().splitlines()
+        assert rows[0].startswith("id,parent_name")
+        assert len(rows) == 2 and "Tuition" in rows[1]
+
+        r = await ac.get("/admin/export", params={"format": "jsonl", "date_from": "2000-01-01"})
+        assert len(r.text.splitlines()) == 2
+
+        r = await ac.get("/admin/export", params={"date_to": "2000-01-01"})
+        assert len(r.text.strip().splitlines()) == 1
+
+        r = await ac.get("/admin/export", params={"gzip": "true"})
+        assert "feedbacks.csv.gz" in r.headers["content-disposition"]
+        assert gzip.decompress(r.content).decode().count("\n") == 3
+
+
+@pytest.mark.asyncio
+async def test_batch_endpoint_stores_whole_batch_in_one_commit():
+    from src import storage
+
+    storage.flush()
+    before = dict(storage.commit_stats)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as ac:
+        items = [{"parent_name": f"P{i}", "text": f"The dorm heating is broken ({i})"} for i in range(4)]
+        r = await ac.post("/api/feedback/batch", json={"items": items})
+        assert r.status_code == 200
+        saved = r.json()
+        assert [fb["parent_name"] for fb in saved] == ["P0", "P1", "P2", "P3"]
+        assert all(fb["category"] == "Housing" and fb["notified"] is False for fb in saved)
+        assert len({fb["id"] for fb in saved}) == 4
+    assert storage.commit_stats["commits"] - before["commits"] == 1
+    assert storage.commit_stats["ops"] - before["ops"] == 4
+
+
+@pytest.mark.asyncio
+async def test_failed_commit_is_reported_as_server_error(monkeypatch):
+    from src import storage
+
+    def broken(ops):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(storage, "STORAGE_MODE", "journal")
+    monkeypatch.setattr(storage, "_append_journal", broken)
+    with pytest.raises(storage.CommitFailed):
+        storage.add_feedback({"text": "The bus is late."})
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as ac:
+        r = await ac.post("/api/feedback", json={"text": "The cafeteria is closed."})
+    assert r.status_code == 500
@@ -0,0 +1,31 @@
+from benchmarks.corpus import generate_feedbacks
+from benchmarks.harness import compare, percentile, summarize
+from benchmarks.run import run_suite
+from src import storage
+
+
+def test_corpus_is_deterministic_and_sized():
+    a = list(generate_feedbacks(50, seed=3))
+    assert len(a) == 50
+    assert a == list(generate_feedbacks(50, seed=3))
+    assert a[0]["submitted"] <= a[-1]["submitted"]
+
+
+def test_percentiles_and_regression_flags():
+    assert percentile([0.1, 0.2, 0.3, 0.4], 50) == 0.2
+    assert percentile([0.1, 0.2, 0.3, 0.4], 99) == 0.4
+    base = {"size": 10, "benchmarks": [summarize("x", [0.001] * 10)]}
+    slower = {"size": 10, "benchmarks": [summarize("x", [0.002] * 10)]}
+    flagged = compare(slower, base, tolerance=0.2)
+    assert {r["metric"] for r in flagged} == {"p95_ms", "throughput"}
+    assert compare(base, base) == []
+    assert compare({**slower, "size": 20}, base) == []
+
+
+def test_suite_runs_on_small_corpus_without_touching_the_store():
+    before = storage.count()
+    results = run_suite(200, iterations=3, only=["route_feedback", "add_feedback", "GET /admin", "export"])
+    names = [b["name"] for b in results["benchmarks"]]
+    assert "route_feedback" in names and "GET /admin/export" in names
+    assert all(b["p99_ms"] >= b["p50_ms"] for b in results["benchmarks"])
+    assert storage.count() == before
@@ -0,0 +1,233 @@
+import asyncio
+import json
+
+import pytest
+
+from src.agents.cache import ClassificationCache
+from src.agents.classifier import ClassifierEngine
+
+
+def test_engine_loads_resources_once_and_records_timings():
+    engine = ClassifierEngine(openai_key=None)
+    engine.warmup()
+    analyzer = engine.analyzer()
+    assert "vader" in engine.stats()["load_seconds"]
+
+    first = engine.analyze("The professor cancelled the exam again, very disappointed.")
+    engine.analyze("Great housing staff, thank you!")
+    assert engine.analyzer() is analyzer
+    assert first["category"] == "Academics"
+
+    stats = engine.stats()
+    assert stats["calls"]["fallback"] == 2
+    assert stats["calls"]["llm"] == 0
+    assert stats["mean_seconds"]["fallback"] > 0
+
+
+def test_batch_matches_single_item_results_across_process_pool(monkeypatch):
+    from src.agents import classifier
+
+    monkeypatch.setattr(classifier, "CLASSIFIER_WORKERS", 2)
+    monkeypatch.setattr(classifier, "CLASSIFIER_BATCH_CHUNK", 3)
+    texts = [
+        "The tuition refund never arrived.",
+        "My son's dorm room has mold.",
+        "The professor is excellent, thank you!",
+        "Parking on campus is impossible.",
+        "Nothing specific to report.",
+        "Admissions office was very helpful.",
+        "Exam grades were posted late.",
+    ]
+    try:
+        results = classifier.analyze_feedback_batch(texts)
+    finally:
+        classifier.shutdown_pool()
+    assert results == [classifier.analyze_feedback(t) for t in texts]
+
+
+class FakeChain:
+    def __init__(self):
+        self.calls = 0
+
+    def run(self, text):
+        self.calls += 1
+        return '{"category": "Facilities", "sentiment": "negative", "confidence": 0.9}'
+
+
+def test_llm_results_are_cached_by_normalized_text(tmp_path):
+    from src.agents.cache import ClassificationCache
+
+    path = tmp_path / "cache.jsonl"
+    engine = ClassifierEngine(openai_key="test", cache=ClassificationCache(path=path))
+    engine._chain = FakeChain()
+
+    first = engine.analyze("The cafeteria food is cold.")
+    again = engine.analyze("  the CAFETERIA food   is cold. ")
+    assert first == again == {"category": "Facilities", "sentiment": "negative", "confidence": 0.9, "tier": "llm"}
+    assert engine._chain.calls == 1
+    assert engine.stats()["cache"]["hits"] == 1
+
+    # persisted entries survive a restart
+    restarted = ClassifierEngine(openai_key="test", cache=ClassificationCache(path=path))
+    restarted._chain = FakeChain()
+    assert restarted.analyze("The cafeteria food is cold.") == first
+    assert restarted._chain.calls == 0
+
+
+def test_cache_lru_and_ttl(monkeypatch):
+    from src.agents import cache as cache_mod
+
+    now = [1000.0]
+    monkeypatch.setattr(cache_mod.time, "time", lambda: now[0])
+    c = cache_mod.ClassificationCache(max_size=2, ttl=60)
+    c.put("a", {"v": 1})
+    c.put("b", {"v": 2})
+    c.get("a")
+    c.put("c", {"v": 3})
+    assert c.get("b") is None  # least recently used was evicted
+    assert c.get("a") == {"v": 1}
+    now[0] += 61
+    assert c.get("c") is None
+    assert c.stats()["hits"] == 2 and c.stats()["misses"] == 2
+
+
+class FakeAsyncLLM:
+    """Local stand-in for the LangChain LLM: answers batch prompts with one result per item."""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.prompts = []
+        self.delay = delay
+        self.fail = fail
+
+    async def apredict(self, prompt):
+        import asyncio
+        import re
+
+        self.prompts.append(prompt)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("LLM unavailable")
+        items = re.findall(r"^(\d+)\. (.*)$", prompt, re.M)
+        out = []
+        for idx, text in items:
+            category = "Finance" if "tuition" in text.lower() else "Housing"
+            out.append({"index": int(idx), "category": category, "sentiment": "negative", "confidence": 0.8})
+        return json.dumps(out[::-1])  # order is restored by index
+
+
+@pytest.mark.asyncio
+async def test_async_llm_requests_are_micro_batched_and_demultiplexed():
+    engine = ClassifierEngine(openai_key="test", cache=ClassificationCache())
+    engine._llm = FakeAsyncLLM()
+    texts = ["Tuition is too high", "Dorm is cold", "Tuition refund late", "Dorm wifi is down"]
+
+    results = await asyncio.gather(*(engine.analyze_async(t) for t in texts))
+
+    assert [r["category"] for r in results] == ["Finance", "Housing", "Finance", "Housing"]
+    assert len(engine._llm.prompts) == 1
+    assert engine.batcher().batches == 1
+
+    # repeats are answered from the cache without another LLM call
+    await engine.analyze_async("tuition is too high")
+    assert len(engine._llm.prompts) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_llm_timeout_and_errors_fall_back(monkeypatch):
+    from src.agents import classifier
+
+    monkeypatch.setattr(classifier, "LLM_TIMEOUT", 0.05)
+    engine = ClassifierEngine(openai_key="test", cache=ClassificationCache())
+    engine._llm = FakeAsyncLLM(delay=1.0)
+    result = await engine.analyze_async("The exam was unfair")
+    assert result["category"] == "Academics"  # fallback classifier answered
+
+    engine = ClassifierEngine(openai_key="test", cache=ClassificationCache())
+    engine._llm = FakeAsyncLLM(fail=True)
+    assert (await engine.analyze_async("My dorm room is dirty"))["category"] == "Housing"
+    assert engine.stats()["calls"]["llm_errors"] == 1
+
+
+def test_cascade_answers_locally_when_confident_and_escalates_otherwise(tmp_path):
+    pytest.importorskip("numpy")
+    from src.agents.local_model import LocalModel, training_examples
+
+    history = [
+        {"text": f"The cafeteria food in hall {i} is cold and awful.", "category": "Food Services", "sentiment": "negative", "classifier": "llm"}
+        for i in range(20)
+    ] + [
+        {"text": f"Tuition refund number {i} arrived quickly, thank you.", "category": "Finance", "sentiment": "positive", "classifier": "import"}
+        for i in range(20)
+    ]
+    # keyword-fallback labels, near-duplicates and entries of unknown origin are left out of training
+    history.append({"text": "Parking is fine.", "category": "Other", "sentiment": "neutral", "classifier": "fallback"})
+    history.append({"text": "Parking is fine!", "category": "Other", "sentiment": "neutral", "classifier": "llm", "duplicate_of": 1})
+    history.append({"text": "Parking is great.", "category": "Other", "sentiment": "positive"})
+    examples = list(training_examples(history))
+    assert len(examples) == 40
+    assert len(list(training_examples(history, include_unlabelled=True))) == 41
+
+    path = tmp_path / "model.npz"
+    LocalModel.train(examples).save(path)
+    engine = ClassifierEngine(openai_key="test", cache=ClassificationCache(), model_path=path, threshold=0.8)
+    engine._chain = FakeChain()
+
+    local = engine.analyze("The cafeteria food was cold again.")
+    assert (local["category"], local["sentiment"], local["tier"]) == ("Food Services", "negative", "local")
+    assert local["confidence"] >= 0.8 and engine._chain.calls == 0
+
+    assert engine.analyze("Something unrelated about the weather.")["tier"] == "llm"
+    assert engine._chain.calls == 1
+    assert engine.stats()["tiers"] == {"local": 1, "llm": 1, "fallback": 0}
+
+
+def test_batch_scores_locally_before_the_fallback(tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    from src.agents import classifier
+    from src.agents.local_model import LocalModel
+
+    examples = [(f"Dorm heating in block {i} is broken.", "Housing", "negative") for i in range(10)]
+    examples += [(f"Great lecture in course {i}, thanks.", "Academics", "positive") for i in range(10)]
+    engine = ClassifierEngine(openai_key=None, model_path=None)
+    engine.set_local_model(LocalModel.train(examples))
+    monkeypatch.setattr(classifier, "engine", engine)
+
+    results = classifier.analyze_feedback_batch(["Dorm heating is broken again.", "", "Great lecture, thanks!"])
+    assert [r["tier"] for r in results] == ["local", "fallback", "local"]
+    assert [r["category"] for r in results] == ["Housing", "Other", "Academics"]
+
+
+@pytest.mark.asyncio
+async def test_async_llm_timeout_covers_waiting_for_a_slot(monkeypatch):
+    from src.agents import classifier
+
+    monkeypatch.setattr(classifier, "LLM_TIMEOUT", 0.05)
+    engine = ClassifierEngine(openai_key="test", cache=ClassificationCache())
+    engine._llm = FakeAsyncLLM()
+    batcher = engine.batcher()
+    batcher.semaphore = asyncio.Semaphore(0)  # every slot busy
+    result = await asyncio.wait_for(engine.analyze_async("The exam was unfair"), 1.0)
+    assert result["category"] == "Academics"
+    await asyncio.sleep(0)
+    assert not batcher._tasks
+
+
+def test_batch_escalations_use_multi_item_prompts(monkeypatch):
+    from src.agents import classifier
+
+    monkeypatch.setattr(classifier, "LLM_BATCH_MAX", 2)
+    engine = ClassifierEngine(openai_key="test", cache=ClassificationCache(), model_path=None)
+    engine._llm = FakeAsyncLLM()
+    monkeypatch.setattr(classifier, "engine", engine)
+
+    texts = ["Tuition is too high", "Dorm is cold", "Tuition refund late", "Dorm wifi is down", "Tuition again"]
+    results = classifier.analyze_feedback_batch(texts)
+    assert [r["category"] for r in results] == ["Finance", "Housing", "Finance", "Housing", "Finance"]
+    assert {r["tier"] for r in results} == {"llm"}
+    assert len(engine._llm.prompts) == 3
+
+    # a slow LLM is cut off by LLM_TIMEOUT and the items fall back to keywords
+    monkeypatch.setattr(classifier, "LLM_TIMEOUT", 0.05)
+    engine._llm = FakeAsyncLLM(delay=1.0)
+    results = classifier.analyze_feedback_batch(["The exam was unfair", "Tuition is too high"])
+    assert [r["tier"] for r in results] == ["fallback", "llm"]  # the second is cached
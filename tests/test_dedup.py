@@ -0,0 +1,58 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from src import main, storage
+from src.dedup import DuplicateIndex
+from src.main import app
+
+COMPLAINT = "The cafeteria food has been cold every day this week and my child is not eating lunch anymore."
+
+
+def test_index_links_near_duplicates_to_first_entry():
+    idx = DuplicateIndex()
+    assert idx.add(1, COMPLAINT) is None
+    assert idx.add(2, COMPLAINT.upper() + "  Please help!") == 1
+    assert idx.add(3, "The shuttle bus is late every single morning.") is None
+    assert idx.lookup("  " + COMPLAINT.lower()) == 1
+    # only canonical entries are bucketed
+    assert len(idx) == 2
+
+
+def test_storage_clusters_survive_reload():
+    a = storage.add_feedback({"text": COMPLAINT})
+    b = storage.add_feedback({"text": COMPLAINT + " Thanks."})
+    storage.add_feedback({"text": "Great teachers this term."})
+    assert b["duplicate_of"] == a["id"] and "duplicate_of" not in a
+    assert storage.find_duplicate(COMPLAINT)["id"] == a["id"]
+
+    storage.flush()
+    storage.load_feedbacks()
+    assert storage.wait_for_indexes()
+    clusters = storage.duplicate_clusters()
+    assert [(c["canonical"]["id"], [d["id"] for d in c["duplicates"]]) for c in clusters] == [(a["id"], [b["id"]])]
+
+
+@pytest.mark.asyncio
+async def test_duplicate_submission_skips_llm_and_notification(monkeypatch):
+    calls = []
+    queued = []
+
+    async def fake_analyze(text):
+        calls.append(text)
+        return {"category": "Food Services", "sentiment": "negative", "confidence": 0.9}
+
+    monkeypatch.setattr(main, "analyze_feedback_async", fake_analyze)
+    monkeypatch.setattr(main.notifier, "queue_notification", queued.append)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as ac:
+        first = (await ac.post("/api/feedback", json={"text": COMPLAINT})).json()
+        second = (await ac.post("/api/feedback", json={"text": COMPLAINT + "!!"})).json()
+
+        assert len(calls) == 1 and [q["id"] for q in queued] == [first["id"]]
+        assert second["duplicate_of"] == first["id"]
+        assert second["category"] == "Food Services" and second["notify_status"] == "duplicate"
+
+        r = await ac.get("/admin")
+        assert "Duplicate clusters (1)" in r.text
+        assert f"duplicate of #{first['id']}" in r.text
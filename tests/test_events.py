@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+import pytest
+
+from src import events, storage
+from src.main import _sse_stream
+
+
+async def _next(sub, timeout=2.0):
+    return await asyncio.wait_for(sub.queue.get(), timeout)
+
+
+@pytest.mark.asyncio
+async def test_storage_changes_reach_matching_subscribers_only():
+    facilities = events.bus.subscribe(category="facilities")
+    finance = events.bus.subscribe(category="Finance", sentiment="negative")
+    try:
+        fb = await storage.add_feedback_async({"text": "Library hours are too short", "category": "Facilities", "sentiment": "negative"})
+        added = await _next(facilities)
+        assert added["type"] == "add" and added["entry"]["id"] == fb["id"]
+        # entries the subscriber does not see still count towards the unfiltered total
+        storage.add_feedbacks([{"text": "Tuition is late", "category": "Finance", "sentiment": "positive"}] * 2)
+        await storage.add_feedback_async({"text": "Parking is full", "category": "Facilities", "sentiment": "negative"})
+        assert (await _next(facilities))["total"] == 4
+
+        await storage.update_feedback_status_async(fb["id"], "resolved")
+        changed = await _next(facilities)
+        assert (changed["type"], changed["entry"]["status"], changed["previous"]) == ("status", "resolved", "pending")
+
+        assert finance.queue.empty()
+    finally:
+        facilities.close()
+        finance.close()
+    assert events.bus.subscribers() == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_is_dropped():
+    sub = events.bus.subscribe(maxsize=2)
+    for i in range(5):
+        events.publish("add", {"id": i, "category": "Other"})
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert sub.dropped
+    assert (await _next(sub))["type"] == "dropped"
+    assert sub.queue.empty()
+    assert events.bus.subscribers() == 0
+    # nothing is queued for it any more
+    events.publish("add", {"id": 99})
+    await asyncio.sleep(0)
+    assert sub.queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_frames():
+    class FakeRequest:
+        async def is_disconnected(self):
+            return False
+
+    sub = events.bus.subscribe(department="housing")
+    stream = _sse_stream(FakeRequest(), sub)
+    assert await stream.__anext__() == b"retry: 3000\n\n"
+
+    events.publish("add", {"id": 7, "department": "Housing", "text": "Dorm heating is broken"})
+    frame = (await asyncio.wait_for(stream.__anext__(), 2)).decode()
+    lines = frame.strip().split("\n")
+    assert lines[1] == "event: add"
+    assert json.loads(lines[2][len("data: "):])["entry"]["text"] == "Dorm heating is broken"
+
+    await stream.aclose()
+    assert events.bus.subscribers() == 0
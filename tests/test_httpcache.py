@@ -0,0 +1,68 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from src import storage
+from src.httpcache import ResponseCache, parse_if_none_match
+from src.main import app, response_cache
+
+
+def test_response_cache_is_bounded_lru():
+    cache = ResponseCache(max_size=2)
+    cache.put("a", (b"1", "text/plain", {}))
+    cache.put("b", (b"2", "text/plain", {}))
+    cache.get("a")
+    cache.put("c", (b"3", "text/plain", {}))
+    assert cache.get("b") is None and cache.get("a") is not None
+    assert cache.stats()["size"] == 2
+    assert parse_if_none_match('W/"x", "y"') == {'"x"', '"y"'}
+
+
+def test_response_cache_bounds_bytes_and_drops_older_versions():
+    cache = ResponseCache(max_size=10, max_bytes=10, max_entry_bytes=6)
+    cache.put("big", (b"x" * 7, "text/plain", {}), version=1)
+    assert cache.get("big") is None  # above the per-entry cap
+    cache.put("a", (b"x" * 6, "text/plain", {}), version=1)
+    cache.put("b", (b"x" * 6, "text/plain", {}), version=1)
+    assert cache.get("a") is None and cache.stats()["bytes"] == 6
+
+    cache.put("c", (b"x", "text/plain", {}), version=2)
+    assert cache.get("b") is None and cache.stats()["size"] == 1
+    # a body rendered before the latest change is not kept
+    cache.put("stale", (b"x", "text/plain", {}), version=1)
+    assert cache.get("stale") is None
+
+
+def test_version_grows_on_every_change():
+    v0 = storage.version()
+    fb = storage.add_feedback({"text": "Library hours are too short"})
+    v1 = storage.version()
+    storage.update_feedback_status(fb["id"], "resolved")
+    v2 = storage.version()
+    storage.set_feedback_fields(fb["id"], notified=True)
+    assert v0 < v1 < v2 < storage.version()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/", "/admin?category=facilities", "/dashboard", "/api/feedbacks?limit=1"])
+async def test_read_endpoints_revalidate_with_etag(path):
+    storage.add_feedback({"text": "Library hours are too short", "category": "Facilities"})
+    response_cache.clear()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as ac:
+        first = await ac.get(path)
+        etag = first.headers["etag"]
+        assert first.status_code == 200
+
+        again = await ac.get(path, headers={"If-None-Match": etag})
+        assert again.status_code == 304 and again.content == b""
+
+        # a different query is a different representation
+        other = await ac.get(path + ("&" if "?" in path else "?") + "x=1", headers={"If-None-Match": etag})
+        assert other.status_code == 200
+
+        assert (await ac.get(path)).content == first.content
+        assert response_cache.stats()["hits"] >= 1
+
+        storage.add_feedback({"text": "Shuttle delays", "category": "Facilities"})
+        changed = await ac.get(path, headers={"If-None-Match": etag})
+        assert changed.status_code == 200 and changed.headers["etag"] != etag
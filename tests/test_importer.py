@@ -0,0 +1,106 @@
+import gzip
+import json
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from src import importer, storage
+from src.main import app
+
+
+def test_csv_export_round_trips_and_keeps_labels(tmp_path):
+    storage.add_feedbacks(
+        [
+            {"parent_name": "Ana", "title": "Lunch", "text": "The cafeteria food is cold.", "category": "Housing", "sentiment": "positive", "department": "Finance Office"},
+            {"parent_name": "Ben", "text": "Great teachers this term.", "category": "Academics", "sentiment": "positive", "department": "Academics"},
+        ]
+    )
+    path = tmp_path / "export.csv.gz"
+    path.write_bytes(gzip.compress(storage.export_feedbacks_csv().encode("utf-8")))
+
+    reports = list(importer.import_file(path, chunk_size=1))
+    assert [r["imported"] for r in reports] == [1, 2, 2]
+    assert reports[-1]["done"] and reports[-1]["classified"] == 0
+
+    copy = storage.query(parent_name="Ana")[-1]
+    assert copy["id"] == 3
+    # labels from the file win over what the classifier or router would pick
+    assert (copy["category"], copy["sentiment"], copy["department"]) == ("Housing", "positive", "Finance Office")
+    assert copy["department_email"] == "finance@university.edu" and copy["notify_status"] == "suppressed"
+
+
+def test_jsonl_classifies_missing_labels_and_skips_empty_rows():
+    lines = [
+        json.dumps({"text": "The tuition invoice charged us twice.", "sentiment": "negative"}),
+        "",
+        json.dumps({"title": "no text"}),
+        json.dumps({"id": 99, "text": "Dorm heating is broken.", "notify_status": "queued"}),
+    ]
+    report = list(importer.run_import(importer.iter_records(lines, "jsonl")))[-1]
+    assert (report["rows"], report["imported"], report["skipped"], report["classified"]) == (3, 2, 1, 2)
+    first, second = storage.list_feedbacks()
+    assert first["sentiment"] == "negative" and first["category"] and first["department"]
+    assert second["id"] == 2 and second["notified"] is False and second["notify_status"] == "suppressed"
+
+
+@pytest.mark.asyncio
+async def test_import_endpoint_streams_progress(monkeypatch):
+    queued = []
+    monkeypatch.setattr("src.notifier.queue_notification", queued.append)
+    body = "".join(json.dumps({"text": f"Feedback number {i} about parking."}) + "\n" for i in range(5))
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        r = await client.post("/admin/import?format=jsonl&chunk=2", content=body)
+        bad = await client.post("/admin/import?format=xml", content=body)
+    reports = [json.loads(line) for line in r.text.splitlines()]
+    assert [rep["imported"] for rep in reports] == [2, 4, 5]
+    assert storage.count() == 5 and not queued
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_import_endpoint_counts_wrongly_shaped_rows_as_invalid(monkeypatch):
+    monkeypatch.setattr("src.notifier.queue_notification", lambda entry: None)
+    rows = [[1, 2], {"text": 12345}, {"text": "Parking is full.", "category": ["x"]}, {"text": "The shuttle is late."}, "just a string"]
+    body = "".join(json.dumps(r) + "\n" for r in rows)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        r = await client.post("/admin/import?format=jsonl", content=body)
+    report = json.loads(r.text.splitlines()[-1])
+    assert report["done"] and (report["imported"], report["invalid"]) == (1, 4)
+    assert [fb["text"] for fb in storage.list_feedbacks()] == ["The shuttle is late."]
+
+
+def test_submitted_is_normalized_and_bad_dates_rejected():
+    lines = [
+        json.dumps({"text": "Parking is full.", "submitted": "2024-03-05T10:00:00+02:00"}),
+        json.dumps({"text": "Library hours are short.", "submitted": "2024-03-06"}),
+        json.dumps({"text": "Heating is broken.", "submitted": "last Tuesday"}),
+    ]
+    report = list(importer.run_import(importer.iter_records(lines, "jsonl")))[-1]
+    assert (report["imported"], report["invalid"]) == (2, 1)
+    assert [fb["submitted"] for fb in storage.list_feedbacks()] == ["2024-03-05 08:00:00", "2024-03-06 00:00:00"]
+
+
+def test_cli_refuses_direct_writes_outside_sqlite_mode(tmp_path, monkeypatch):
+    path = tmp_path / "rows.csv"
+    path.write_text("text\nThe shuttle is late.\n", encoding="utf-8")
+    monkeypatch.setattr(storage, "STORAGE_MODE", "journal")
+    assert importer.main([str(path)]) == 2
+    assert storage.count() == 0
+
+
+def test_cli_upload_posts_the_file_and_reads_progress(tmp_path):
+    import httpx
+
+    seen = {}
+
+    def handler(request):
+        seen["url"], seen["body"] = str(request.url), request.read()
+        return httpx.Response(200, text=json.dumps({"imported": 2, "done": True}) + "\n")
+
+    path = tmp_path / "rows.csv"
+    path.write_text("text\nThe shuttle is late.\nGreat staff.\n", encoding="utf-8")
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        reports = list(importer.import_via_server("http://server/", path, "csv", 500, client=client))
+    assert seen["url"] == "http://server/admin/import?format=csv&chunk=500"
+    assert seen["body"] == path.read_bytes()
+    assert reports == [{"imported": 2, "done": True}]
@@ -0,0 +1,43 @@
+import json
+
+from src import keywords
+from src.agents.classifier import analyze_feedback
+from src.routing import route_feedback
+
+
+def test_single_pass_match_returns_category_and_department_hits():
+    hits = keywords.match("The Cafeteria food is cold, the library hours are short and exams are hard.")
+    assert {"cafeteria", "food", "library", "exam"} <= hits["terms"]
+    assert hits["categories"]["Facilities"] == 3
+    assert hits["categories"]["Academics"] == 1
+    assert hits["departments"] == ["Food Services", "Facilities"]
+    # word boundaries: "fee" must not fire inside "feedback"
+    assert keywords.match("Thanks for the feedback")["categories"]["Finance"] == 0
+
+
+def test_classifier_and_router_share_the_matcher():
+    assert analyze_feedback("My tuition payment was charged twice")["category"] == "Finance"
+    assert route_feedback("Facilities", "The dining hall is closed")["name"] == "Food Services"
+    assert route_feedback("Housing", "The dorm is noisy")["name"] == "Housing Services"
+
+
+def test_reload_from_file(tmp_path):
+    cfg = tmp_path / "keywords.json"
+    cfg.write_text(json.dumps({"departments": {"shuttle": "Facilities"}}))
+    try:
+        keywords.reload_keywords(cfg)
+        assert route_feedback("Other", "The shuttle was late")["name"] == "Facilities"
+        # categories fall back to the built-in table
+        assert keywords.match("The exam was hard")["categories"]["Academics"] == 1
+    finally:
+        keywords.reload_keywords()
+    assert route_feedback("Other", "The shuttle was late")["name"] == "General Inquiries"
+
+
+def test_stems_and_ies_plurals_match_like_the_substring_baseline():
+    assert analyze_feedback("Dormitory wifi is down")["category"] == "Housing"
+    assert analyze_feedback("Examination schedule clashes")["category"] == "Academics"
+    assert keywords.match("The libraries and facilities are old")["terms"] == {"library", "facility"}
+    assert keywords.match("New policies on admissions")["terms"] == {"policy", "admission"}
+    # stems still stop at word starts
+    assert keywords.match("We read a poem in hexameter")["terms"] == set()
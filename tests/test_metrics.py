@@ -0,0 +1,40 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from src import metrics
+from src.main import app
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exposes_stage_and_request_histograms():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as ac:
+        await ac.post("/api/feedback", json={"text": "The dorm wifi keeps dropping."})
+        await ac.get("/admin/export")
+        r = await ac.get("/metrics")
+    assert r.status_code == 200
+    body = r.text
+    assert "# TYPE feedback_stage_duration_seconds histogram" in body
+    for stage in ("classify", "route", "persist", "notify_enqueue", "storage_commit"):
+        assert f'feedback_stage_duration_seconds_count{{stage="{stage}"}}' in body
+    assert 'feedback_stage_duration_seconds_count{backend="fallback",stage="classifier_backend"}' in body
+    assert 'http_request_duration_seconds_count{method="POST",route="/api/feedback",status="200"}' in body
+    assert "feedback_store_entries 1" in body
+    # streaming routes are not request latency
+    assert 'route="/admin/export"' not in body
+    assert 'feedback_classifier_cache_total{result="hits"}' in body
+
+
+def test_histogram_buckets_are_cumulative_and_timer_is_noop_when_disabled(monkeypatch):
+    h = metrics.Histogram("t_seconds", "test", buckets=(0.1, 1.0))
+    h.observe(0.05, stage="x")
+    h.observe(0.5, stage="x")
+    h.observe(5, stage="x")
+    lines = h.render()
+    assert 't_seconds_bucket{stage="x",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{stage="x",le="1.0"} 2' in lines
+    assert 't_seconds_bucket{stage="x",le="+Inf"} 3' in lines
+    assert 't_seconds_count{stage="x"} 3' in lines
+
+    monkeypatch.setattr(metrics, "METRICS_ENABLED", False)
+    assert metrics.timer("classify") is metrics.timer("route")
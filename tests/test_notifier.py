@@ -0,0 +1,115 @@
+import socket
+
+import pytest
+
+from src import notifier, storage
+
+aiosmtpd = pytest.importorskip("aiosmtpd.controller")
+
+
+class Collector:
+    def __init__(self, fail_first=0):
+        self.messages = []
+        self.fail_first = fail_first
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.fail_first:
+            self.fail_first -= 1
+            return "451 Try again later"
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    def start(handler):
+        controller = aiosmtpd.Controller(handler, hostname="127.0.0.1", port=_free_port())
+        controller.start()
+        started.append(controller)
+        cfg = {"host": "127.0.0.1", "port": controller.port, "user": None, "password": None, "use_tls": False, "from_addr": "noreply@test"}
+        return cfg
+
+    started = []
+    yield start
+    notifier.reset_outbox(None)
+    for c in started:
+        c.stop()
+
+
+def _store(text):
+    return storage.add_feedback({"text": text, "category": "Housing", "department_email": "housing@university.edu", "notify_status": "queued", "notified": False})
+
+
+def test_outbox_delivers_over_pooled_connections(smtp_server):
+    handler = Collector()
+    outbox = notifier.reset_outbox(notifier.Outbox(workers=2, cfg=smtp_server(handler)))
+    entries = [_store(f"The dorm heating is broken ({i})") for i in range(6)]
+    for e in entries:
+        outbox.enqueue(e)
+
+    assert outbox.join(5)
+    assert len(handler.messages) == 6
+    assert all(storage.get_feedback(e["id"])["notified"] is True for e in entries)
+    assert all(storage.get_feedback(e["id"])["notify_status"] == "sent" for e in entries)
+    assert outbox.pool.connects <= notifier.SMTP_POOL_SIZE
+
+
+def test_outbox_retries_with_backoff_and_recovers_after_restart(smtp_server, monkeypatch):
+    monkeypatch.setattr(notifier, "NOTIFY_BACKOFF_BASE", 0.01)
+    handler = Collector(fail_first=2)
+    cfg = smtp_server(handler)
+    outbox = notifier.reset_outbox(notifier.Outbox(workers=1, cfg=cfg))
+    entry = _store("Refund is late")
+    outbox.enqueue(entry)
+    assert outbox.join(5)
+    assert len(handler.messages) == 1
+    assert outbox.retries == 2
+
+    # an entry left queued by a previous process is picked up by recover()
+    leftover = _store("Room assignment is wrong")
+    outbox = notifier.reset_outbox(notifier.Outbox(workers=1, cfg=cfg))
+    assert outbox.recover() == 1
+    assert outbox.join(5)
+    assert storage.get_feedback(leftover["id"])["notify_status"] == "sent"
+
+
+def test_outbox_marks_failed_after_max_attempts(smtp_server, monkeypatch):
+    monkeypatch.setattr(notifier, "NOTIFY_BACKOFF_BASE", 0.01)
+    monkeypatch.setattr(notifier, "NOTIFY_MAX_ATTEMPTS", 2)
+    outbox = notifier.reset_outbox(notifier.Outbox(workers=1, cfg=smtp_server(Collector(fail_first=5))))
+    entry = _store("Nobody answers the phone")
+    outbox.enqueue(entry)
+    assert outbox.join(5)
+    assert storage.get_feedback(entry["id"])["notify_status"] == "failed"
+    assert storage.get_feedback(entry["id"])["notified"] is False
+
+
+def test_sqlite_workers_claim_before_sending(smtp_server, monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_MODE", "sqlite")
+    storage.load_feedbacks()
+    handler = Collector()
+    outbox = notifier.reset_outbox(notifier.Outbox(workers=1, cfg=smtp_server(handler)))
+    entry = _store("The dorm heating is broken")
+
+    # another worker sharing the database claims it first
+    monkeypatch.setattr(storage, "INSTANCE", "other-worker")
+    assert storage.claim_notification(entry["id"], notifier.NOTIFY_CLAIM_TTL)["notify_status"] == "sending"
+    monkeypatch.setattr(storage, "INSTANCE", "this-worker")
+    outbox.enqueue(entry)
+    assert outbox.join(5)
+    assert handler.messages == []
+    assert storage.get_feedback(entry["id"])["notify_owner"] == "other-worker"
+
+    # once its claim has expired (the worker died mid-send) this one takes over
+    monkeypatch.setattr(notifier, "NOTIFY_CLAIM_TTL", 0)
+    outbox.enqueue(entry)
+    assert outbox.join(5)
+    assert len(handler.messages) == 1
+    storage.load_feedbacks()
+    assert storage.get_feedback(entry["id"])["notify_status"] == "sent"
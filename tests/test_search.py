@@ -0,0 +1,53 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from src import storage
+from src.main import app
+from src.search import InvertedIndex, parse_query
+
+
+def test_parse_query_splits_terms_and_phrases():
+    terms, phrases = parse_query('parking "shuttle delays" the')
+    assert terms == ["parking"]
+    assert phrases == [[(0, "shuttle"), (1, "delays")]]
+
+
+def test_bm25_ranking_and_phrases():
+    idx = InvertedIndex()
+    idx.add(1, "Shuttle", "The shuttle delays are getting worse, shuttle is always late.")
+    idx.add(2, None, "Delays at the shuttle stop and in the cafeteria.")
+    idx.add(3, None, "The cafeteria food is cold.")
+
+    ranked = idx.search("shuttle")
+    assert [d for d, _ in ranked] == [1, 2]
+    assert [d for d, _ in idx.search('"shuttle delays"')] == [1]
+    # stopwords keep their position, so "food is cold" only matches the exact sequence
+    assert [d for d, _ in idx.search('"food is cold"')] == [3]
+    assert idx.search('"cold food"') == []
+    assert [d for d, _ in idx.search("cafeteria", accept=lambda d: d != 2)] == [3]
+    # free terms only add to the score of docs that have the phrase, even if they lack the term
+    assert [d for d, _ in idx.search('cafeteria "shuttle delays"')] == [1]
+    assert [d for d, _ in idx.search("shuttle cafeteria", limit=1)] == [2]
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_combines_with_filters_and_stays_incremental():
+    storage.add_feedback({"title": "Transport", "text": "Shuttle delays every morning", "category": "Facilities", "sentiment": "negative"})
+    storage.add_feedback({"text": "The shuttle driver was very kind", "category": "Facilities", "sentiment": "positive"})
+    storage.add_feedback({"text": "Tuition refund delays", "category": "Finance", "sentiment": "negative"})
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as ac:
+        r = await ac.get("/api/search", params={"q": "shuttle delays"})
+        assert [fb["text"] for fb in r.json()["results"]][0] == "Shuttle delays every morning"
+        assert r.json()["count"] == 3
+
+        r = await ac.get("/api/search", params={"q": "delays", "category": "finance"})
+        assert [fb["text"] for fb in r.json()["results"]] == ["Tuition refund delays"]
+
+        r = await ac.get("/api/search", params={"q": '"shuttle delays"'})
+        assert r.json()["count"] == 1
+
+        r = await ac.get("/admin", params={"q": "shuttle", "sentiment": "positive"})
+        assert "driver was very kind" in r.text
+        assert "Tuition refund" not in r.text
@@ -0,0 +1,287 @@
+import asyncio
+import json
+
+import pytest
+
+from src import storage
+
+
+def _entry(text="The library hours are too short.", **kw):
+    return {"parent_name": "Jane Doe", "text": text, "category": "Facilities", "sentiment": "negative", **kw}
+
+
+def test_journal_replay_restores_adds_and_status_changes(monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_MODE", "journal")
+    a = storage.add_feedback(_entry())
+    b = storage.add_feedback(_entry("Tuition refund is late."))
+    storage.update_feedback_status(a["id"], "resolved", note="fixed")
+
+    # the snapshot is untouched; every mutation went to the journal
+    assert json.loads(storage.DATA_FILE.read_text()) == []
+    lines = storage._journal_path().read_text().splitlines()
+    assert [json.loads(l)["op"] for l in lines] == ["add", "add", "status"]
+
+    storage.load_feedbacks()
+    by_id = {fb["id"]: fb for fb in storage.list_feedbacks()}
+    assert by_id[a["id"]]["status"] == "resolved"
+    assert by_id[a["id"]]["history"][-1]["note"] == "fixed"
+    assert by_id[b["id"]]["status"] == "pending"
+    assert storage.add_feedback(_entry())["id"] == b["id"] + 1
+
+
+def test_torn_journal_tail_is_ignored(monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_MODE", "journal")
+    storage.add_feedback(_entry())
+    storage._close_journal()
+    with open(storage._journal_path(), "a", encoding="utf-8") as fh:
+        fh.write('{"op": "add", "entry": {"id": 9')
+
+    storage.load_feedbacks()
+    assert [fb["id"] for fb in storage.list_feedbacks()] == [1]
+    # the torn tail is cut off, so records appended after the restart replay cleanly
+    storage.add_feedback(_entry())
+    storage.load_feedbacks()
+    assert [fb["id"] for fb in storage.list_feedbacks()] == [1, 2]
+
+
+def test_corrupt_journal_record_before_the_tail_fails_loudly(monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_MODE", "journal")
+    storage.add_feedback(_entry())
+    storage.add_feedback(_entry())
+    storage._close_journal()
+    path = storage._journal_path()
+    lines = path.read_text().splitlines(keepends=True)
+    path.write_text("{garbage\n" + "".join(lines[1:]))
+
+    with pytest.raises(storage.CorruptJournal):
+        storage.load_feedbacks()
+
+
+def test_compaction_folds_journal_into_snapshot(monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_MODE", "journal")
+    monkeypatch.setattr(storage, "JOURNAL_COMPACT_BYTES", 1)
+    fb = storage.add_feedback(_entry())
+    storage.wait_for_compaction()
+    storage.update_feedback_status(fb["id"], "in_progress")
+    storage.wait_for_compaction()
+
+    snapshot = json.loads(storage.DATA_FILE.read_text())
+    assert snapshot[0]["status"] == "in_progress"
+    assert not storage._sealed_journal_path().exists()
+
+    # replaying a segment that already made it into the snapshot is a no-op
+    storage._sealed_journal_path().write_text(
+        json.dumps({"op": "status", "id": fb["id"], "status": "in_progress", "rec": {}, "history_len": 1}) + "\n"
+    )
+    storage.load_feedbacks()
+    assert len(storage.list_feedbacks()[0]["history"]) == 1
+    assert not storage._sealed_journal_path().exists()
+
+
+def test_writes_acknowledged_during_compaction_survive_a_reload(monkeypatch):
+    import threading
+
+    monkeypatch.setattr(storage, "STORAGE_MODE", "journal")
+    acked = []
+    stop = threading.Event()
+
+    def writer():
+        while not stop.is_set():
+            acked.append(storage.add_feedback(_entry())["id"])
+
+    threads = [threading.Thread(target=writer) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for _ in range(20):
+        storage.compact()
+        storage.save_feedbacks()
+    stop.set()
+    for t in threads:
+        t.join()
+    # writes after the last compaction must land in a journal that is still on disk
+    acked.append(storage.add_feedback(_entry())["id"])
+    storage.flush()
+
+    storage.load_feedbacks()
+    assert sorted(fb["id"] for fb in storage.list_feedbacks()) == sorted(acked)
+
+
+def test_query_intersects_case_normalized_indexes():
+    a = storage.add_feedback(_entry(department="Facilities"))
+    b = storage.add_feedback(_entry(parent_name="Sam Lee", sentiment="positive", department="Facilities"))
+    c = storage.add_feedback(_entry(category="Finance", department="Finance Office"))
+
+    assert [fb["id"] for fb in storage.query(department="facilities")] == [a["id"], b["id"]]
+    assert [fb["id"] for fb in storage.query(department="FACILITIES", sentiment="Negative")] == [a["id"]]
+    assert [fb["id"] for fb in storage.query(parent_name="sam lee")] == [b["id"]]
+    assert storage.query(category="Housing") == []
+    assert len(storage.query(category=None, sentiment="")) == 3
+
+    storage.update_feedback_status(c["id"], "resolved")
+    assert [fb["id"] for fb in storage.query(status="resolved")] == [c["id"]]
+    assert [fb["id"] for fb in storage.query(status="pending")] == [a["id"], b["id"]]
+    assert storage.get_feedback(c["id"])["status"] == "resolved"
+
+    storage.load_feedbacks()
+    assert [fb["id"] for fb in storage.query(status="resolved")] == [c["id"]]
+
+
+def test_summary_and_recent_window_track_mutations():
+    a = storage.add_feedback(_entry(submitted="2024-01-02 09:00:00"))
+    b = storage.add_feedback(_entry(sentiment="positive", submitted="2024-01-01 09:00:00"))
+    c = storage.add_feedback(_entry(submitted="2024-01-03 09:00:00"))
+    storage.update_feedback_status(a["id"], "resolved")
+
+    stats = storage.summary()
+    assert stats["total"] == 3
+    assert stats["by_status"] == {"pending": 2, "resolved": 1}
+    assert stats["by_sentiment"] == {"positive": 1, "neutral": 0, "negative": 2}
+    assert [fb["id"] for fb in storage.recent(2)] == [c["id"], a["id"]]
+    assert storage.recent(5)[1]["status"] == "resolved"
+
+    storage.load_feedbacks()
+    assert storage.summary() == stats
+    assert [fb["id"] for fb in storage.recent(5)] == [c["id"], a["id"], b["id"]]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_async_writes_are_group_committed_with_unique_ids(monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_MODE", "journal")
+    storage.flush()
+    before = dict(storage.commit_stats)
+
+    saved = await asyncio.gather(*(storage.add_feedback_async(_entry(f"Shuttle delay {i}")) for i in range(50)))
+    await storage.update_feedback_status_async(saved[0]["id"], "resolved")
+
+    assert len({fb["id"] for fb in saved}) == 50
+    commits = storage.commit_stats["commits"] - before["commits"]
+    assert storage.commit_stats["ops"] - before["ops"] == 51
+    assert commits < 51
+    # every awaited write is durable: a reload sees all of them
+    storage.load_feedbacks()
+    assert storage.count() == 50
+    assert storage.get_feedback(saved[0]["id"])["status"] == "resolved"
+
+
+def test_sqlite_migrates_json_and_journal_once(monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_MODE", "journal")
+    a = storage.add_feedback(_entry())
+    storage.save_feedbacks()
+    storage.update_feedback_status(a["id"], "resolved")  # only in the journal
+
+    monkeypatch.setattr(storage, "STORAGE_MODE", "sqlite")
+    storage.load_feedbacks()
+    assert storage.sqlite_path().exists()
+    assert storage.get_feedback(a["id"])["status"] == "resolved"
+
+    b = storage.add_feedback(_entry("Tuition refund is late."))
+    storage.update_feedback_status(b["id"], "in_progress")
+    assert b["id"] == a["id"] + 1
+    storage.load_feedbacks()
+    assert [(fb["id"], fb["status"]) for fb in storage.list_feedbacks()] == [(a["id"], "resolved"), (b["id"], "in_progress")]
+    assert storage.count(status="resolved") == 1
+
+
+def test_sqlite_workers_see_each_others_writes(monkeypatch):
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    monkeypatch.setattr(storage, "STORAGE_MODE", "sqlite")
+    storage.load_feedbacks()
+    mine = storage.add_feedback(_entry())
+
+    # a second worker process sharing the same database
+    script = (
+        "import sys; from pathlib import Path; from src import storage\n"
+        "storage.DATA_FILE = Path(sys.argv[1]); storage.STORAGE_MODE = 'sqlite'; storage.load_feedbacks()\n"
+        "storage.add_feedback({'text': 'Shuttle delays again', 'category': 'Transport', 'sentiment': 'negative'})\n"
+        "storage.update_feedback_status(int(sys.argv[2]), 'resolved', note='from worker 2')\n"
+        "storage.flush()\n"
+    )
+    root = Path(__file__).resolve().parents[1]
+    subprocess.run([sys.executable, "-c", script, str(storage.DATA_FILE), str(mine["id"])], cwd=root, check=True, env={"STORAGE_MODE": "json", "PATH": ""})
+
+    assert storage.count() == 2
+    assert storage.get_feedback(mine["id"])["history"][-1]["note"] == "from worker 2"
+    assert storage.count(status="resolved") == 1
+    storage.wait_for_indexes()
+    assert [fb["text"] for fb in storage.search("shuttle")] == ["Shuttle delays again"]
+    # ids keep coming from the shared sequence
+    assert storage.add_feedback(_entry())["id"] == mine["id"] + 2
+
+
+def test_sqlite_sync_keeps_local_changes_that_are_not_committed_yet(monkeypatch):
+    import threading
+
+    from src.sqlite_backend import SQLiteBackend
+
+    monkeypatch.setattr(storage, "STORAGE_MODE", "sqlite")
+    storage.load_feedbacks()
+    fb = storage.add_feedback(_entry())
+
+    gate = threading.Event()
+    write_ops = storage._write_ops
+    monkeypatch.setattr(storage, "_write_ops", lambda ops: gate.wait(5) and write_ops(ops))
+    _, fut = storage._update_status(fb["id"], "in_progress", "mine", None)
+
+    # another worker changes the same entry while ours is still queued
+    other = SQLiteBackend(storage.sqlite_path())
+    other.write([{"op": "status", "id": fb["id"], "status": "resolved", "rec": {"to": "resolved", "note": "theirs"}}])
+    other.close()
+    storage._sync()
+    assert [h.get("note") for h in storage.get_feedback(fb["id"])["history"]] == ["mine"]
+
+    gate.set()
+    assert fut.result(5)
+    storage._sync()
+    merged = storage.get_feedback(fb["id"])
+    assert [h.get("note") for h in merged["history"]] == ["theirs", "mine"]
+    assert merged["status"] == "in_progress"
+    assert storage.count(status="in_progress") == 1 and storage.count(status="resolved") == 0
+
+
+def test_binary_snapshot_roundtrip(monkeypatch, tmp_path):
+    from src import snapshot
+
+    entries = [_entry(id=3, history=[{"to": "resolved"}]), _entry("Tuition refund is late.", id=7, notified=True)]
+    path = tmp_path / "x.snap"
+    path.write_bytes(snapshot.encode(entries, next_id=8))
+    with snapshot.SnapshotReader(path) as snap:
+        assert (len(snap), snap.next_id, snap.ids) == (2, 8, [3, 7])
+        # the first entry has no `notified`; absent fields stay absent
+        assert list(snap) == entries
+
+
+def test_binary_snapshot_mode_converts_json_and_keeps_journal(monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_MODE", "journal")
+    a = storage.add_feedback(_entry())
+    storage.save_feedbacks()  # JSON snapshot
+
+    monkeypatch.setattr(storage, "SNAPSHOT_FORMAT", "binary")
+    storage.load_feedbacks()  # reads the JSON snapshot
+    b = storage.add_feedback(_entry("Tuition refund is late."))
+    storage.compact()
+    assert storage.binary_snapshot_path().exists()
+    storage.update_feedback_status(a["id"], "resolved")
+
+    storage.load_feedbacks()
+    assert [(fb["id"], fb["status"]) for fb in storage.list_feedbacks()] == [(a["id"], "resolved"), (b["id"], "pending")]
+    assert storage.add_feedback(_entry())["id"] == b["id"] + 1
+
+
+def test_switching_back_to_json_loads_the_newer_binary_snapshot(monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_MODE", "journal")
+    a = storage.add_feedback(_entry())
+    storage.save_feedbacks()  # JSON snapshot
+
+    monkeypatch.setattr(storage, "SNAPSHOT_FORMAT", "binary")
+    b = storage.add_feedback(_entry("Tuition refund is late."))
+    storage.compact()  # both entries now only in the .snap file
+
+    monkeypatch.setattr(storage, "SNAPSHOT_FORMAT", "json")
+    storage.load_feedbacks()
+    assert [fb["id"] for fb in storage.list_feedbacks()] == [a["id"], b["id"]]
+    storage.compact()
+    storage.load_feedbacks()
+    assert [fb["id"] for fb in json.loads(storage.DATA_FILE.read_text())] == [a["id"], b["id"]]